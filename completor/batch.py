@@ -0,0 +1,258 @@
+"""Run Completor for many case files in one process, sharing the parsed schedules between the runs."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from completor.constants import Keywords
+from completor.exceptions.clean_exceptions import CompletorError
+from completor.launch_args_parser import get_parser
+from completor.logger import logger
+from completor.main import get_content_and_path, run
+from completor.schedule_cache import MemoryScheduleCache
+from completor.utils import CaseInput
+
+# Parsed schedules shared by the jobs run in a worker process.
+_worker_schedule_cache: MemoryScheduleCache | None = None
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """One run of Completor in a batch.
+
+    Attributes:
+        case_file: Path to the case file.
+        schedule_file: Path to the schedule file, or None to use the SCHEDULE_FILE keyword of the case file.
+        output_file: Path to the output schedule file, or None to use the OUT_FILE keyword of the case file.
+        arguments: Other command line arguments of the run, e.g. `("--stream",)`.
+        name: Name of the job in the summary. Defaults to the case file.
+    """
+
+    case_file: str
+    schedule_file: str | None = None
+    output_file: str | None = None
+    arguments: tuple[str, ...] = ()
+    name: str | None = None
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """The outcome of one job of a batch.
+
+    Attributes:
+        name: Name of the job.
+        status: "done" if the output was written, "failed" otherwise.
+        duration: Wall-clock time of the job, in seconds.
+        output_file: Path to the output schedule file, if known.
+        error: The error the job failed with, if any.
+    """
+
+    name: str
+    status: str
+    duration: float
+    output_file: str | None = None
+    error: str | None = None
+
+
+def read_manifest(manifest_file: str | Path) -> list[BatchJob]:
+    """Read the jobs of a batch from a manifest file.
+
+    The manifest is a JSON object with a list of `jobs`, each an object with the path to its `case` file, and
+    optionally its `schedule` and `output` files, other command line `arguments`, and a `name`.
+    Relative paths are relative to the directory of the manifest.
+
+    Args:
+        manifest_file: Path to the manifest file.
+
+    Returns:
+        The jobs of the batch.
+
+    Raises:
+        CompletorError: If the manifest cannot be read, or a job has no case file.
+    """
+    manifest_file = Path(manifest_file)
+    try:
+        with open(manifest_file, encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError) as err:
+        raise CompletorError(f"Could not read the batch manifest '{manifest_file}': {err}") from err
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("jobs"), list):
+        raise CompletorError(f"The batch manifest '{manifest_file}' must be an object with a list of 'jobs'.")
+
+    def resolve(path: str | None) -> str | None:
+        return None if path is None else str(manifest_file.parent / path)
+
+    jobs = []
+    for job_number, job in enumerate(manifest["jobs"], 1):
+        if not isinstance(job, dict) or "case" not in job:
+            raise CompletorError(f"Job {job_number} of the batch manifest '{manifest_file}' has no 'case' file.")
+        jobs.append(
+            BatchJob(
+                case_file=str(resolve(job["case"])),
+                schedule_file=resolve(job.get("schedule")),
+                output_file=resolve(job.get("output")),
+                arguments=tuple(str(argument) for argument in job.get("arguments", [])),
+                name=job.get("name"),
+            )
+        )
+    return jobs
+
+
+def run_batch(jobs: list[BatchJob], workers: int = 1, summary_file: str | Path | None = None) -> list[BatchResult]:
+    """Run the jobs of a batch, and summarize their outcome.
+
+    Jobs using the same schedule file share its parsed data, which is parsed once. When run in worker processes, the
+    jobs using the same schedule file are run one after the other by the same worker.
+    A job that fails does not stop the others.
+
+    Args:
+        jobs: The jobs to run.
+        workers: Number of processes to run the jobs in. The jobs are run in this process if 1.
+        summary_file: Path to write the summary of the jobs to as JSON, if any.
+
+    Returns:
+        The outcome of each job, in the order of the jobs.
+    """
+    start = time.perf_counter()
+    if workers > 1 and len(jobs) > 1:
+        groups: dict[str, list[int]] = {}
+        for job_number, job in enumerate(jobs):
+            schedule_file = _find_schedule_file(job)
+            groups.setdefault(f"job {job_number}" if schedule_file is None else schedule_file, []).append(job_number)
+        job_numbers = list(groups.values())
+        results_by_job: dict[int, BatchResult] = {}
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(job_numbers)), initializer=_init_worker, initargs=(logger.level,)
+        ) as executor:
+            group_results = executor.map(
+                _run_jobs_in_worker, [[jobs[number] for number in group] for group in job_numbers]
+            )
+            for group, results_of_group in zip(job_numbers, group_results):
+                results_by_job.update(zip(group, results_of_group))
+        results = [results_by_job[job_number] for job_number in range(len(jobs))]
+    else:
+        schedule_cache = MemoryScheduleCache()
+        results = [_run_job(job, schedule_cache) for job in jobs]
+    duration = time.perf_counter() - start
+
+    for result in results:
+        logger.info("%s: %s in %.2f s.", result.name, result.status, result.duration)
+    failed = sum(result.status == "failed" for result in results)
+    logger.info("Ran %d jobs in %.2f s, %d failed.", len(results), duration, failed)
+    if summary_file is not None:
+        summary = {
+            "jobs": [asdict(result) for result in results],
+            "done": len(results) - failed,
+            "failed": failed,
+            "duration": duration,
+        }
+        with open(summary_file, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=4)
+    return results
+
+
+def _find_schedule_file(job: BatchJob) -> str | None:
+    """Find the schedule file of a job, as given to it or by the case file.
+
+    Args:
+        job: The job.
+
+    Returns:
+        The real path of the schedule file, or None if it cannot be found. The job will then fail when run.
+    """
+    try:
+        _, schedule_file = get_content_and_path(
+            CaseInput.from_file(job.case_file), job.schedule_file, Keywords.SCHEDULE_FILE, read_file=False
+        )
+    except (CompletorError, OSError, ValueError):
+        return None
+    return None if schedule_file is None else os.path.realpath(schedule_file)
+
+
+def _run_job(job: BatchJob, schedule_cache: MemoryScheduleCache) -> BatchResult:
+    """Run one job, as if Completor was launched from the command line.
+
+    Args:
+        job: The job.
+        schedule_cache: Parsed schedules shared with the other jobs.
+
+    Returns:
+        The outcome of the job.
+    """
+    name = job.case_file if job.name is None else job.name
+    arguments = ["-i", job.case_file]
+    if job.schedule_file is not None:
+        arguments += ["-s", job.schedule_file]
+    if job.output_file is not None:
+        arguments += ["-o", job.output_file]
+    start = time.perf_counter()
+    try:
+        inputs = get_parser().parse_args([*arguments, *job.arguments])
+        output_file = run(inputs, schedule_cache)
+    except (Exception, SystemExit) as err:
+        # Errors in creating the output are logged and end in SystemExit, as for a single run.
+        error = f"Exited with status {err.code}." if isinstance(err, SystemExit) else f"{type(err).__name__}: {err}"
+        logger.error("Job '%s' failed. %s", name, error)
+        return BatchResult(name, "failed", time.perf_counter() - start, job.output_file, error)
+    return BatchResult(name, "done", time.perf_counter() - start, output_file)
+
+
+def _init_worker(loglevel: int) -> None:
+    """Set up a worker process, with its own shared parsed schedules.
+
+    Args:
+        loglevel: The log level of the main process.
+    """
+    global _worker_schedule_cache
+    _worker_schedule_cache = MemoryScheduleCache()
+    logger.setLevel(loglevel)
+
+
+def _run_jobs_in_worker(jobs: list[BatchJob]) -> list[BatchResult]:
+    """Run jobs using the same schedule file in a worker process, one after the other.
+
+    Args:
+        jobs: The jobs.
+
+    Returns:
+        The outcome of each job.
+    """
+    assert _worker_schedule_cache is not None, "Worker process was not initialized."
+    return [_run_job(job, _worker_schedule_cache) for job in jobs]
+
+
+def main() -> None:
+    """Run the jobs of a batch manifest from the command line, and exit with status 1 if any job failed."""
+    parser = argparse.ArgumentParser(
+        description="Run Completor for each job of a batch manifest, sharing the parsed schedules between jobs."
+    )
+    parser.add_argument("manifest", type=str, help="JSON file with the jobs to run.")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1, help="(Optional) number of processes to run the jobs in. Defaults to 1."
+    )
+    parser.add_argument(
+        "--summary",
+        type=str,
+        help="(Optional) file to write the status and time of each job to. Defaults to <manifest>_summary.json.",
+    )
+    parser.add_argument(
+        "-l", "--loglevel", action="store", type=int, help="(Optional) log-level. Lower values gives more info (0-50)."
+    )
+    inputs = parser.parse_args()
+    loglevel = logging.WARNING if inputs.loglevel is None else inputs.loglevel
+    # Loglevel NOTSET (0) gets overwritten by higher up loggers to WARNING, as in `main.main`.
+    logger.setLevel(1 if loglevel == 0 else loglevel)
+
+    manifest = Path(inputs.manifest)
+    summary_file = inputs.summary or str(manifest.with_name(f"{manifest.stem}_summary.json"))
+    results = run_batch(read_manifest(manifest), inputs.workers, summary_file)
+    if any(result.status == "failed" for result in results):
+        sys.exit(1)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Literal, overload
+from typing import Any, Literal, overload
 
 import numpy as np
 import numpy.typing as npt
@@ -81,18 +81,17 @@ def define_annulus_zone(df_completion: pd.DataFrame) -> pd.DataFrame:
         boundary = np.unique(boundary)
         start_bound = boundary[:-1]
         end_bound = boundary[1:]
-        # get annulus zone
-        # initiate with 0
-        annulus_zone = np.full(len(start_bound), 0)
-        for idx, start_measured_depth in enumerate(start_bound):
-            end_measured_depth = end_bound[idx]
-            is_gravel_pack_location = np.any(
-                (gravel_pack_location[:, 0] == start_measured_depth)
-                & (gravel_pack_location[:, 1] == end_measured_depth)
-            )
-            if not is_gravel_pack_location:
-                annulus_zone[idx] = max(annulus_zone) + 1
-            # else it is 0
+        # An interval between two boundaries is gravel packed if it is exactly the interval of a gravel pack.
+        # The other intervals are numbered from 1, in order of depth.
+        is_gravel_pack = np.zeros(len(start_bound), dtype=bool)
+        gravel_pack_index = np.searchsorted(start_bound, gravel_pack_location[:, 0])
+        in_bounds = gravel_pack_index < len(start_bound)
+        gravel_pack_index = gravel_pack_index[in_bounds]
+        is_exact = (start_bound[gravel_pack_index] == gravel_pack_location[in_bounds, 0]) & (
+            end_bound[gravel_pack_index] == gravel_pack_location[in_bounds, 1]
+        )
+        is_gravel_pack[gravel_pack_index[is_exact]] = True
+        annulus_zone = np.where(is_gravel_pack, 0, np.cumsum(~is_gravel_pack))
         df_annulus = pd.DataFrame(
             {
                 Headers.START_MEASURED_DEPTH: start_bound,
@@ -101,14 +100,15 @@ def define_annulus_zone(df_completion: pd.DataFrame) -> pd.DataFrame:
             }
         )
 
-        annulus_zone = np.full(df_completion.shape[0], 0)
-        for idx in range(df_completion.shape[0]):
-            start_measured_depth = df_completion[Headers.START_MEASURED_DEPTH].iloc[idx]
-            end_measured_depth = df_completion[Headers.END_MEASURED_DEPTH].iloc[idx]
-            idx0, idx1 = completion_index(df_annulus, start_measured_depth, end_measured_depth)
-            if idx0 != idx1 or idx0 == -1:
-                raise ValueError("Check Define Annulus Zone")
-            annulus_zone[idx] = df_annulus[Headers.ANNULUS_ZONE].iloc[idx0]
+        # Each completion interval must lie within a single annulus interval.
+        idx0, idx1 = completion_indices(
+            df_annulus,
+            df_completion[Headers.START_MEASURED_DEPTH].to_numpy(),
+            df_completion[Headers.END_MEASURED_DEPTH].to_numpy(),
+        )
+        if ((idx0 != idx1) | (idx0 == -1)).any():
+            raise ValueError("Check Define Annulus Zone")
+        annulus_zone = annulus_zone[idx0]
         df_completion[Headers.ANNULUS_ZONE] = annulus_zone
     df_completion[Headers.ANNULUS_ZONE] = df_completion[Headers.ANNULUS_ZONE].astype(np.int64)
     return df_completion
@@ -176,43 +176,19 @@ def create_tubing_segments(
         end_measured_depth = df_reservoir[Headers.END_MEASURED_DEPTH].to_numpy()
         if Headers.SEGMENT in df_reservoir.columns:
             if not df_reservoir[Headers.SEGMENT].isin(["1*"]).any():
-                create_start_measured_depths = []
-                create_end_measured_depths = []
-                try:
-                    create_start_measured_depths.append(df_reservoir[Headers.START_MEASURED_DEPTH].iloc[0])
-                except IndexError:
+                if df_reservoir.empty:
                     raise CompletorError("Number of WELSEGS and COMPSEGS is inconsistent.")
-                current_segment = df_reservoir[Headers.SEGMENT].iloc[0]
-                for i in range(1, len(df_reservoir[Headers.SEGMENT])):
-                    if df_reservoir[Headers.SEGMENT].iloc[i] != current_segment:
-                        create_end_measured_depths.append(df_reservoir[Headers.END_MEASURED_DEPTH].iloc[i - 1])
-                        create_start_measured_depths.append(df_reservoir[Headers.START_MEASURED_DEPTH].iloc[i])
-                        current_segment = df_reservoir[Headers.SEGMENT].iloc[i]
-                create_end_measured_depths.append(df_reservoir[Headers.END_MEASURED_DEPTH].iloc[-1])
-                start_measured_depth = np.array(create_start_measured_depths)
-                end_measured_depth = np.array(create_end_measured_depths)
+                # One tubing segment per run of consecutive cells with the same segment number.
+                segments = df_reservoir[Headers.SEGMENT].to_numpy()
+                run_ends = np.flatnonzero(segments[1:] != segments[:-1])
+                start_measured_depth = start_measured_depth[np.append(0, run_ends + 1)]
+                end_measured_depth = end_measured_depth[np.append(run_ends, len(segments) - 1)]
 
         minimum_segment_length = float(minimum_segment_length)
         if minimum_segment_length > 0.0:
-            new_start_measured_depth = []
-            new_end_measured_depth = []
-            diff_measured_depth = end_measured_depth - start_measured_depth
-            current_diff_measured_depth = 0.0
-            i_start = 0
-            i_end = 0
-            for i in range(0, len(diff_measured_depth) - 1):
-                current_diff_measured_depth += diff_measured_depth[i]
-                if current_diff_measured_depth >= minimum_segment_length:
-                    new_start_measured_depth.append(start_measured_depth[i_start])
-                    new_end_measured_depth.append(end_measured_depth[i_end])
-                    current_diff_measured_depth = 0.0
-                    i_start = i + 1
-                i_end = i + 1
-            if current_diff_measured_depth < minimum_segment_length:
-                new_start_measured_depth.append(start_measured_depth[i_start])
-                new_end_measured_depth.append(end_measured_depth[i_end])
-            start_measured_depth = np.array(new_start_measured_depth)
-            end_measured_depth = np.array(new_end_measured_depth)
+            start_measured_depth, end_measured_depth = _merge_short_segments(
+                start_measured_depth, end_measured_depth, minimum_segment_length
+            )
     elif method == Method.USER:
         # Create tubing layer based on the definition of COMPLETION keyword in the case file.
         # Read all segments except PA (which has no segment length).
@@ -261,8 +237,8 @@ def create_tubing_segments(
         # End of the gaps.
         end_gaps_depth = start_compsegs_depth[indices_gaps[0] + 1]
         # Check the gaps between COMPLETION_SEGMENTS and fill it out with WELL_SEGMENTS.
-        start = np.abs(start_welsegs_depth[:, np.newaxis] - start_gaps_depth).argmin(axis=0)
-        end = np.abs(end_welsegs_depth[:, np.newaxis] - end_gaps_depth).argmin(axis=0)
+        start = _nearest_index(start_welsegs_depth, start_gaps_depth)
+        end = _nearest_index(end_welsegs_depth, end_gaps_depth)
         welsegs_to_add = np.setxor1d(start_welsegs_depth[start], end_welsegs_depth[end])
         start_welsegs_outside = start_welsegs_depth[np.argwhere(start_welsegs_depth < start_compsegs_depth[0])]
         end_welsegs_outside = end_welsegs_depth[np.argwhere(end_welsegs_depth > end_compsegs_depth[-1])]
@@ -307,6 +283,71 @@ def create_tubing_segments(
     )
 
 
+def _merge_short_segments(
+    start_measured_depth: npt.NDArray[np.float64], end_measured_depth: npt.NDArray[np.float64], minimum_length: float
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Merge consecutive segments until they are at least the minimum segment length.
+
+    Segments are merged from the top. A merged segment ends at the first segment where the sum of the lengths reaches
+    the minimum length, and the remaining segments at the end are merged into one segment, whatever its length.
+    The lengths are summed in blocks with a cumulative sum, rather than one segment at a time, which sums in the
+    same order and so finds the same ends.
+
+    Args:
+        start_measured_depth: Start measured depth of each segment.
+        end_measured_depth: End measured depth of each segment.
+        minimum_length: User input minimum segment length.
+
+    Returns:
+        Start and end measured depth of the merged segments.
+    """
+    lengths = end_measured_depth - start_measured_depth
+    last = len(lengths) - 1
+    new_start_measured_depth = []
+    new_end_measured_depth = []
+    merge_start = 0
+    block_size = 16
+    while merge_start < last:
+        accumulated_length = np.cumsum(lengths[merge_start : min(merge_start + block_size, last)])
+        reached = np.flatnonzero(accumulated_length >= minimum_length)
+        if reached.size == 0:
+            if merge_start + block_size >= last:
+                break
+            block_size *= 2
+            continue
+        merge_end = merge_start + int(reached[0])
+        new_start_measured_depth.append(start_measured_depth[merge_start])
+        new_end_measured_depth.append(end_measured_depth[merge_end])
+        # The next merged segment is likely to span a similar number of segments.
+        block_size = max(16, 2 * (merge_end - merge_start + 1))
+        merge_start = merge_end + 1
+    new_start_measured_depth.append(start_measured_depth[merge_start])
+    new_end_measured_depth.append(end_measured_depth[last])
+    return np.array(new_start_measured_depth), np.array(new_end_measured_depth)
+
+
+def _nearest_index(values: npt.NDArray[np.float64], targets: npt.NDArray[np.float64]) -> npt.NDArray[np.intp]:
+    """Find the index of the value nearest to each target, the first one if several are equally near.
+
+    Same as `np.abs(values[:, np.newaxis] - targets).argmin(axis=0)`, but with a binary search if the values are
+    sorted, rather than a matrix of all distances.
+
+    Args:
+        values: Values to search among.
+        targets: Values to search for.
+
+    Returns:
+        Index in values of the nearest value to each target.
+    """
+    if values.size == 0 or (values[1:] < values[:-1]).any():
+        return np.abs(values[:, np.newaxis] - targets).argmin(axis=0)
+    # The nearest values are the first value at or above the target, and the first of the values below it.
+    above = np.searchsorted(values, targets, side="left")
+    below = np.searchsorted(values, values[np.maximum(above - 1, 0)], side="left")
+    above = np.minimum(above, values.size - 1)
+    return np.where(np.abs(values[below] - targets) <= np.abs(values[above] - targets), below, above)
+
+
 def insert_missing_segments(df_tubing_segments: pd.DataFrame, well_name: str | None) -> pd.DataFrame:
     """Create segments for inactive cells.
 
@@ -442,6 +483,145 @@ def get_completion(
     )
 
 
+def completion_indices(
+    df_completion: pd.DataFrame, start: npt.NDArray[np.float64], end: npt.NDArray[np.float64]
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """Find the indices in the completion DataFrame of start and end measured depth of several segments at once.
+
+    Same as `completion_index` for each segment. If the completion intervals are sorted and do not overlap,
+    the intervals containing each depth are found by binary search, instead of by scanning the entire table.
+
+    Args:
+        df_completion: Must contain start and end measured depth.
+        start: Start measured depth of each segment.
+        end: End measured depth of each segment.
+
+    Returns:
+        Start and end indices of each segment, -1 for both if not found.
+    """
+    start_md = df_completion[Headers.START_MEASURED_DEPTH].to_numpy()
+    end_md = df_completion[Headers.END_MEASURED_DEPTH].to_numpy()
+    start = np.asarray(start)
+    end = np.asarray(end)
+    if (start_md > end_md).any() or (start_md[1:] < end_md[:-1]).any():
+        indices = [
+            completion_index(df_completion, segment_start, segment_end)
+            for segment_start, segment_end in zip(start, end)
+        ]
+        if not indices:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        idx0, idx1 = np.array(indices, dtype=np.int64).T
+        return idx0, idx1
+    if start_md.size == 0:
+        return np.full(start.shape, -1, dtype=np.int64), np.full(end.shape, -1, dtype=np.int64)
+
+    # The last interval starting at or before the start, and the first interval ending at or after the end.
+    idx0 = np.searchsorted(start_md, start, side="right") - 1
+    idx1 = np.searchsorted(end_md, end, side="left")
+    found = (idx0 >= 0) & (idx1 < end_md.size)
+    clipped_idx0 = np.clip(idx0, 0, end_md.size - 1)
+    clipped_idx1 = np.clip(idx1, 0, start_md.size - 1)
+    found &= (end_md[clipped_idx0] > start) & (start_md[clipped_idx1] < end)
+    return (
+        np.where(found, clipped_idx0, -1).astype(np.int64),
+        np.where(found, clipped_idx1, -1).astype(np.int64),
+    )
+
+
+def get_completions(
+    start: npt.NDArray[np.float64], end: npt.NDArray[np.float64], df_completion: pd.DataFrame, joint_length: float
+) -> tuple[npt.NDArray[Any], ...]:
+    """Get information from the completion for several segments at once.
+
+    Gives the same results as `get_completion` for each segment, computed with whole-array operations.
+    The completion rows spanned by every segment are laid out one after the other, and summed or picked per segment.
+
+    Args:
+        start: Start measured depth of each segment.
+        end: End measured depth of each segment.
+        df_completion: COMPLETION table that must contain columns: `STARTMD`, `ENDMD`, `NVALVEPERJOINT`,
+            `INNER_DIAMETER`, `OUTER_DIAMETER`, `ROUGHNESS`, `DEVICETYPE`, `DEVICENUMBER`, and `ANNULUS_ZONE`.
+        joint_length: Length of a joint.
+
+    Returns:
+        The number of devices, device type, device number, inner diameter, outer diameter, roughness, and annulus zone
+        of each segment.
+
+    Raises:
+        ValueError: See `get_completion`.
+    """
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    idx0, idx1 = completion_indices(df_completion, start, end)
+    if start.size == 0 or ((idx0 == -1) | (idx1 < idx0)).any():
+        # Let the segment that is not completed raise the error.
+        return _get_completions_by_segment(start, end, df_completion, joint_length)
+
+    # Row of the completion table for each pair of segment and completion interval it spans.
+    counts = idx1 - idx0 + 1
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    segment = np.repeat(np.arange(start.size), counts)
+    rows = idx0[segment] + np.arange(counts.sum()) - offsets[segment]
+
+    start_completion = df_completion[Headers.START_MEASURED_DEPTH].to_numpy()[rows]
+    end_completion = df_completion[Headers.END_MEASURED_DEPTH].to_numpy()[rows]
+    lengths = np.minimum(end_completion, end[segment]) - np.maximum(start_completion, start[segment])
+    if (lengths <= 0).any():
+        logger.warning("Depths are incongruent.")
+    devices = (lengths / joint_length) * df_completion[Headers.VALVES_PER_JOINT].to_numpy()[rows]
+    # Short runs are summed one interval at a time, which is the order numpy sums short arrays in, so the totals are
+    # the same as those of `get_completion` to the last bit.
+    number_of_devices = devices[offsets]
+    short = counts < 8
+    for k in range(1, counts[short].max(initial=0)):
+        has_interval = short & (counts > k)
+        number_of_devices[has_interval] += devices[offsets[has_interval] + k]
+    for i in np.flatnonzero(~short):
+        number_of_devices[i] = np.sum(devices[offsets[i] : offsets[i] + counts[i]])
+
+    # The last interval of each segment that is longer than the interval before it, within the segment.
+    previous_lengths = shift_array(lengths, 1, fill_value=0)
+    previous_lengths[offsets] = 0
+    mask = lengths > previous_lengths
+    inner_diameter = df_completion[Headers.INNER_DIAMETER].to_numpy()[rows]
+    outer_diameter = df_completion[Headers.OUTER_DIAMETER].to_numpy()[rows]
+    positions = np.where(mask, np.arange(rows.size), -1)
+    last = np.maximum.reduceat(positions, offsets)
+    if (last == -1).any() or (mask & (inner_diameter > outer_diameter)).any():
+        return _get_completions_by_segment(start, end, df_completion, joint_length)
+
+    chosen = rows[last]
+    inner_diameter = inner_diameter[last]
+    outer_diameter = (outer_diameter[last] ** 2 - inner_diameter**2) ** 0.5
+    return (
+        number_of_devices,
+        df_completion[Headers.DEVICE_TYPE].to_numpy()[chosen],
+        df_completion[Headers.DEVICE_NUMBER].to_numpy()[chosen],
+        inner_diameter,
+        outer_diameter,
+        df_completion[Headers.ROUGHNESS].to_numpy()[chosen],
+        df_completion[Headers.ANNULUS_ZONE].to_numpy()[chosen],
+    )
+
+
+def _get_completions_by_segment(
+    start: npt.NDArray[np.float64], end: npt.NDArray[np.float64], df_completion: pd.DataFrame, joint_length: float
+) -> tuple[npt.NDArray[Any], ...]:
+    """Get information from the completion one segment at a time, with `get_completion`.
+
+    Args:
+        start: Start measured depth of each segment.
+        end: End measured depth of each segment.
+        df_completion: COMPLETION table.
+        joint_length: Length of a joint.
+
+    Returns:
+        The same as `get_completions`.
+    """
+    completion_data = [get_completion(start[i], end[i], df_completion, joint_length) for i in range(start.size)]
+    return tuple(np.array([data[column] for data in completion_data]) for column in range(7))
+
+
 def complete_the_well(
     df_tubing_segments: pd.DataFrame, df_completion: pd.DataFrame, joint_length: float
 ) -> pd.DataFrame:
@@ -455,27 +635,17 @@ def complete_the_well(
     Returns:
         Well information.
     """
-    number_of_devices = []
-    device_type = []
-    device_number = []
-    inner_diameter = []
-    outer_diameter = []
-    roughness = []
-    annulus_zone = []
-
     start = df_tubing_segments[Headers.START_MEASURED_DEPTH].to_numpy()
     end = df_tubing_segments[Headers.END_MEASURED_DEPTH].to_numpy()
-
-    # loop through the cells
-    for i in range(df_tubing_segments.shape[0]):
-        completion_data = get_completion(start[i], end[i], df_completion, joint_length)
-        number_of_devices.append(completion_data[0])
-        device_type.append(completion_data[1])
-        device_number.append(completion_data[2])
-        inner_diameter.append(completion_data[3])
-        outer_diameter.append(completion_data[4])
-        roughness.append(completion_data[5])
-        annulus_zone.append(completion_data[6])
+    (
+        number_of_devices,
+        device_type,
+        device_number,
+        inner_diameter,
+        outer_diameter,
+        roughness,
+        annulus_zone,
+    ) = get_completions(start, end, df_completion, joint_length)
 
     df_well = pd.DataFrame(
         {
@@ -514,30 +684,30 @@ def lumping_segments(df_well: pd.DataFrame) -> pd.DataFrame:
     Returns:
         Updated well information.
     """
-    number_of_devices = df_well[Headers.NUMBER_OF_DEVICES].to_numpy()
+    devices = df_well[Headers.NUMBER_OF_DEVICES].to_numpy()
     annulus_zone = df_well[Headers.ANNULUS_ZONE].to_numpy()
-    segments_descending = df_well[Headers.SEGMENT_DESC].to_numpy()
+    is_additional = df_well[Headers.SEGMENT_DESC].to_numpy() == Headers.ADDITIONAL_SEGMENT
     number_of_rows = df_well.shape[0]
-    for i in range(number_of_rows):
-        if segments_descending[i] != Headers.ADDITIONAL_SEGMENT:
-            continue
 
-        # only additional segments
-        if annulus_zone[i] > 0:
-            # meaning only annular zones
-            # compare it to the segment before and after
-            been_lumped = False
-            if i - 1 >= 0 and not been_lumped and annulus_zone[i] == annulus_zone[i - 1]:
-                # compare it to the segment before
-                number_of_devices[i - 1] = number_of_devices[i - 1] + number_of_devices[i]
-                been_lumped = True
-            if i + 1 < number_of_rows and not been_lumped and annulus_zone[i] == annulus_zone[i + 1]:
-                # compare it to the segment after
-                number_of_devices[i + 1] = number_of_devices[i + 1] + number_of_devices[i]
-        # update the number of devices to 0 for this segment
-        # because it is lumped to others
-        # and it is 0 if it has no annulus zone
-        number_of_devices[i] = 0.0
+    same_zone_as_previous = np.zeros(number_of_rows, dtype=bool)
+    same_zone_as_previous[1:] = annulus_zone[1:] == annulus_zone[:-1]
+    same_zone_as_next = np.zeros(number_of_rows, dtype=bool)
+    same_zone_as_next[:-1] = annulus_zone[:-1] == annulus_zone[1:]
+    # Additional segments in an annulus zone are lumped to the segment before them if it is in the same zone,
+    # otherwise to the segment after them if that is in the same zone.
+    is_lumped = is_additional & (annulus_zone > 0)
+    to_previous = is_lumped & same_zone_as_previous
+    to_next = is_lumped & ~same_zone_as_previous & same_zone_as_next
+
+    # Segments are lumped in order of depth, so a segment gets the devices of the segment before it first, and then
+    # those of the segment after it. Devices lumped to an additional segment are dropped along with that segment.
+    number_of_devices = devices.copy()
+    from_previous = np.flatnonzero(to_next[:-1]) + 1
+    number_of_devices[from_previous] = number_of_devices[from_previous] + devices[from_previous - 1]
+    from_next = np.flatnonzero(to_previous[1:])
+    number_of_devices[from_next] = number_of_devices[from_next] + devices[from_next + 1]
+    # The number of devices is 0 for additional segments, since they are either lumped to others or outside any zone.
+    number_of_devices[is_additional] = 0.0
     df_well[Headers.NUMBER_OF_DEVICES] = number_of_devices
     # from now on it is only original segment
     df_well = df_well[df_well[Headers.SEGMENT_DESC] == Headers.ORIGINAL_SEGMENT].copy()
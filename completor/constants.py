@@ -10,6 +10,8 @@ import pandas as pd
 
 WellData: TypeAlias = dict[str, pd.DataFrame | tuple[pd.DataFrame, pd.DataFrame]]
 ScheduleData: TypeAlias = dict[str, WellData]
+# Output of create_output.format_output: completion data, well segments, completion segments, bonus, and ICV table.
+FormattedWell: TypeAlias = tuple[str, str, str, str, pd.DataFrame]
 
 
 @dataclass(frozen=True)
@@ -4,12 +4,11 @@ from __future__ import annotations
 
 import getpass
 from datetime import datetime
+from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt  # type: ignore
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
-from matplotlib.backends.backend_pdf import PdfPages  # type: ignore
 
 from completor import prepare_outputs
 from completor.constants import Headers, Keywords
@@ -17,9 +16,11 @@ from completor.exceptions.clean_exceptions import CompletorError
 from completor.get_version import get_version
 from completor.logger import logger
 from completor.read_casefile import ReadCasefile
-from completor.visualize_well import visualize_well
 from completor.wells import Lateral, Well
 
+if TYPE_CHECKING:
+    from matplotlib.backends.backend_pdf import PdfPages  # type: ignore
+
 
 def format_output(
     well: Well, case: ReadCasefile, pdf: PdfPages | None = None
@@ -173,6 +174,11 @@ def format_output(
             print_density_driven += _format_density_driven(well.well_number, df_density_driven)
 
         if pdf is not None:
+            # Plotting is only loaded when figures are made, see `main.create`.
+            import matplotlib.pyplot as plt  # type: ignore
+
+            from completor.visualize_well import visualize_well
+
             logger.info(f"Creating figure for well {well.well_name}, lateral {lateral.lateral_number}.")
             fig = visualize_well(
                 well.well_name, well.df_well_all_laterals, well.df_reservoir_all_laterals, case.segment_length
@@ -78,6 +78,7 @@ class CaseReaderFormatError(_BaseCaseException):
         keyword: str | None = None,
         error_index: int | None = None,
         window_size: int = 5,
+        is_larger: bool | None = None,
     ):
         if message is None:
             message = "Something went wrong while reading the casefile! "
@@ -86,7 +87,7 @@ class CaseReaderFormatError(_BaseCaseException):
             super().__init__(message)
             return
 
-        extra_info = "few/many"
+        extra_info = "few/many" if is_larger is None else "many" if is_larger else "few"
         if error_index is None:
             if keyword is None:
                 super().__init__(message)
@@ -132,3 +133,10 @@ class CaseReaderFormatError(_BaseCaseException):
                 return line, len(header) < len(content.strip().split())
 
         raise ValueError("Could not find the erroneous line.")
+
+
+class CaseReaderValueError(_BaseCaseException, ValueError):
+    """Used for values in keyword data that cannot be read as the type of their column."""
+
+    def __init__(self, message: str, lines: list[str], error_index: int, window_size: int = 5):
+        super().__init__(message, lines, error_index, window_size)
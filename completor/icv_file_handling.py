@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import datetime
+import io
 import re
 from pathlib import Path
 
@@ -29,7 +30,7 @@ class IcvFileHandling:
         self.input_case_file = Path(file_data["input_case_file"])
         self.create_ordered_filenames()
         self.create_include_files()
-        self.create_main_schedule_file(Path(file_data["schedule_file_path"]))
+        self.create_main_schedule_file(Path(file_data["schedule_file_path"]), file_data.get("schedule_content"))
         self.include_file_path = None
         self.schedule_include_file_path = None
 
@@ -247,18 +248,22 @@ class IcvFileHandling:
                     )
                     self.append_control_criteria_to_file(file_path, well_name, icv_name, file_type, icv_date, None)
 
-    def create_main_schedule_file(self, input_schedule: Path):
+    def create_main_schedule_file(self, input_schedule: Path, schedule_content: str | None = None):
         """Creates the main output schedule file from the input schedule file.
 
         Args:
             input_schedule: Input schedule file name.
+            schedule_content: Content of the input schedule, if already in memory. Read from file otherwise.
 
         """
         main_schedule_file = Path(self.output_directory / self.output_file_name)
 
         dates = [datetime.datetime.strptime(d, "%d %b %Y") for d in set(self.initials.icv_dates.values())]
-        with open(input_schedule, encoding="utf-8") as fh:
-            sch_files = fh.readlines()
+        if schedule_content is None:
+            with open(input_schedule, encoding="utf-8") as fh:
+                sch_files = fh.readlines()
+        else:
+            sch_files = io.StringIO(schedule_content).readlines()
         for index, line in enumerate(sch_files):
             line = " ".join(line.split())
             if "DATES" in line:
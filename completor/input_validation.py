@@ -118,70 +118,101 @@ def set_format_completion(df_comp: pd.DataFrame) -> pd.DataFrame:
 def assess_completion(df_comp: pd.DataFrame) -> None:
     """Assess the user completion inputs.
 
+    Every row is checked at once, and all errors found are reported together.
+
     Args:
         df_comp: Completion data.
+
+    Raises:
+        CompletorError: If any row of the completion has an error, listing all of them.
     """
-    list_wells = df_comp[Headers.WELL].unique()
-    for well_name in list_wells:
-        df_well = df_comp[df_comp[Headers.WELL] == well_name]
-        list_branches = df_well[Headers.BRANCH].unique()
-        for branch in list_branches:
-            df_comp = df_well[df_well[Headers.BRANCH] == branch]
-            nrow = df_comp.shape[0]
-            for idx in range(0, nrow):
-                _check_for_errors(df_comp, well_name, idx)
+    errors = _find_completion_errors(df_comp)
+    if len(errors) == 1:
+        raise CompletorError(errors[0])
+    if errors:
+        raise CompletorError(f"Found {len(errors)} errors in COMPLETION:\n" + "\n".join(errors))
 
 
-def _check_for_errors(df_comp: pd.DataFrame, well_name: str, idx: int) -> None:
-    """Check for errors in completion.
+def _find_completion_errors(df_comp: pd.DataFrame) -> list[str]:
+    """Find the errors in the completion.
+
+    The errors are ordered by well and branch, in order of appearance, then by row, and then by check.
+    That is, the first error is the one found first when going through the wells and branches one row at a time.
 
     Args:
-        df_comp: Completion data frame.
-        well_name: Well name.
-        idx: Index.
+        df_comp: Completion data.
 
-    Raises:
-        CompletorError:
-            If packer segments are missing length.
-            If non-packer segments are missing length.
-            If the completion description is incomplete for some range of depth.
-            If the completion description is overlapping for some range of depth.
+    Returns:
+        Error messages, for packer segments with length, non-packer segments without length, gaps and overlaps in
+        the depths of a branch, and unknown device or annulus types. Each names the well and branch of the error,
+        and the depths of the row or of the gap or overlap.
     """
-    if df_comp[Headers.ANNULUS].iloc[idx] == Content.PACKER and (
-        df_comp[Headers.START_MEASURED_DEPTH].iloc[idx] != df_comp[Headers.END_MEASURED_DEPTH].iloc[idx]
-    ):
-        raise CompletorError("Packer segments must not have length.")
-
-    if (
-        df_comp[Headers.ANNULUS].iloc[idx] != Content.PACKER
-        and df_comp[Headers.DEVICE_TYPE].iloc[idx] != Content.INFLOW_CONTROL_VALVE
-        and df_comp[Headers.START_MEASURED_DEPTH].iloc[idx] == df_comp[Headers.END_MEASURED_DEPTH].iloc[idx]
-    ):
-        raise CompletorError("Non packer segments must have length.")
-
-    if idx > 0:
-        if df_comp[Headers.START_MEASURED_DEPTH].iloc[idx] > df_comp[Headers.END_MEASURED_DEPTH].iloc[idx - 1]:
-            raise CompletorError(
-                f"Incomplete completion description in well {well_name} from depth "
-                f"{df_comp[Headers.END_MEASURED_DEPTH].iloc[idx - 1]} "
-                f"to depth {df_comp[Headers.START_MEASURED_DEPTH].iloc[idx]}"
-            )
-
-        if df_comp[Headers.START_MEASURED_DEPTH].iloc[idx] < df_comp[Headers.END_MEASURED_DEPTH].iloc[idx - 1]:
-            raise CompletorError(
-                f"Overlapping completion description in well '{well_name}' from depth "
-                f"{df_comp[Headers.END_MEASURED_DEPTH].iloc[idx - 1]} "
-                f"to depth {(df_comp[Headers.START_MEASURED_DEPTH].iloc[idx])}"
-            )
-    if df_comp[Headers.DEVICE_TYPE].iloc[idx] not in Content.DEVICE_TYPES:
-        raise CompletorError(
-            f"{df_comp[Headers.DEVICE_TYPE].iloc[idx]} is not a valid device type. "
-            "Valid types are PERF, AICD, ICD, VALVE, DENSITY, INJV, DUALRCP, and ICV."
-        )
-    if df_comp[Headers.ANNULUS].iloc[idx] not in Content.ANNULUS_TYPES:
-        raise CompletorError(
-            f"{df_comp[Headers.ANNULUS].iloc[idx]} is not a valid annulus type. Valid types are GP, OA, and PA"
-        )
+    positions = np.arange(df_comp.shape[0])
+    well_numbers = pd.factorize(df_comp[Headers.WELL])[0]
+    first_positions = (
+        pd.Series(positions, index=df_comp.index)
+        .groupby([df_comp[Headers.WELL], df_comp[Headers.BRANCH]])
+        .transform("min")
+    )
+    df_comp = df_comp.iloc[np.lexsort((positions, first_positions.to_numpy(), well_numbers))]
+
+    wells = df_comp[Headers.WELL].to_numpy()
+    branches = df_comp[Headers.BRANCH].to_numpy()
+    annulus = df_comp[Headers.ANNULUS].to_numpy()
+    device_types = df_comp[Headers.DEVICE_TYPE].to_numpy()
+    start_depths = df_comp[Headers.START_MEASURED_DEPTH].to_numpy()
+    end_depths = df_comp[Headers.END_MEASURED_DEPTH].to_numpy()
+    previous_end_depths = df_comp.groupby([Headers.WELL, Headers.BRANCH], sort=False)[
+        Headers.END_MEASURED_DEPTH
+    ].shift()
+    previous_end_depths = previous_end_depths.to_numpy()
+    has_previous = ~pd.isna(previous_end_depths)
+    is_packer = annulus == Content.PACKER
+
+    def location(row: int) -> str:
+        return f"well {wells[row]}, branch {branches[row]}, from depth {start_depths[row]} to depth {end_depths[row]}"
+
+    checks = [
+        (
+            is_packer & (start_depths != end_depths),
+            lambda row: f"Packer segments must not have length: {location(row)}.",
+        ),
+        (
+            ~is_packer & (device_types != Content.INFLOW_CONTROL_VALVE) & (start_depths == end_depths),
+            lambda row: f"Non packer segments must have length: {location(row)}.",
+        ),
+        (
+            has_previous & (start_depths > previous_end_depths),
+            lambda row: (
+                f"Incomplete completion description in well {wells[row]} branch {branches[row]} "
+                f"from depth {previous_end_depths[row]} to depth {start_depths[row]}"
+            ),
+        ),
+        (
+            has_previous & (start_depths < previous_end_depths),
+            lambda row: (
+                f"Overlapping completion description in well '{wells[row]}' branch {branches[row]} "
+                f"from depth {previous_end_depths[row]} to depth {start_depths[row]}"
+            ),
+        ),
+        (
+            ~np.isin(device_types, Content.DEVICE_TYPES),
+            lambda row: (
+                f"{device_types[row]} is not a valid device type in {location(row)}. "
+                "Valid types are PERF, AICD, ICD, VALVE, DENSITY, INJV, DUALRCP, and ICV."
+            ),
+        ),
+        (
+            ~np.isin(annulus, Content.ANNULUS_TYPES),
+            lambda row: f"{annulus[row]} is not a valid annulus type in {location(row)}. Valid types are GP, OA, and PA",
+        ),
+    ]
+    errors = [
+        (row, check_number, message(row))
+        for check_number, (is_error, message) in enumerate(checks)
+        for row in np.flatnonzero(is_error)
+    ]
+    return [message for _, _, message in sorted(errors, key=lambda error: error[:2])]
 
 
 def set_density_based(df_comp: pd.DataFrame) -> pd.DataFrame:
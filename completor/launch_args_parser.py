@@ -31,6 +31,54 @@ def get_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "-l", "--loglevel", action="store", type=int, help="(Optional) log-level. Lower values gives more info (0-50)."
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="(Optional) memory-map the schedule file instead of reading it, to limit memory use for large files.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="(Optional) directory to cache parsed schedule data in, to reuse it for identical schedule files.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="(Optional) upper limit of the size of the schedule cache in MB. Defaults to 1024.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "(Optional) reuse the output of wells whose input is unchanged since an earlier run with the same "
+            "--cache-dir, and only create the other wells."
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="(Optional) number of processes to create the wells in. Defaults to 1. Ignored if --figure is given.",
+    )
+    parser.add_argument(
+        "--include-dir",
+        type=str,
+        help=(
+            "(Optional) directory to write the WELSEGS and COMPSEGS keywords of each well to, as include files named by "
+            "a hash of their content. Files of wells that did not change are kept as they are. Files that are no "
+            "longer included are not removed."
+        ),
+    )
+    parser.add_argument(
+        "--include-root",
+        type=str,
+        help=(
+            "(Optional) directory the paths of the include files are written relative to, i.e. that of the DATA file of "
+            "the reservoir simulator, which resolves relative paths from there. The paths are absolute if not given."
+        ),
+    )
     parser.add_argument("-v", "--version", action="version", version=f"Completor version {get_version()}!")
 
     return parser
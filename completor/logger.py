@@ -4,6 +4,9 @@ import json
 import logging
 import sys
 import time
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
 from functools import wraps
 from pathlib import Path
 
@@ -36,6 +39,48 @@ def get_logger(module_name="completor"):
 
 logger = get_logger(__name__)
 
+# Number of times each stage of creating the wells has run, and the time spent in it in seconds.
+stage_counts: Counter[str] = Counter()
+stage_timings: Counter[str] = Counter()
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """Add the time spent in a block of code to the timings of a stage.
+
+    Args:
+        stage: Name of the stage.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_counts[stage] += 1
+        stage_timings[stage] += time.perf_counter() - start
+
+
+def add_stage_timings(counts: Mapping[str, int], timings: Mapping[str, float]) -> None:
+    """Add the stage timings from elsewhere, e.g. a worker process.
+
+    Args:
+        counts: Number of times each stage has run.
+        timings: Time spent in each stage in seconds.
+    """
+    stage_counts.update(counts)
+    stage_timings.update(timings)
+
+
+def reset_stage_timings() -> None:
+    """Clear the stage timings."""
+    stage_counts.clear()
+    stage_timings.clear()
+
+
+def log_stage_timings() -> None:
+    """Log the number of runs of, and the time spent in, each stage, slowest stage first."""
+    for stage, seconds in stage_timings.most_common():
+        logger.debug("%-40s %6d runs %10.3f s", stage, stage_counts[stage], seconds)
+
 
 def handle_error_messages(func):
     """Decorator to catch any exceptions it might throw (with some exceptions, such as KeyboardInterrupt).
@@ -2,57 +2,90 @@
 
 from __future__ import annotations
 
+import argparse
+import io
 import logging
+import mmap
 import os
 import re
 import sys
 import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
 
-from matplotlib.backends.backend_pdf import PdfPages  # type: ignore
 from tqdm import tqdm
 
 from completor import create_output, parse, read_schedule, utils
-from completor.constants import Keywords, ScheduleData
+from completor.constants import FormattedWell, Keywords, ScheduleData
 from completor.exceptions.clean_exceptions import CompletorError
 from completor.get_version import get_version
 from completor.icv_file_handling import IcvFileHandling
 from completor.initialization import Initialization
 from completor.initialization_pyaction import InitializationPyaction
 from completor.launch_args_parser import get_parser
-from completor.logger import handle_error_messages, logger
+from completor.logger import (
+    add_stage_timings,
+    handle_error_messages,
+    log_stage_timings,
+    logger,
+    reset_stage_timings,
+    stage_counts,
+    stage_timings,
+)
 from completor.read_casefile import ICVReadCasefile, ReadCasefile
+from completor.schedule_cache import MemoryScheduleCache, ScheduleCache
+from completor.schedule_index import (
+    IncludeFileWriter,
+    ScheduleIndex,
+    ScheduleText,
+    ScheduleWriter,
+    find_missing_keywords,
+)
 from completor.utils import (
+    CaseInput,
     clean_file_lines,
     clean_raw_data,
     completion_keyword_in_file,
-    find_keyword_data,
-    find_well_keyword_data,
     icvc_keyword_in_file,
-    replace_preprocessing_names,
 )
+from completor.well_cache import WellCache
 from completor.wells import Well
 
+if TYPE_CHECKING:
+    from matplotlib.backends.backend_pdf import PdfPages  # type: ignore
+
+# Case and schedule data of a worker process, sent once when the worker starts rather than with every well.
+_worker_data: tuple[ReadCasefile, ScheduleData] | None = None
 
-def get_content_and_path(case_content: str, file_path: str | None, keyword: str) -> tuple[str | None, str | None]:
+
+def get_content_and_path(
+    case_content: str | CaseInput, file_path: str | None, keyword: str, read_file: bool = True
+) -> tuple[str | None, str | None]:
     """Get the contents of a file from a path defined by user or case file.
 
     The method prioritizes paths given as input argument over the paths found in the case file.
 
     Args:
-        case_content: The case file content.
+        case_content: The case file content, or the case input.
         file_path: Path to file if given.
         keyword: Reservoir simulator keyword.
+        read_file: Flag indicating if the file is to be read. If not, only its path is resolved.
 
     Returns:
-        File content, file path.
+        File content (None if not read), file path.
 
     Raises:
         CompletorError: If the keyword or file cannot be found.
     """
     if file_path is None:
         # Find the path/name of file from case file
-        case_file_lines = clean_file_lines(case_content.splitlines())
+        if isinstance(case_content, CaseInput):
+            case_file_lines = list(case_content.lines)
+        else:
+            case_file_lines = clean_file_lines(case_content.splitlines())
         start_idx, end_idx = parse.locate_keyword(case_file_lines, keyword)
         # If the keyword is defined correctly
         if end_idx == start_idx + 2:
@@ -65,6 +98,10 @@ def get_content_and_path(case_content: str, file_path: str | None, keyword: str)
             if keyword == Keywords.OUT_FILE:
                 return None, None
             raise CompletorError(f"The keyword {keyword} is not defined correctly in the casefile")
+    if keyword != Keywords.OUT_FILE and not read_file:
+        if not os.path.isfile(file_path):
+            raise CompletorError(f"Could not find the file: '{file_path}'!")
+        return None, file_path
     if keyword != Keywords.OUT_FILE:
         try:
             with open(file_path, encoding="utf-8") as file:
@@ -79,29 +116,102 @@ def get_content_and_path(case_content: str, file_path: str | None, keyword: str)
     return None, file_path
 
 
+def read_schedule_data(schedule_index: ScheduleIndex) -> ScheduleData:
+    """Parse the data of each well from the WELSPECS, COMPDAT, WELSEGS, and COMPSEGS blocks of a schedule.
+
+    Args:
+        schedule_index: Index of the schedule.
+
+    Returns:
+        The data of each well, by keyword.
+    """
+    schedule_data: ScheduleData = {}
+    for chunk in schedule_index.keyword_data(Keywords.WELL_SPECIFICATION):
+        clean_data = clean_raw_data(chunk, Keywords.WELL_SPECIFICATION)
+        schedule_data = read_schedule.set_welspecs(schedule_data, clean_data)
+
+    for chunk in schedule_index.keyword_data(Keywords.COMPLETION_DATA):
+        clean_data = clean_raw_data(chunk, Keywords.COMPLETION_DATA)
+        schedule_data = read_schedule.set_compdat(schedule_data, clean_data)
+
+    for chunk in schedule_index.keyword_data(Keywords.WELL_SEGMENTS):
+        clean_data = clean_raw_data(chunk, Keywords.WELL_SEGMENTS)
+        schedule_data = read_schedule.set_welsegs(schedule_data, clean_data)
+
+    for chunk in schedule_index.keyword_data(Keywords.COMPLETION_SEGMENTS):
+        clean_data = clean_raw_data(chunk, Keywords.COMPLETION_SEGMENTS)
+        schedule_data = read_schedule.set_compsegs(schedule_data, clean_data)
+    return schedule_data
+
+
+@contextmanager
+def memory_map(file_path: str) -> Iterator[mmap.mmap | bytes]:
+    """Memory-map a file for reading.
+
+    Args:
+        file_path: Path to the file.
+
+    Yields:
+        The memory-mapped file, or empty bytes if the file is empty, since empty files cannot be memory-mapped.
+    """
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            yield mapped_file
+
+
 def create(
-    case_file: str, schedule: str, new_file: str, show_fig: bool = False, paths: tuple[str, str] | None = None
+    case_file: str,
+    schedule: ScheduleText,
+    new_file: str,
+    show_fig: bool = False,
+    paths: tuple[str, str] | None = None,
+    schedule_cache: ScheduleCache | MemoryScheduleCache | None = None,
+    jobs: int = 1,
+    include_directory: str | None = None,
+    well_cache: WellCache | None = None,
+    output: TextIO | None = None,
+    include_root: str | None = None,
 ) -> tuple[ReadCasefile, Well | None, list[tuple[str, int]]]:
     """Create and write the advanced schedule file from input case- and schedule files.
 
     Args:
         case_file: Input case file.
-        schedule: Input schedule file.
+        schedule: Input schedule file, either its content or the memory-mapped file.
         new_file: Output schedule file.
         show_fig: Flag indicating if a figure is to be shown.
         paths: Optional additional paths.
+        schedule_cache: Cache of parsed schedule data to read from and add to, if any.
+        jobs: Number of processes to format the wells in. Wells are formatted in this process if 1, or if figures
+            are to be shown.
+        include_directory: Directory to write the WELSEGS and COMPSEGS keywords of each well to as include files, if
+            any. Otherwise they are written to the output schedule.
+        well_cache: Cache of the output of each well to read from and add to, if any. Wells with the same
+            fingerprint as in an earlier run are not created again.
+        output: Stream to write the output schedule to instead of `new_file`, e.g. for a further pass to finish. The
+            output thus far is still written to `new_file` if creating it fails.
+        include_root: Directory the paths of the include files are relative to, i.e. that of the DATA file of the
+            reservoir simulator. The paths are absolute if None.
 
     Returns:
         - ReadCasefile object.
-        - Well object or None if no well was found.
+        - The last Well object created, or None if no well was found or created, or the wells were created in
+          worker processes.
         - Well segment list or None if no update of segment list.
     """
-    case = ReadCasefile(case_file=case_file, schedule_file=schedule, output_file=new_file)
+    reset_stage_timings()
+    # The schedule is not kept by the case, so it is not copied to the worker processes along with it.
+    case = ReadCasefile(case_file=case_file, output_file=new_file)
     active_wells = utils.get_active_wells(case.completion_table, case.gp_perf_devicelayer)
     well_segment_list: list[tuple[str, int]] = []
     pdf = None
     figure_name = None
     if show_fig:
+        # Plotting takes most of the start-up time of Completor, so it is only loaded when figures are made.
+        from matplotlib.backends.backend_pdf import PdfPages  # type: ignore
+
         figure_no = 1
         figure_name = f"Well_schematic_{figure_no:03d}.pdf"
         while os.path.isfile(figure_name):
@@ -111,75 +221,175 @@ def create(
 
     err: Exception | None = None
     well = None
-    # Add banner.
-    schedule = create_output.metadata_banner(paths) + schedule
-    # Strip trailing whitespace.
-    schedule = re.sub(r"[^\S\r\n]+$", "", schedule, flags=re.MULTILINE)
     meaningful_data: ScheduleData = {}
 
     well_segment_list = []
-    try:
-        # Find the old data for each of the four main keywords.
-        for chunk in find_keyword_data(Keywords.WELL_SPECIFICATION, schedule):
-            clean_data = clean_raw_data(chunk, Keywords.WELL_SPECIFICATION)
-            meaningful_data = read_schedule.set_welspecs(meaningful_data, clean_data)
-
-        for chunk in find_keyword_data(Keywords.COMPLETION_DATA, schedule):
-            clean_data = clean_raw_data(chunk, Keywords.COMPLETION_DATA)
-            meaningful_data = read_schedule.set_compdat(meaningful_data, clean_data)
-
-        for chunk in find_keyword_data(Keywords.WELL_SEGMENTS, schedule):
-            clean_data = clean_raw_data(chunk, Keywords.WELL_SEGMENTS)
-            meaningful_data = read_schedule.set_welsegs(meaningful_data, clean_data)
-
-        for chunk in find_keyword_data(Keywords.COMPLETION_SEGMENTS, schedule):
-            clean_data = clean_raw_data(chunk, Keywords.COMPLETION_SEGMENTS)
-            meaningful_data = read_schedule.set_compsegs(meaningful_data, clean_data)
-        for i, well_name in tqdm(enumerate(active_wells.tolist()), total=len(active_wells), file=sys.stdout):
+    # The output is written as the wells are done, by replacing their records in the original schedule.
+    # Trailing whitespace is stripped as the schedule is read and written, so the schedule itself is never copied.
+    with open(new_file, "w", encoding="utf-8") if output is None else nullcontext(output) as file:
+        if include_directory is None:
+            schedule_writer = ScheduleWriter(schedule, file, case.mapper)
+        else:
+            schedule_writer = IncludeFileWriter(schedule, file, include_directory, include_root, case.mapper)
+        schedule_writer.insert(0, create_output.metadata_banner(paths))
+        try:
+            # Locate the old data for each of the four main keywords, and for each well, in one pass.
+            schedule_index = ScheduleIndex(schedule)
+            cache_key = None if schedule_cache is None else schedule_cache.key(schedule)
+            cached_data = None if schedule_cache is None else schedule_cache.load(cache_key)
+            if cached_data is None:
+                meaningful_data = read_schedule_data(schedule_index)
+                if schedule_cache is not None:
+                    schedule_cache.store(cache_key, meaningful_data)
+            else:
+                meaningful_data = cached_data
+            wells = list(enumerate(active_wells.tolist()))
+            schedule_writer.expect_wells(schedule_index, [well_name for _, well_name in wells])
+            # Wells with the same fingerprint as in an earlier run get the output of that run, unless figures are drawn.
+            well_keys: dict[str, str] = {}
+            reused_wells: dict[str, FormattedWell] = {}
+            if well_cache is not None and pdf is None:
+                for i, well_name in wells:
+                    if well_name in meaningful_data:
+                        well_keys[well_name] = well_cache.key(case, well_name, i, meaningful_data[well_name])
+                        formatted_well = well_cache.load(well_keys[well_name])
+                        if formatted_well is not None:
+                            reused_wells[well_name] = formatted_well
+                logger.info("Reusing the output of %d of %d wells from an earlier run.", len(reused_wells), len(wells))
+            new_wells = [(i, well_name) for i, well_name in wells if well_name not in reused_wells]
+            executor = None
+            if jobs > 1 and pdf is None and len(new_wells) > 1:
+                # Only the data of the active wells is sent to the workers.
+                active_data = {
+                    well_name: meaningful_data[well_name] for _, well_name in new_wells if well_name in meaningful_data
+                }
+                executor = ProcessPoolExecutor(
+                    max_workers=min(jobs, len(new_wells)),
+                    initializer=_init_worker,
+                    initargs=(case, active_data, logger.level),
+                )
+                # Results are returned in the order of the wells, regardless of which worker finishes first.
+                results = _merge_worker_timings(executor.map(_format_well_in_worker, new_wells))
+            else:
+                results = (format_well(well_name, i, case, meaningful_data, pdf) for i, well_name in new_wells)
             try:
-                well = Well(well_name, i, case, meaningful_data[well_name])
-            except KeyError:
-                logger.warning(f"Well '{well_name}' is written in case file but does not exist in schedule file.")
-                continue
-            compdat, welsegs, compsegs, bonus, df_icv = create_output.format_output(well, case, pdf)
-            if len(df_icv) > 0:
-                get_icv_segment(well_segment_list, df_icv)
-            for keyword in [Keywords.COMPLETION_SEGMENTS, Keywords.WELL_SEGMENTS, Keywords.COMPLETION_DATA]:
-                old_data = find_well_keyword_data(well_name, keyword, schedule)
-                if not old_data:
-                    raise CompletorError(
-                        "Could not find the unmodified data in original schedule file. Please contact the team!"
+                for _, well_name in tqdm(wells, file=sys.stdout):
+                    if well_name in reused_wells:
+                        formatted_well = reused_wells[well_name]
+                    else:
+                        result = next(results)
+                        if result is None:
+                            schedule_writer.skip_well(well_name)
+                            continue
+                        well, formatted_well = result
+                        if well_cache is not None and well_name in well_keys:
+                            well_cache.store(well_keys[well_name], formatted_well)
+                    compdat, welsegs, compsegs, bonus, df_icv = formatted_well
+                    if len(df_icv) > 0:
+                        get_icv_segment(well_segment_list, df_icv)
+                    schedule_writer.add_well(
+                        well_name,
+                        [
+                            (Keywords.COMPLETION_SEGMENTS, compsegs + bonus),
+                            (Keywords.WELL_SEGMENTS, welsegs),
+                            (Keywords.COMPLETION_DATA, compdat),
+                        ],
                     )
-                try:
-                    # Check that nothing is lost.
-                    schedule.index(old_data)
-                except ValueError:
-                    raise CompletorError("Could not match the old data to schedule file. Please contact the team!")
-
-                match keyword:
-                    case Keywords.COMPLETION_DATA:
-                        schedule = schedule.replace(old_data, compdat)
-                    case Keywords.COMPLETION_SEGMENTS:
-                        schedule = schedule.replace(old_data, compsegs + bonus)
-                    case Keywords.WELL_SEGMENTS:
-                        schedule = schedule.replace(old_data, welsegs)
-
-    except Exception as e_:
-        err = e_
-    finally:
-        # Make sure the output thus far is written, and figure files are closed.
-        schedule = replace_preprocessing_names(schedule, case.mapper)
-        with open(new_file, "w", encoding="utf-8") as file:
-            file.write(schedule)
-        if pdf is not None:
-            pdf.close()
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+
+        except Exception as e_:
+            err = e_
+        finally:
+            # Make sure the output thus far is written, and figure files are closed.
+            schedule_writer.close()
+            if pdf is not None:
+                pdf.close()
+            log_stage_timings()
 
     if err is not None:
+        if isinstance(output, io.StringIO):
+            with open(new_file, "w", encoding="utf-8") as file:
+                file.write(output.getvalue())
         raise err
 
     return case, well, well_segment_list
 
 
+def format_well(
+    well_name: str, well_number: int, case: ReadCasefile, schedule_data: ScheduleData, pdf: PdfPages | None = None
+) -> tuple[Well, FormattedWell] | None:
+    """Create a well, and format its output.
+
+    Args:
+        well_name: Well name.
+        well_number: Well number.
+        case: Case data.
+        schedule_data: The data of the wells from the schedule file.
+        pdf: The figure file to draw the well in, if any.
+
+    Returns:
+        The well and its formatted output, or None if the well is not in the schedule file.
+    """
+    try:
+        well = Well(well_name, well_number, case, schedule_data[well_name])
+    except KeyError:
+        logger.warning(f"Well '{well_name}' is written in case file but does not exist in schedule file.")
+        return None
+    return well, create_output.format_output(well, case, pdf)
+
+
+def _init_worker(case: ReadCasefile, schedule_data: ScheduleData, loglevel: int) -> None:
+    """Keep the case and schedule data in a worker process, for every well it formats.
+
+    Args:
+        case: Case data.
+        schedule_data: The data of the active wells from the schedule file.
+        loglevel: Log level of the main process.
+    """
+    global _worker_data
+    _worker_data = (case, schedule_data)
+    logger.setLevel(loglevel)
+
+
+def _format_well_in_worker(task: tuple[int, str]) -> tuple[FormattedWell | None, dict[str, int], dict[str, float]]:
+    """Format a well in a worker process.
+
+    Only the formatted output is sent back, as the well itself is much larger and not needed by the main process.
+
+    Args:
+        task: Well number and well name.
+
+    Returns:
+        The formatted output of the well, or None if the well is not in the schedule file,
+        and the stage timings of the well.
+    """
+    assert _worker_data is not None, "Worker process was not initialized."
+    case, schedule_data = _worker_data
+    well_number, well_name = task
+    reset_stage_timings()
+    result = format_well(well_name, well_number, case, schedule_data)
+    return None if result is None else result[1], dict(stage_counts), dict(stage_timings)
+
+
+def _merge_worker_timings(
+    results: Iterator[tuple[FormattedWell | None, dict[str, int], dict[str, float]]]
+) -> Iterator[tuple[None, FormattedWell] | None]:
+    """Add the stage timings of the wells formatted in worker processes to those of this process.
+
+    Args:
+        results: Results of `_format_well_in_worker`.
+
+    Yields:
+        No well, as it stays in the worker process, and the formatted output of the well, or None if the well is not
+        in the schedule file.
+    """
+    for formatted_well, counts, timings in results:
+        add_stage_timings(counts, timings)
+        yield None if formatted_well is None else (None, formatted_well)
+
+
 def get_icv_segment(well_segment_list, icv_dataframe):
     for row in range(len(icv_dataframe)):
         well_name = icv_dataframe.iloc[row]["WELL"]
@@ -206,57 +416,114 @@ def main() -> None:
     loglevel = 1 if loglevel == 0 else loglevel
 
     logger.setLevel(loglevel)
+    run(inputs)
+
 
-    # Open the case file
-    if inputs.inputfile is not None:
-        with open(inputs.inputfile, encoding="utf-8") as file:
-            case_file_content = file.read()
+def run(inputs: argparse.Namespace, schedule_cache: ScheduleCache | MemoryScheduleCache | None = None) -> str:
+    """Generate a Completor output schedule file from the command line arguments.
+
+    Args:
+        inputs: The command line arguments. The paths of the schedule and output files are filled in if not given.
+        schedule_cache: Cache of parsed schedule data shared with other runs, if any. Otherwise the schedule cache in
+            the cache directory given by the arguments is used, if any.
+
+    Returns:
+        The path of the output schedule file.
+
+    Raises:
+        CompletorError: If input schedule file is not defined as input or in case file.
+    """
+    # Read the case file once, everything below uses its content and the keywords found in it.
+    case_input = CaseInput.from_file(inputs.inputfile)
+    has_icv_control = icvc_keyword_in_file(case_input)
 
     schedule_file_content, inputs.schedulefile = get_content_and_path(
-        case_file_content, inputs.schedulefile, Keywords.SCHEDULE_FILE
+        case_input, inputs.schedulefile, Keywords.SCHEDULE_FILE, read_file=not inputs.stream
     )
     # If ICVC exists, it should not be mandatory to have whole schedule files
     # Check on both schedule and case files first
-    if completion_keyword_in_file(inputs.inputfile) and not icvc_keyword_in_file(inputs.inputfile):
-        if isinstance(schedule_file_content, str):
-            parse.read_schedule_keywords(clean_file_lines(schedule_file_content.splitlines()), Keywords.main_keywords)
+    check_schedule_keywords = completion_keyword_in_file(case_input) and not has_icv_control
+    if check_schedule_keywords and isinstance(schedule_file_content, str):
+        parse.read_schedule_keywords(clean_file_lines(schedule_file_content.splitlines()), Keywords.main_keywords)
 
-    _, inputs.outputfile = get_content_and_path(case_file_content, inputs.outputfile, Keywords.OUT_FILE)
+    _, inputs.outputfile = get_content_and_path(case_input, inputs.outputfile, Keywords.OUT_FILE)
 
     if inputs.outputfile is None:
         if inputs.schedulefile is None:
             raise ValueError("Could not find a path to schedule file. It must be provided as a input argument.")
         inputs.outputfile = inputs.schedulefile.split(".")[0] + "_advanced.wells"
 
+    if inputs.stream and os.path.exists(inputs.outputfile) and os.path.samefile(inputs.outputfile, inputs.schedulefile):
+        raise CompletorError(
+            "The output schedule file cannot be the schedule file with --stream, which reads the schedule file while "
+            "the output is written."
+        )
+
+    if inputs.include_root is not None and inputs.include_dir is None:
+        raise CompletorError("The paths of the include files can only be made relative if --include-dir is given.")
+
+    if inputs.include_dir is not None and has_icv_control:
+        raise CompletorError(
+            "Include files cannot be used with ICV-control, which reads the WELSEGS keywords from the output schedule."
+        )
+
     paths_input_schedule = (inputs.inputfile, inputs.schedulefile)
+    if schedule_cache is None and inputs.cache_dir is not None:
+        schedule_cache = ScheduleCache(inputs.cache_dir, inputs.cache_size * 1024**2)
+    well_cache = None
+    if inputs.incremental:
+        if inputs.cache_dir is None:
+            raise CompletorError("The output of the wells can only be reused between runs if --cache-dir is given.")
+        well_cache = WellCache(Path(inputs.cache_dir) / "wells", inputs.cache_size * 1024**2)
 
     logger.info("Running Completor version %s. An advanced well modelling tool.", get_version())
     logger.debug("-" * 60)
     start_a = time.time()
+    # The output of Completor is the input of ICV-control, so it is kept in memory and written once, by ICV-control.
+    output = io.StringIO() if has_icv_control else None
+
+    # In streaming mode the schedule is memory-mapped, and only the keyword blocks Completor reads are decoded.
+    with memory_map(inputs.schedulefile) if inputs.stream else nullcontext(schedule_file_content) as schedule:
+        if inputs.stream and check_schedule_keywords:
+            missing_keywords = find_missing_keywords(schedule, Keywords.main_keywords)
+            if missing_keywords:
+                raise CompletorError(f"Keyword {missing_keywords[0]} is not found")
+        case, well, well_start_segments = handle_error_messages(create)(
+            case_input.content,
+            schedule,
+            inputs.outputfile,
+            inputs.figure,
+            paths=paths_input_schedule,
+            schedule_cache=schedule_cache,
+            jobs=inputs.jobs,
+            include_directory=inputs.include_dir,
+            include_root=inputs.include_root,
+            well_cache=well_cache,
+            output=output,
+        )
+    if output is not None:
+        # Start running ICV Control, on the output schedule of Completor.
+        inputs.schedulefile = os.path.abspath(inputs.outputfile)
+        # Line endings are normalized, as when reading the output schedule from file.
+        schedule_content = output.getvalue()
+        if "\r" in schedule_content:
+            schedule_content = schedule_content.replace("\r\n", "\n").replace("\r", "\n")
+        inputs.outputfile, inputs.outputdirectory = get_output_filename_and_directory(inputs)
 
-    case, well, well_start_segments = handle_error_messages(create)(
-        case_file_content, schedule_file_content, inputs.outputfile, inputs.figure, paths=paths_input_schedule
-    )
-    if icvc_keyword_in_file(inputs.inputfile):
-        # start running ICV Control
-        # the input schedule file to second run of ICV Control is the output file from Completor
-        # therefore
-
-        inputs.schedulefile = inputs.outputfile
-        inputs.schedulefile = os.path.abspath(inputs.schedulefile)
-
-        if inputs.outputfile is not None:
-
-            schedule_content, inputs.schedulefile = get_content_and_path(
-                case_file_content, inputs.schedulefile, Keywords.SCHEDULE_FILE
-            )
-            inputs.outputfile, inputs.outputdirectory = get_output_filename_and_directory(inputs)
-
-            if inputs.inputfile is not None:
-                create_icvc(case_file_content, schedule_content, inputs, well_start_segments)
+        try:
+            create_icvc(case_input.content, schedule_content, inputs, well_start_segments)
+        except (Exception, SystemExit):
+            # Make sure the output of Completor is written, as it is when creating the output fails.
+            with open(inputs.schedulefile, "w", encoding="utf-8") as file:
+                file.write(output.getvalue())
+            raise
+        output_file = os.path.join(inputs.outputdirectory, inputs.outputfile)
+    else:
+        output_file = inputs.outputfile
 
     logger.debug("Total runtime: %d", (time.time() - start_a))
     logger.debug("-" * 60)
+    return output_file
 
 
 def get_output_filename_and_directory(inputs) -> tuple[str, str]:
@@ -298,6 +565,7 @@ def create_icvc(case_content: str, schedule_content: str | None, inputs, new_seg
         "output_file_name": inputs.outputfile,
         "output_directory": inputs.outputdirectory,
         "schedule_file_path": inputs.schedulefile,
+        "schedule_content": schedule_content,
         "input_case_file": inputs.inputfile,
     }
     IcvFileHandling(file_data, initials, initials_pyaction)
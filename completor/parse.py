@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import bisect
 import re
 from copy import deepcopy
 from typing import Literal, overload
@@ -113,6 +114,66 @@ def locate_keyword(
     return start_index, end_index
 
 
+class KeywordIndex:
+    """Index of the start and end of every keyword in the lines of a file.
+
+    The lines are read once, so each keyword is looked up without searching the lines again, unlike
+    `locate_keyword`. Keywords end at a line with '/' only, and their start and end are the same as found by
+    `locate_keyword` with its default end_char.
+    """
+
+    def __init__(self, content: list[str]):
+        """Index the lines of a file.
+
+        Args:
+            content: List of strings.
+        """
+        self._content_length = len(content)
+        self._line_numbers: dict[str, list[int]] = {}
+        for line_number, line in enumerate(content):
+            self._line_numbers.setdefault(line, []).append(line_number)
+        self._end_line_numbers = self._line_numbers.get("/", [])
+
+    def spans(self, keyword: str) -> list[tuple[int, int]]:
+        """Find the start and end of every occurrence of a keyword.
+
+        Args:
+            keyword: Keyword name.
+
+        Returns:
+            The line numbers of the keyword and of its end, for each occurrence.
+
+        Raises:
+            CompletorError: If keyword had no end record.
+        """
+        spans = []
+        for start in self._line_numbers.get(keyword, []):
+            end_number = bisect.bisect_right(self._end_line_numbers, start)
+            if end_number < len(self._end_line_numbers):
+                spans.append((start, self._end_line_numbers[end_number]))
+            elif start == self._content_length - 1:
+                # A keyword on the last line ends after the file, as in locate_keyword.
+                spans.append((start, self._content_length))
+            else:
+                raise CompletorError(f"Keyword {keyword} has no end record")
+        return spans
+
+    def locate(self, keyword: str) -> tuple[int, int]:
+        """Find the start and end of the first occurrence of a keyword.
+
+        Args:
+            keyword: Keyword name.
+
+        Returns:
+            The line numbers of the keyword and of its end, or -1 for both if the keyword is not found.
+
+        Raises:
+            CompletorError: If keyword had no end record.
+        """
+        spans = self.spans(keyword)
+        return spans[0] if spans else (-1, -1)
+
+
 def take_first_record(
     start_index: list[float] | npt.NDArray[np.float64], end_index: list[float] | npt.NDArray[np.float64]
 ) -> tuple[float | int, float | int]:
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import math
-from collections.abc import MutableMapping
 from pathlib import Path
 from typing import Any
 
@@ -12,6 +11,7 @@ import pandas as pd
 from completor.constants import Content, Headers, Keywords
 from completor.exceptions.clean_exceptions import CompletorError
 from completor.logger import logger
+from completor.record_writer import COLUMN_FORMATS, UnsupportedTable, format_records, format_rows
 from completor.utils import check_width_lines
 from completor.wells import Lateral, Well
 
@@ -73,16 +73,24 @@ def dataframe_tostring(
 ) -> str:
     """Convert DataFrame to string.
 
+    Tables are written by the record writer, and only fall back to pandas for values it does not support.
+
     Args:
         df_temp: COMPLETION_DATA, COMPLETION_SEGMENTS, etc.
         format_column: If columns are to be formatted.
         trim_df: To trim or not to trim. Default: True.
         header: Keep header (True) or not (False).
+        keep_header: Keep the header lines in the text returned.
         limit: Limit width of DataFrame.
 
     Returns:
         Text string of the DataFrame.
     """
+    try:
+        return format_records(df_temp, format_column, trim_df, header, keep_header, limit)
+    except UnsupportedTable as err:
+        logger.debug("Writing table with pandas: %s", err)
+
     number_of_levels = 1
     if df_temp.empty:
         return ""
@@ -101,46 +109,11 @@ def dataframe_tostring(
     if Headers.WELL in df_temp.columns:
         df_temp[Headers.WELL] = "'" + df_temp[Headers.WELL].astype(str) + "'"
 
-    formatters: MutableMapping[Any, Any] = {}
     if format_column:
-        formatters = {
-            Headers.STRENGTH: "{:.10g}".format,
-            Headers.SCALE_FACTOR: "{:.10g}".format,
-            Headers.ROUGHNESS: "{:.10g}".format,
-            Headers.CONNECTION_FACTOR: "{:.10g}".format,
-            "CONNECTION_FACTOR": "{:.10g}".format,
-            Headers.FORMATION_PERMEABILITY_THICKNESS: "{:.10g}".format,
-            "FORMATION_PERMEABILITY_THICKNESS": "{:.10g}".format,
-            Headers.MEASURED_DEPTH: "{:.3f}".format,
-            "MD": "{:.3f}".format,
-            Headers.TRUE_VERTICAL_DEPTH: "{:.3f}".format,
-            "TVD": "{:.3f}".format,
-            Headers.START_MEASURED_DEPTH: "{:.3f}".format,
-            "START_MD": "{:.3f}".format,
-            Headers.END_MEASURED_DEPTH: "{:.3f}".format,
-            "END_MD": "{:.3f}".format,
-            Headers.FLOW_COEFFICIENT: "{:.10g}".format,
-            "CV": "{:.10g}".format,
-            Headers.CROSS: "{:.3e}".format,
-            Headers.FLOW_CROSS_SECTIONAL_AREA: "{:.3e}".format,
-            "FLOW_CROSS_SECTIONAL_AREA": "{:.3e}".format,
-            Headers.OIL_FLOW_CROSS_SECTIONAL_AREA: "{:.3e}".format,
-            Headers.GAS_FLOW_CROSS_SECTIONAL_AREA: "{:.3e}".format,
-            Headers.WATER_FLOW_CROSS_SECTIONAL_AREA: "{:.3e}".format,
-            Headers.MAX_FLOW_CROSS_SECTIONAL_AREA: "{:.3e}".format,
-            Headers.DEFAULTS: "{:.10s}".format,
-            Headers.WATER_HOLDUP_FRACTION_LOW_CUTOFF: "{:.10g}".format,
-            Headers.WATER_HOLDUP_FRACTION_HIGH_CUTOFF: "{:.10g}".format,
-            Headers.GAS_HOLDUP_FRACTION_LOW_CUTOFF: "{:.10g}".format,
-            Headers.GAS_HOLDUP_FRACTION_HIGH_CUTOFF: "{:.10g}".format,
-            Headers.ALPHA_MAIN: "{:.10g}".format,
-            Headers.ALPHA_PILOT: "{:.10g}".format,
-        }
-
         # Cast floats to str befor headers are messed up (pandas formatter does not work reliably with MultiIndex headers).
-        for column, formatter in formatters.items():
+        for column, format_spec in COLUMN_FORMATS.items():
             try:
-                df_temp[column] = df_temp[column].map(formatter)
+                df_temp[column] = df_temp[column].map(format_spec.format)
             except (KeyError, ValueError):
                 pass
 
@@ -149,31 +122,6 @@ def dataframe_tostring(
             column_splits = [tuple(column.split("_")) for column in df_temp.columns]
             number_of_levels = max([len(tup) for tup in column_splits])
             if number_of_levels > 1:
-                formatters.update(
-                    {
-                        ("SCALE", "FACTOR"): "{:.10g}".format,
-                        ("CONNECTION", "FACTOR"): "{:.10g}".format,
-                        ("FORMATION", "PERMEABILITY", "THICKNESS"): "{:.10g}".format,
-                        ("MEASURED", "DEPTH"): "{:.3f}".format,
-                        ("TRUE", "VERTICAL", "DEPTH"): "{:.3f}".format,
-                        ("START", "MEASURED", "DEPTH"): "{:.3f}".format,
-                        ("START", "MD"): "{:.3f}".format,
-                        ("END", "MEASURED", "DEPTH"): "{:.3f}".format,
-                        ("END", "MD"): "{:.3f}".format,
-                        ("FLOW", "COEFFICIENT"): "{:.10g}".format,
-                        ("FLOW", "CROSS", "SECTIONAL", "AREA"): "{:.3e}".format,
-                        ("OIL", "FLOW", "CROSS", "SECTIONAL", "AREA"): "{:.3e}".format,
-                        ("GAS", "FLOW", "CROSS", "SECTIONAL", "AREA"): "{:.3e}".format,
-                        ("WATER", "FLOW", "CROSS", "SECTIONAL", "AREA"): "{:.3e}".format,
-                        ("MAX", "FLOW", "CROSS", "SECTIONAL", "AREA"): "{:.3e}".format,
-                        ("WATER", "HOLDUP", "FRACTION", "LOW", "CUTOFF"): "{:.10g}".format,
-                        ("WATER", "HOLDUP", "FRACTION", "HIGH", "CUTOFF"): "{:.10g}".format,
-                        ("GAS", "HOLDUP", "FRACTION", "LOW", "CUTOFF"): "{:.10g}".format,
-                        ("GAS", "HOLDUP", "FRACTION", "HIGH", "CUTOFF"): "{:.10g}".format,
-                        ("ALPHA", "MAIN"): "{:.10g}".format,
-                        ("ALPHA", "PILOT"): "{:.10g}".format,
-                    }
-                )
                 if column_splits[0][0].startswith("--"):
                     # Make sure each level is commented out!
                     column_splits[0] = tuple(["--"] * number_of_levels)
@@ -217,15 +165,79 @@ def dataframe_tostring(
     return "\n".join(output_string.splitlines()[number_of_levels:])
 
 
+def sort_layer(
+    reference_md: npt.NDArray[np.float64] | list[float], *reference_segment_numbers: npt.NDArray[np.float64] | list[int]
+) -> tuple[npt.NDArray[np.float64], list[npt.NDArray[np.int64]]]:
+    """Sort the segments of a layer by measured depth, to find outlet segments in it with `nearest_segment`.
+
+    Args:
+        reference_md: Reference measured depth.
+        reference_segment_numbers: One or more reference segment numbers, e.g. of the segments and their outlets.
+
+    Returns:
+        The sorted measured depths, and each of the segment numbers in the same order.
+    """
+    reference_md = np.asarray(reference_md, dtype=np.float64)
+    # The default sort, as used by DataFrame.sort_values, decides which of several segments at the same depth is chosen.
+    order = np.argsort(reference_md)
+    return reference_md[order], [np.asarray(segments)[order].astype(np.int64) for segments in reference_segment_numbers]
+
+
+def nearest_segment(
+    target_md: npt.NDArray[np.float64] | list[float],
+    sorted_md: npt.NDArray[np.float64],
+    target_group: npt.NDArray[np.int64] | None = None,
+    sorted_group: npt.NDArray[np.int64] | None = None,
+) -> npt.NDArray[np.intp]:
+    """Find the positions of the nearest measured depths in a sorted layer.
+
+    If a target is equally far from two measured depths, the shallower one is chosen.
+    If several segments have the nearest measured depth, the last one before it or the first one after it is chosen.
+    If groups are given, e.g. annular zones, only the segments in the group of each target are searched.
+
+    Args:
+        target_md: Target measured depth.
+        sorted_md: The sorted measured depths of the layer, from `sort_layer`.
+        target_group: Group of each target, if any.
+        sorted_group: Group of each segment of the layer, if any. The layer must be sorted by group, then by depth.
+
+    Returns:
+        Positions in the sorted layer.
+    """
+    target_md = np.asarray(target_md, dtype=np.float64)
+    if target_group is None or sorted_group is None:
+        target_key: npt.NDArray[Any] = target_md
+        sorted_key: npt.NDArray[Any] = sorted_md
+    else:
+        # Search for the rank of each depth within its group, so the search never crosses into another group.
+        _, rank = np.unique(np.concatenate([sorted_md, target_md]), return_inverse=True)
+        number_of_ranks = len(rank) + 1
+        sorted_key = sorted_group * number_of_ranks + rank[: len(sorted_md)]
+        target_key = target_group * number_of_ranks + rank[len(sorted_md) :]
+    # The last segment at or above the target, and the first segment at or below it.
+    above = np.searchsorted(sorted_key, target_key, side="right") - 1
+    below = np.searchsorted(sorted_key, target_key, side="left")
+    above_distance = target_md - sorted_md[np.maximum(above, 0)]
+    below_distance = sorted_md[np.minimum(below, len(sorted_md) - 1)] - target_md
+    has_above = above >= 0
+    has_below = below < len(sorted_md)
+    if target_group is not None and sorted_group is not None:
+        has_above &= sorted_group[np.maximum(above, 0)] == target_group
+        has_below &= sorted_group[np.minimum(below, len(sorted_md) - 1)] == target_group
+    use_above = has_above & (~has_below | (above_distance <= below_distance))
+    return np.where(use_above, above, below)
+
+
 def get_outlet_segment(
     target_md: npt.NDArray[np.float64] | list[float],
     reference_md: npt.NDArray[np.float64] | list[float],
     reference_segment_number: npt.NDArray[np.float64] | list[int],
-) -> npt.NDArray[np.float64]:
+) -> npt.NDArray[np.int64]:
     """Find the outlet segment in the other layers.
 
     For example: Find the corresponding tubing segment of the device segment,
     or the corresponding device segment of the annulus segment.
+    Use `sort_layer` and `nearest_segment` to find outlet segments in the same layer more than once.
 
     Args:
         target_md: Target measured depth.
@@ -235,20 +247,8 @@ def get_outlet_segment(
     Returns:
         The outlet segments.
     """
-    df_target_md = pd.DataFrame(target_md, columns=[Headers.MEASURED_DEPTH])
-    df_reference = pd.DataFrame(
-        np.column_stack((reference_md, reference_segment_number)),
-        columns=[Headers.MEASURED_DEPTH, Headers.START_SEGMENT_NUMBER],
-    )
-    df_reference[Headers.START_SEGMENT_NUMBER] = df_reference[Headers.START_SEGMENT_NUMBER].astype(np.int64)
-    df_reference.sort_values(by=[Headers.MEASURED_DEPTH], inplace=True)
-    return (
-        pd.merge_asof(left=df_target_md, right=df_reference, on=[Headers.MEASURED_DEPTH], direction="nearest")[
-            Headers.START_SEGMENT_NUMBER
-        ]
-        .to_numpy()
-        .flatten()
-    )
+    sorted_md, (sorted_segments,) = sort_layer(reference_md, reference_segment_number)
+    return sorted_segments[nearest_segment(target_md, sorted_md)]
 
 
 def get_number_of_characters(df: pd.DataFrame) -> int:
@@ -478,6 +478,9 @@ def prepare_annulus_layer(
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Prepare annulus layer and wseglink dataframe.
 
+    Each annular zone is one branch, which flows to the device layer from its first segment. All zones of the
+    lateral are built at once.
+
     Args:
         well_name: Well name.
         df_well: Must contain LATERAL, ANNULUS_ZONE, TUBING_MEASURED_DEPTH, TRUE_VERTICAL_DEPTH, OUTER_DIAMETER,
@@ -489,92 +492,80 @@ def prepare_annulus_layer(
         Annulus DataFrame, wseglink DataFrame.
 
     Raises:
-          CompletorError: If splitting annulus fails.
+          CompletorError: If the first segment of an annular zone has no devices or perforations.
 
     """
-    # filter for this lateral
     # filter segments which have annular zones
     df_well = df_well[df_well[Headers.ANNULUS_ZONE] > 0]
-    # loop through all annular zones
-    # initiate annulus and wseglink dataframe
-    df_annulus = pd.DataFrame()
-    df_well_segments_link = pd.DataFrame()
-    for izone, zone in enumerate(df_well[Headers.ANNULUS_ZONE].unique()):
-        # filter only that annular zone
-        df_branch = df_well[df_well[Headers.ANNULUS_ZONE] == zone]
-        df_active = df_branch[
-            (df_branch[Headers.NUMBER_OF_DEVICES].to_numpy() > 0)
-            | (df_branch[Headers.DEVICE_TYPE].to_numpy() == Content.PERFORATED)
-        ]
-        # setting the start segment number and start branch number
-        if izone == 0:
-            start_segment = max(df_device[Headers.START_SEGMENT_NUMBER]) + 1
-            start_branch = max(df_device[Headers.BRANCH]) + 1
-        else:
-            start_segment = max(df_annulus[Headers.START_SEGMENT_NUMBER]) + 1
-            start_branch = max(df_annulus[Headers.BRANCH]) + 1
-        # now find the most downstream connection of the annulus zone
-        idx_connection = np.argwhere(
-            (df_branch[Headers.NUMBER_OF_DEVICES].to_numpy() > 0)
-            | (df_branch[Headers.DEVICE_TYPE].to_numpy() == Content.PERFORATED)
+    if df_well.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    # Put the segments of each zone together, with the zones in the order they first appear.
+    zones, first_row, zone_number = np.unique(
+        df_well[Headers.ANNULUS_ZONE].to_numpy(), return_index=True, return_inverse=True
+    )
+    zone_number = np.argsort(np.argsort(first_row))[zone_number]
+    row_order = np.argsort(zone_number, kind="stable")
+    df_well = df_well.iloc[row_order]
+    zone_number = zone_number[row_order]
+    zone_start = np.searchsorted(zone_number, np.arange(len(zones)))
+
+    # The most downstream segment of each zone must be connected to the device layer.
+    is_active = (df_well[Headers.NUMBER_OF_DEVICES].to_numpy() > 0) | (
+        df_well[Headers.DEVICE_TYPE].to_numpy() == Content.PERFORATED
+    )
+    if not is_active[zone_start].all():
+        raise CompletorError(
+            "Most likely error is that Completor cannot have open annulus above top reservoir with"
+            " zero valves pr joint. Please contact user support if this is not the case."
         )
-        if idx_connection[0] == 0:
-            # If the first connection then everything is easy
-            df_annulus_upstream, df_well_segments_link_upstream = calculate_upstream(
-                df_branch, df_active, df_device, start_branch, annulus_length, start_segment, well_name
-            )
-        else:
-            # meaning the main connection is not the most downstream segment
-            # therefore we have to split the annulus segment into two
-            # the splitting point is the most downstream segment
-            # which have device segment open or PERF
-            try:
-                df_branch_downstream = df_branch.iloc[0 : idx_connection[0], :]
-                df_branch_upstream = df_branch.iloc[idx_connection[0] :,]
-            except TypeError:
-                raise CompletorError(
-                    "Most likely error is that Completor cannot have open annulus above top reservoir with"
-                    " zero valves pr joint. Please contact user support if this is not the case."
-                )
-            # downstream part
-            df_annulus_downstream = pd.DataFrame()
-            df_annulus_downstream[Headers.START_SEGMENT_NUMBER] = start_segment + np.arange(
-                df_branch_downstream.shape[0]
-            )
-            df_annulus_downstream[Headers.END_SEGMENT_NUMBER] = df_annulus_downstream[Headers.START_SEGMENT_NUMBER]
-            df_annulus_downstream[Headers.BRANCH] = start_branch
-            df_annulus_downstream[Headers.OUT] = df_annulus_downstream[Headers.START_SEGMENT_NUMBER] + 1
-            df_annulus_downstream[Headers.MEASURED_DEPTH] = (
-                df_branch_downstream[Headers.TUBING_MEASURED_DEPTH].to_numpy() + annulus_length
-            )
-            df_annulus_downstream[Headers.TRUE_VERTICAL_DEPTH] = df_branch_downstream[
-                Headers.TRUE_VERTICAL_DEPTH
-            ].to_numpy()
-            df_annulus_downstream[Headers.WELL_BORE_DIAMETER] = df_branch_downstream[Headers.OUTER_DIAMETER].to_numpy()
-            df_annulus_downstream[Headers.ROUGHNESS] = df_branch_downstream[Headers.ROUGHNESS].to_numpy()
-
-            # no WELL_SEGMENTS_LINK in the downstream part because
-            # no annulus segment have connection to
-            # the device segment. in case you wonder why :)
-
-            # upstream part
-            # update the start segment and start branch
-            start_segment = max(df_annulus_downstream[Headers.START_SEGMENT_NUMBER]) + 1
-            start_branch = max(df_annulus_downstream[Headers.BRANCH]) + 1
-            # create dataframe for upstream part
-            df_annulus_upstream, df_well_segments_link_upstream = calculate_upstream(
-                df_branch_upstream, df_active, df_device, start_branch, annulus_length, start_segment, well_name
-            )
-            # combine the two dataframe upstream and downstream
-            df_annulus_upstream = pd.concat([df_annulus_downstream, df_annulus_upstream])
 
-        # combine annulus and wseglink dataframe
-        if izone == 0:
-            df_annulus = df_annulus_upstream.copy(deep=True)
-            df_well_segments_link = df_well_segments_link_upstream.copy(deep=True)
-        else:
-            df_annulus = pd.concat([df_annulus, df_annulus_upstream])
-            df_well_segments_link = pd.concat([df_well_segments_link, df_well_segments_link_upstream])
+    # Segments are numbered after the device layer, and each zone is a new branch.
+    start_segment = max(df_device[Headers.START_SEGMENT_NUMBER]) + 1 + np.arange(df_well.shape[0])
+    # The first segment of a zone flows to the nearest device segment, and the others to the segment before them.
+    device_md, (device_segments,) = sort_layer(
+        df_device[Headers.MEASURED_DEPTH].to_numpy(), df_device[Headers.START_SEGMENT_NUMBER]
+    )
+    tubing_md = df_well[Headers.TUBING_MEASURED_DEPTH].to_numpy()
+    out_segment = start_segment - 1
+    out_segment[zone_start] = device_segments[nearest_segment(tubing_md[zone_start], device_md)]
+    measured_depth = tubing_md + annulus_length
+    measured_depth[zone_start] += annulus_length
+    df_annulus = pd.DataFrame(
+        {
+            Headers.START_SEGMENT_NUMBER: start_segment,
+            Headers.END_SEGMENT_NUMBER: start_segment,
+            Headers.BRANCH: max(df_device[Headers.BRANCH]) + 1 + zone_number,
+            Headers.OUT: out_segment,
+            Headers.MEASURED_DEPTH: measured_depth,
+            Headers.TRUE_VERTICAL_DEPTH: df_well[Headers.TRUE_VERTICAL_DEPTH].to_numpy(),
+            Headers.WELL_BORE_DIAMETER: df_well[Headers.OUTER_DIAMETER].to_numpy(),
+            Headers.ROUGHNESS: df_well[Headers.ROUGHNESS].to_numpy(),
+        },
+        # The rows of each zone are indexed from zero.
+        index=np.arange(df_well.shape[0]) - zone_start[zone_number],
+    )
+
+    # Each active segment links its device segment to the nearest annulus segment of its zone.
+    annulus_order = np.lexsort((measured_depth, zone_number))
+    nearest_annulus = annulus_order[
+        nearest_segment(
+            tubing_md[is_active], measured_depth[annulus_order], zone_number[is_active], zone_number[annulus_order]
+        )
+    ]
+    active_zone = zone_number[is_active]
+    df_well_segments_link = pd.DataFrame(
+        {
+            Headers.WELL: [well_name] * len(active_zone),
+            Headers.ANNULUS: start_segment[nearest_annulus],
+            Headers.DEVICE: device_segments[nearest_segment(tubing_md[is_active], device_md)],
+            Headers.OUT: out_segment[nearest_annulus],
+        },
+        index=np.arange(len(active_zone)) - np.searchsorted(active_zone, active_zone),
+    )
+    # WELL_SEGMENTS_LINK is only for those segments whose outlet segment is not a device segment.
+    df_well_segments_link = df_well_segments_link[
+        df_well_segments_link[Headers.DEVICE] != df_well_segments_link[Headers.OUT]
+    ]
 
     if df_well_segments_link.shape[0] > 0:
         df_well_segments_link = df_well_segments_link[[Headers.WELL, Headers.ANNULUS, Headers.DEVICE]]
@@ -582,88 +573,10 @@ def prepare_annulus_layer(
         df_well_segments_link[Headers.DEVICE] = df_well_segments_link[Headers.DEVICE].astype(np.int64)
         df_well_segments_link[Headers.EMPTY] = "/"
 
-    if df_annulus.shape[0] > 0:
-        df_annulus[Headers.EMPTY] = "/"
+    df_annulus[Headers.EMPTY] = "/"
     return df_annulus, df_well_segments_link
 
 
-def calculate_upstream(
-    df_branch: pd.DataFrame,
-    df_active: pd.DataFrame,
-    df_device: pd.DataFrame,
-    start_branch: int,
-    annulus_length: float,
-    start_segment: int,
-    well_name: str,
-) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Calculate upstream for annulus and wseglink.
-
-    Args:
-        df_branch: The well for current annulus zone.
-        df_active: Active segments (NDEVICES > 0 or DEVICETYPE is PERF).
-        df_device: Device layer.
-        start_branch: Start branch number.
-        annulus_length: Annulus segment length increment. Default to 0.1.
-        start_segment: Start segment number of annulus.
-        well_name: Well name.
-
-    Returns:
-        Annulus upstream and wseglink upstream.
-    """
-    df_annulus_upstream = pd.DataFrame()
-    df_annulus_upstream[Headers.START_SEGMENT_NUMBER] = start_segment + np.arange(df_branch.shape[0])
-    df_annulus_upstream[Headers.END_SEGMENT_NUMBER] = df_annulus_upstream[Headers.START_SEGMENT_NUMBER]
-    df_annulus_upstream[Headers.BRANCH] = start_branch
-    out_segment = df_annulus_upstream[Headers.START_SEGMENT_NUMBER].to_numpy() - 1
-    # determining the outlet segment of the annulus segment
-    # if the annulus segment is not the most downstream which has connection
-    # then the outlet is its adjacent annulus segment
-    device_segment = get_outlet_segment(
-        df_branch[Headers.TUBING_MEASURED_DEPTH].to_numpy(),
-        df_device[Headers.MEASURED_DEPTH].to_numpy(),
-        df_device[Headers.START_SEGMENT_NUMBER].to_numpy(),
-    )
-    # but for the most downstream annulus segment
-    # its outlet is the device segment
-    out_segment[0] = device_segment[0]
-    # determining segment position
-    md_ = df_branch[Headers.TUBING_MEASURED_DEPTH].to_numpy() + annulus_length
-    md_[0] = md_[0] + annulus_length
-    df_annulus_upstream[Headers.OUT] = out_segment
-    df_annulus_upstream[Headers.MEASURED_DEPTH] = md_
-    df_annulus_upstream[Headers.TRUE_VERTICAL_DEPTH] = df_branch[Headers.TRUE_VERTICAL_DEPTH].to_numpy()
-    df_annulus_upstream[Headers.WELL_BORE_DIAMETER] = df_branch[Headers.OUTER_DIAMETER].to_numpy()
-    df_annulus_upstream[Headers.ROUGHNESS] = df_branch[Headers.ROUGHNESS].to_numpy()
-    device_segment = get_outlet_segment(
-        df_active[Headers.TUBING_MEASURED_DEPTH].to_numpy(),
-        df_device[Headers.MEASURED_DEPTH].to_numpy(),
-        df_device[Headers.START_SEGMENT_NUMBER].to_numpy(),
-    )
-    annulus_segment = get_outlet_segment(
-        df_active[Headers.TUBING_MEASURED_DEPTH].to_numpy(),
-        df_annulus_upstream[Headers.MEASURED_DEPTH].to_numpy(),
-        df_annulus_upstream[Headers.START_SEGMENT_NUMBER].to_numpy(),
-    )
-    outlet_segment = get_outlet_segment(
-        df_active[Headers.TUBING_MEASURED_DEPTH].to_numpy(),
-        df_annulus_upstream[Headers.MEASURED_DEPTH].to_numpy(),
-        df_annulus_upstream[Headers.OUT].to_numpy(),
-    )
-    df_well_segments_link_upstream = pd.DataFrame(
-        {
-            Headers.WELL: [well_name] * device_segment.shape[0],
-            Headers.ANNULUS: annulus_segment,
-            Headers.DEVICE: device_segment,
-            Headers.OUT: outlet_segment,
-        }
-    )
-    # WELL_SEGMENTS_LINK is only for those segments whose outlet segment is not a device segment.
-    df_well_segments_link_upstream = df_well_segments_link_upstream[
-        df_well_segments_link_upstream[Headers.DEVICE] != df_well_segments_link_upstream[Headers.OUT]
-    ]
-    return df_annulus_upstream, df_well_segments_link_upstream
-
-
 def connect_compseg_icv(
     df_reservoir: pd.DataFrame, df_device: pd.DataFrame, df_annulus: pd.DataFrame, df_completion: pd.DataFrame
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
@@ -1412,9 +1325,55 @@ def prepare_dual_rate_controlled_production(
     return wsegdualrcp
 
 
+def _segment_records(df_temp: pd.DataFrame, header: bool = False) -> list[str]:
+    """Write the records of the segment in each row, the same as when writing a table of that segment alone.
+
+    The rows are written all at once, and only segments with more than one row are written as separate tables.
+
+    Args:
+        df_temp: WELL_SEGMENTS_VALVE, AUTONOMOUS_INFLOW_CONTROL_DEVICE, etc., with a row per segment.
+        header: Keep header (True) or not (False).
+
+    Returns:
+        Text string of the records of the segment in each row.
+    """
+    segment_numbers = df_temp[Headers.START_SEGMENT_NUMBER].to_numpy()
+    _, segment_index, rows_per_segment = np.unique(segment_numbers, return_inverse=True, return_counts=True)
+    is_shared = rows_per_segment[segment_index] > 1
+    try:
+        records = format_rows(df_temp, True, False, header)
+    except UnsupportedTable as err:
+        logger.debug("Writing segment records with pandas: %s", err)
+        records = [""] * df_temp.shape[0]
+        is_shared[:] = True
+    shared_records: dict[Any, str] = {}
+    for row in np.flatnonzero(is_shared):
+        segment_number = segment_numbers[row]
+        if segment_number not in shared_records:
+            shared_records[segment_number] = dataframe_tostring(
+                df_temp[segment_numbers == segment_number], True, False, header
+            )
+        records[row] = shared_records[segment_number]
+    return records
+
+
+def _valve_header(columns: list[str]) -> str:
+    """Get the keyword and the commented column names written above the records of WSEGVALV in actions.
+
+    Args:
+        columns: The columns of the records.
+
+    Returns:
+        The keyword and header lines.
+    """
+    return Keywords.WELL_SEGMENTS_VALVE + "\n" + ("--" + "".join("  " + column for column in columns)).rstrip() + "\n"
+
+
 def print_wsegdensity(df_wsegdensity: pd.DataFrame, well_number: int) -> str:
     """Print DENSITY devices.
 
+    The records of each segment are written once for all segments, and the actions are filled in from them.
+
     Args:
         df_wsegdensity: Output from function prepare_wsegdensity.
         well_number: Well number.
@@ -1450,123 +1409,71 @@ def print_wsegdensity(df_wsegdensity: pd.DataFrame, well_number: int) -> str:
             Headers.DEFAULTS,
             Headers.MAX_FLOW_CROSS_SECTIONAL_AREA,
         ],
-        [
-            Headers.WELL,
-            Headers.START_SEGMENT_NUMBER,
-            Headers.FLOW_COEFFICIENT,
-            Headers.OIL_FLOW_CROSS_SECTIONAL_AREA,
-            Headers.DEFAULTS,
-            Headers.MAX_FLOW_CROSS_SECTIONAL_AREA,
-        ],
     ]
     sign_water = ["<=", ">", "", "<"]
     sign_gas = [">", "<=", "<", ""]
     suvtrig = ["0", "0", "1", "2"]
-    action = "UDQ\n"
-    for idx in range(df_wsegdensity.shape[0]):
-        segment_number = df_wsegdensity[Headers.START_SEGMENT_NUMBER].iloc[idx]
-        well_name = df_wsegdensity[Headers.WELL].iloc[idx]
-        action += f"  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n"
-    action += "/\n\n"
-    iaction = 3
-    action += Keywords.WELL_SEGMENTS_VALVE + "\n"
-    header_string = "--"
-    for itm in header[iaction]:
-        header_string += "  " + itm
-    action += header_string.rstrip() + "\n"
-    for idx in range(df_wsegdensity.shape[0]):
-        segment_number = df_wsegdensity[Headers.START_SEGMENT_NUMBER].iloc[idx]
-        print_df = df_wsegdensity[df_wsegdensity[Headers.START_SEGMENT_NUMBER] == segment_number]
-        print_df = print_df[header[iaction]]
-        print_df = dataframe_tostring(print_df, True, False, False) + "\n"
-        action += print_df
-    action += "/\n\n"
-    for idx in range(df_wsegdensity.shape[0]):
-        segment_number = df_wsegdensity[Headers.START_SEGMENT_NUMBER].iloc[idx]
-        well_name = df_wsegdensity[Headers.WELL].iloc[idx]
-        water_holdup_fraction_low_cutoff = df_wsegdensity[Headers.WATER_HOLDUP_FRACTION_LOW_CUTOFF].iloc[idx]
-        water_holdup_fraction_high_cutoff = df_wsegdensity[Headers.WATER_HOLDUP_FRACTION_HIGH_CUTOFF].iloc[idx]
-        gas_holdup_fraction_low_cutoff = df_wsegdensity[Headers.GAS_HOLDUP_FRACTION_LOW_CUTOFF].iloc[idx]
-        gas_holdup_fraction_high_cutoff = df_wsegdensity[Headers.GAS_HOLDUP_FRACTION_HIGH_CUTOFF].iloc[idx]
+    valve_headers = [_valve_header(columns) for columns in header]
+    # The oil flow area is used both initially and when switching back to oil.
+    records = [_segment_records(df_wsegdensity[columns]) for columns in header]
+    well_names = df_wsegdensity[Headers.WELL].tolist()
+    segment_numbers = df_wsegdensity[Headers.START_SEGMENT_NUMBER].tolist()
+
+    action = ["UDQ\n"]
+    for well_name, segment_number in zip(well_names, segment_numbers):
+        action.append(f"  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n")
+    action.append("/\n\n")
+    action.append(valve_headers[2])
+    action.extend(record + "\n" for record in records[2])
+    action.append("/\n\n")
+    for row, (well_name, segment_number, water_low, water_high, gas_low, gas_high) in enumerate(
+        zip(
+            well_names,
+            segment_numbers,
+            df_wsegdensity[Headers.WATER_HOLDUP_FRACTION_LOW_CUTOFF].tolist(),
+            df_wsegdensity[Headers.WATER_HOLDUP_FRACTION_HIGH_CUTOFF].tolist(),
+            df_wsegdensity[Headers.GAS_HOLDUP_FRACTION_LOW_CUTOFF].tolist(),
+            df_wsegdensity[Headers.GAS_HOLDUP_FRACTION_HIGH_CUTOFF].tolist(),
+        )
+    ):
+        act_names = [f"D{well_number:03d}{segment_number:03d}{act_number:1d}" for act_number in range(1, 5)]
+        if len(act_names[0]) > 8:
+            raise CompletorError("Too many wells and/or too many segments with DENSITY")
+        segment = f"'{well_name}' {segment_number}"
         for iaction in range(2):
-            act_number = iaction + 1
-            act_name = f"D{well_number:03d}{segment_number:03d}{act_number:1d}"
-            if len(act_name) > 8:
-                raise CompletorError("Too many wells and/or too many segments with DENSITY")
-            action += (
-                f"ACTIONX\n{act_name} 1000000 /\n"
-                f"SWHF '{well_name}' {segment_number} "
-                f"{sign_water[iaction]} {water_holdup_fraction_high_cutoff} AND /\n"
-                f"SGHF '{well_name}' {segment_number} "
-                f"{sign_gas[iaction]} {gas_holdup_fraction_high_cutoff} AND /\n"
-                f"SUVTRIG '{well_name}' {segment_number} "
-                f"= {suvtrig[iaction]} /\n/\n\n"
+            action.append(
+                f"ACTIONX\n{act_names[iaction]} 1000000 /\n"
+                f"SWHF {segment} {sign_water[iaction]} {water_high} AND /\n"
+                f"SGHF {segment} {sign_gas[iaction]} {gas_high} AND /\n"
+                f"SUVTRIG {segment} = {suvtrig[iaction]} /\n/\n\n"
+                f"{valve_headers[iaction]}{records[iaction][row]}\n/\n"
+                f"\nUDQ\n  ASSIGN SUVTRIG {segment} {iaction + 1} /\n/\n"
+                "\nENDACTIO\n\n"
             )
-            print_df = df_wsegdensity[df_wsegdensity[Headers.START_SEGMENT_NUMBER] == segment_number]
-            print_df = print_df[header[iaction]]  # type: ignore
-            header_string = Keywords.WELL_SEGMENTS_VALVE + "\n--"
-            for item in header[iaction]:
-                header_string += "  " + item
-            header_string = header_string.rstrip() + "\n"
-            print_df = header_string + dataframe_tostring(print_df, True, False, False)  # type: ignore
-            print_df += "\n/\n"
-            if iaction == 0:
-                print_df += f"\nUDQ\n  ASSIGN SUVTRIG '{well_name}' {segment_number} 1 /\n/\n"
-            elif iaction == 1:
-                print_df += f"\nUDQ\n  ASSIGN SUVTRIG '{well_name}' {segment_number} 2 /\n/\n"
-            action += print_df + "\nENDACTIO\n\n"
-
-        iaction = 2
-        act_number = iaction + 1
-        act_name = f"D{well_number:03d}{segment_number:03d}{act_number:1d}"
-        if len(act_name) > 8:
-            raise CompletorError("Too many wells and/or too many segments with DENSITY")
-        action += (
-            f"ACTIONX\n{act_name} 1000000 /\n"
-            f"SGHF '{well_name}' {segment_number} "
-            f"{sign_gas[iaction]} {gas_holdup_fraction_low_cutoff} AND /\n"
-            f"SUVTRIG '{well_name}' {segment_number} "
-            f"= {suvtrig[iaction]} /\n/\n\n"
+        action.append(
+            f"ACTIONX\n{act_names[2]} 1000000 /\n"
+            f"SGHF {segment} {sign_gas[2]} {gas_low} AND /\n"
+            f"SUVTRIG {segment} = {suvtrig[2]} /\n/\n\n"
+            f"{valve_headers[2]}{records[2][row]}\n/\n"
+            f"\nUDQ\n  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n/\n"
+            "\nENDACTIO\n\n"
         )
-        print_df = df_wsegdensity[df_wsegdensity[Headers.START_SEGMENT_NUMBER] == segment_number]
-        print_df = print_df[header[iaction]]  # type: ignore
-        header_string = Keywords.WELL_SEGMENTS_VALVE + "\n--"
-        for item in header[iaction]:
-            header_string += "  " + item
-        header_string = header_string.rstrip() + "\n"
-        print_df = header_string + dataframe_tostring(print_df, True, False, False)  # type: ignore
-        print_df += "\n/\n"
-        print_df += f"\nUDQ\n  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n/\n"
-        action += print_df + "\nENDACTIO\n\n"
-
-        iaction = 3
-        act_number = iaction + 1
-        act_name = f"D{well_number:03d}{segment_number:03d}{act_number:1d}"
-        if len(act_name) > 8:
-            raise CompletorError("Too many wells and/or too many segments with DENSITY")
-        action += (
-            f"ACTIONX\n{act_name} 1000000 /\n"
-            f"SWHF '{well_name}' {segment_number} "
-            f"{sign_water[iaction]} {water_holdup_fraction_low_cutoff} AND /\n"
-            f"SUVTRIG '{well_name}' {segment_number} "
-            f"= {suvtrig[iaction]} /\n/\n\n"
+        action.append(
+            f"ACTIONX\n{act_names[3]} 1000000 /\n"
+            f"SWHF {segment} {sign_water[3]} {water_low} AND /\n"
+            f"SUVTRIG {segment} = {suvtrig[3]} /\n/\n\n"
+            f"{valve_headers[2]}{records[2][row]}\n/\n"
+            f"UDQ\n  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n/\n"
+            "\nENDACTIO\n\n"
         )
-        print_df = df_wsegdensity[df_wsegdensity[Headers.START_SEGMENT_NUMBER] == segment_number]
-        print_df = print_df[header[iaction]]  # type: ignore
-        header_string = Keywords.WELL_SEGMENTS_VALVE + "\n--"
-        for item in header[iaction]:
-            header_string += "  " + item
-        header_string = header_string.rstrip() + "\n"
-        print_df = header_string + dataframe_tostring(print_df, True, False, False)  # type: ignore
-        print_df += "\n/\n"
-        print_df += f"UDQ\n  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n/\n"
-        action += print_df + "\nENDACTIO\n\n"
-    return action
+    return "".join(action)
 
 
 def print_wseginjv(df_wseginjv: pd.DataFrame, well_number: int) -> str:
     """Print INJECTION VALVE devices.
 
+    The records of each segment are written once for all segments, and the actions are filled in from them.
+
     Args:
         df_wseginjv: Output from function prepare_wseginjv.
         well_number: Well number.
@@ -1595,140 +1502,53 @@ def print_wseginjv(df_wseginjv: pd.DataFrame, well_number: int) -> str:
             Headers.MAX_FLOW_CROSS_SECTIONAL_AREA,
         ],
     ]
-
     sign = ["<", ">="]
     suvtrig = ["0", "1"]
-    action = "UDQ\n"
-    for idx in range(df_wseginjv.shape[0]):
-        segment_number = df_wseginjv[Headers.START_SEGMENT_NUMBER].iloc[idx]
-        well_name = df_wseginjv[Headers.WELL].iloc[idx]
-        action += f"  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n"
-    action += "/\n\n"
-    iaction = 1
-    action += Keywords.WELL_SEGMENTS_VALVE + "\n"
-    header_string = "--"
-    for itm in header[iaction]:
-        header_string += "  " + itm
-    action += header_string.rstrip() + "\n"
-    for idx in range(df_wseginjv.shape[0]):
-        segment_number = df_wseginjv[Headers.START_SEGMENT_NUMBER].iloc[idx]
-        print_df = df_wseginjv[df_wseginjv[Headers.START_SEGMENT_NUMBER] == segment_number]
-        print_df = print_df[header[iaction]]
-        print_df = dataframe_tostring(print_df, True, False, False) + "\n"
-        action += print_df
-    action += "/\n\n"
-    for idx in range(df_wseginjv.shape[0]):
-        segment_number = df_wseginjv[Headers.START_SEGMENT_NUMBER].iloc[idx]
-        well_name = df_wseginjv[Headers.WELL].iloc[idx]
-        # Trigger paramater is segment water rate
-        if df_wseginjv[Headers.TRIGGER_PARAMETER].iloc[idx] == "SWFR":
-            water_segment_rate_cutoff = -1 * df_wseginjv[Headers.TRIGGER_VALUE].iloc[idx]
-            iaction = 0
-            act_number = iaction + 1
-            act_name = f"INJVOP{well_number:03d}{segment_number:03d}{act_number:1d}"
-            if len(act_name) > 13:
-                raise CompletorError("Too many wells and/or too many segments with Injection Valve")
-            action += (
-                f"ACTIONX\n{act_name} 1000000 /\n"
-                f"SWFR '{well_name}' {segment_number} "
-                f"{sign[iaction]} {water_segment_rate_cutoff} AND /\n"
-                f"SUVTRIG '{well_name}' {segment_number} "
-                f"= {suvtrig[iaction]} /\n/\n\n"
-            )
-            print_df = df_wseginjv[df_wseginjv[Headers.START_SEGMENT_NUMBER] == segment_number]
-            print_df = print_df[header[iaction]]  # type: ignore
-            header_string = Keywords.WELL_SEGMENTS_VALVE + "\n--"
-
-            for item in header[iaction]:
-                header_string += "  " + item
-            header_string = header_string.rstrip() + "\n"
-            print_df = header_string + dataframe_tostring(print_df, True, False, False)  # type: ignore
-            print_df += "\n/\n"
-            print_df += f"\nUDQ\n  ASSIGN SUVTRIG {well_name} {segment_number} 1 /\n/\n"
-            action += print_df + "\nENDACTIO\n\n"
-
-            iaction = 1
-            act_number = iaction + 1
-            act_name = f"INJVCL{well_number:03d}{segment_number:03d}{act_number:1d}"
-            if len(act_name) > 13:
-                raise CompletorError("Too many wells and/or too many segments with Injection Valve")
-            action += (
-                f"ACTIONX\n{act_name} 1000000 /\n"
-                f"SWFR '{well_name}' {segment_number} "
-                f"{sign[iaction]} {water_segment_rate_cutoff} AND /\n"
-                f"SUVTRIG '{well_name}' {segment_number} "
-                f"= {suvtrig[iaction]} /\n/\n\n"
-            )
-            print_df = df_wseginjv[df_wseginjv[Headers.START_SEGMENT_NUMBER] == segment_number]
-            print_df = print_df[header[iaction]]  # type: ignore
-            header_string = Keywords.WELL_SEGMENTS_VALVE + "\n--"
-
-            for item in header[iaction]:
-                header_string += "  " + item
-            header_string = header_string.rstrip() + "\n"
-            print_df = header_string + dataframe_tostring(print_df, True, False, False)  # type: ignore
-            print_df += "\n/\n"
-            print_df += f"\nUDQ\n  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n/\n"
-            action += print_df + "\nENDACTIO\n\n"
-
-        # Trigger parameter is segment pressure drop
-        elif df_wseginjv[Headers.TRIGGER_PARAMETER].iloc[idx] == "SPRD":
-            pressure_drop_cutoff = -1 * df_wseginjv[Headers.TRIGGER_VALUE].iloc[idx]
-            iaction = 0
-            act_number = iaction + 1
-            act_name = f"INJVOP{well_number:03d}{segment_number:03d}{act_number:1d}"
-            if len(act_name) > 13:
-                raise CompletorError("Too many wells and/or too many segments with Injection Valve")
-            action += (
-                f"ACTIONX\n{act_name} 1000000 /\n"
-                f"SPRD '{well_name}' {segment_number} "
-                f"{sign[iaction]} {pressure_drop_cutoff} AND /\n"
-                f"SUVTRIG '{well_name}' {segment_number} "
-                f"= {suvtrig[iaction]} /\n/\n\n"
-            )
-            print_df = df_wseginjv[df_wseginjv[Headers.START_SEGMENT_NUMBER] == segment_number]
-            print_df = print_df[header[iaction]]  # type: ignore
-            header_string = Keywords.WELL_SEGMENTS_VALVE + "\n--"
-
-            for item in header[iaction]:
-                header_string += "  " + item
-            header_string = header_string.rstrip() + "\n"
-            print_df = header_string + dataframe_tostring(print_df, True, False, False)  # type: ignore
-            print_df += "\n/\n"
-            print_df += f"\nUDQ\n  ASSIGN SUVTRIG {well_name} {segment_number} 1 /\n/\n"
-            action += print_df + "\nENDACTIO\n\n"
-
-            iaction = 1
-            act_number = iaction + 1
-            act_name = f"INJVCL{well_number:03d}{segment_number:03d}{act_number:1d}"
+    act_prefix = ["INJVOP", "INJVCL"]
+    valve_headers = [_valve_header(columns) for columns in header]
+    records = [_segment_records(df_wseginjv[columns]) for columns in header]
+    well_names = df_wseginjv[Headers.WELL].tolist()
+    segment_numbers = df_wseginjv[Headers.START_SEGMENT_NUMBER].tolist()
+
+    action = ["UDQ\n"]
+    for well_name, segment_number in zip(well_names, segment_numbers):
+        action.append(f"  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n")
+    action.append("/\n\n")
+    action.append(valve_headers[1])
+    action.extend(record + "\n" for record in records[1])
+    action.append("/\n\n")
+    for row, (well_name, segment_number, trigger_parameter, trigger_value) in enumerate(
+        zip(
+            well_names,
+            segment_numbers,
+            df_wseginjv[Headers.TRIGGER_PARAMETER].tolist(),
+            df_wseginjv[Headers.TRIGGER_VALUE].tolist(),
+        )
+    ):
+        # Trigger parameter is segment water rate (SWFR) or segment pressure drop (SPRD).
+        if trigger_parameter not in ("SWFR", "SPRD"):
+            raise CompletorError("Trigger paramater given is not supported")
+        cutoff = -1 * trigger_value
+        for iaction in range(2):
+            act_name = f"{act_prefix[iaction]}{well_number:03d}{segment_number:03d}{iaction + 1:1d}"
             if len(act_name) > 13:
                 raise CompletorError("Too many wells and/or too many segments with Injection Valve")
-            action += (
+            action.append(
                 f"ACTIONX\n{act_name} 1000000 /\n"
-                f"SPRD '{well_name}' {segment_number} "
-                f"{sign[iaction]} {pressure_drop_cutoff} AND /\n"
-                f"SUVTRIG '{well_name}' {segment_number} "
-                f"= {suvtrig[iaction]} /\n/\n\n"
+                f"{trigger_parameter} '{well_name}' {segment_number} {sign[iaction]} {cutoff} AND /\n"
+                f"SUVTRIG '{well_name}' {segment_number} = {suvtrig[iaction]} /\n/\n\n"
+                f"{valve_headers[iaction]}{records[iaction][row]}\n/\n"
+                f"\nUDQ\n  ASSIGN SUVTRIG {well_name} {segment_number} {1 - iaction} /\n/\n"
+                "\nENDACTIO\n\n"
             )
-            print_df = df_wseginjv[df_wseginjv[Headers.START_SEGMENT_NUMBER] == segment_number]
-            print_df = print_df[header[iaction]]  # type: ignore
-            header_string = Keywords.WELL_SEGMENTS_VALVE + "\n--"
-
-            for item in header[iaction]:
-                header_string += "  " + item
-            header_string = header_string.rstrip() + "\n"
-            print_df = header_string + dataframe_tostring(print_df, True, False, False)  # type: ignore
-            print_df += "\n/\n"
-            print_df += f"\nUDQ\n  ASSIGN SUVTRIG {well_name} {segment_number} 0 /\n/\n"
-            action += print_df + "\nENDACTIO\n\n"
-        else:
-            raise CompletorError("Trigger paramater given is not supported")
-    return action
+    return "".join(action)
 
 
 def print_wsegdualrcp(df_wsegdualrcp: pd.DataFrame, well_number: int) -> str:
     """Print for DUALRCP devices.
 
+    The records of each segment are written once for all segments, and the actions are filled in from them.
+
     Args:
         df_wsegdualrcp: Output from function prepare_wsegdualrcp.
         well_number: Well number.
@@ -1804,31 +1624,35 @@ def print_wsegdualrcp(df_wsegdualrcp: pd.DataFrame, well_number: int) -> str:
     sign_water = ["<", ">="]
     sign_gas = ["<", ">="]
     operator = ["AND", "OR"]
-    action = ""
-    for idx in range(df_wsegdualrcp.shape[0]):
-        segment_number = df_wsegdualrcp[Headers.START_SEGMENT_NUMBER].iloc[idx]
-        well_name = df_wsegdualrcp[Headers.WELL].iloc[idx]
-        wct = df_wsegdualrcp[Headers.DUALRCP_WATER_CUT].iloc[idx]
-        ghf = df_wsegdualrcp[Headers.DUALRCP_GAS_HOLDUP_FRACTION].iloc[idx]
+    records = []
+    for columns in header:
+        df_records = df_wsegdualrcp[columns]
+        df_records.columns = new_column
+        records.append(_segment_records(df_records, header=True))
+
+    action = []
+    for row, (well_name, segment_number, wct, ghf) in enumerate(
+        zip(
+            df_wsegdualrcp[Headers.WELL].tolist(),
+            df_wsegdualrcp[Headers.START_SEGMENT_NUMBER].tolist(),
+            df_wsegdualrcp[Headers.DUALRCP_WATER_CUT].tolist(),
+            df_wsegdualrcp[Headers.DUALRCP_GAS_HOLDUP_FRACTION].tolist(),
+        )
+    ):
         # LOWWCT_LOWGHF
         for iaction in range(2):
             act_number = iaction + 1
             act_name = f"V{well_number:03d}{segment_number:03d}{act_number:1d}"
             if len(act_name) > 8:
                 raise CompletorError("Too many wells and/or too many segments with DUALRCP")
-            action += (
+            action.append(
                 f"ACTIONX\n{act_name} 1000000 /\n"
                 f"SUWCT '{well_name}' {segment_number} {sign_water[iaction]} "
                 f"{wct} {operator[iaction]} /\n"
                 f"SGHF '{well_name}' {segment_number} {sign_gas[iaction]} {ghf} /\n/\n"
+                f"{Keywords.AUTONOMOUS_INFLOW_CONTROL_DEVICE}\n{records[iaction][row]}\n/\nENDACTIO\n\n"
             )
-
-            print_df = df_wsegdualrcp[df_wsegdualrcp[Headers.START_SEGMENT_NUMBER] == segment_number]
-            print_df = print_df[header[iaction]]
-            print_df.columns = new_column
-            print_df = Keywords.AUTONOMOUS_INFLOW_CONTROL_DEVICE + "\n" + dataframe_tostring(print_df, True)
-            action += f"{print_df}\n/\nENDACTIO\n\n"
-    return action
+    return "".join(action)
 
 
 def print_wsegdensity_pyaction(df_wsegdensity: pd.DataFrame) -> str:
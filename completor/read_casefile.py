@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import re
 from collections.abc import Mapping
-from io import StringIO
 from typing import Any
 
 import numpy as np
@@ -12,10 +11,65 @@ import pandas as pd
 from completor import input_validation, parse
 from completor.constants import Content, Headers, ICVMethod, Keywords, Method, WellData
 from completor.exceptions.clean_exceptions import CompletorError
-from completor.exceptions.exceptions import CaseReaderFormatError
+from completor.exceptions.exceptions import CaseReaderFormatError, CaseReaderValueError
 from completor.logger import logger
-from completor.parse import locate_keyword
-from completor.utils import clean_file_lines, sort_string_with_assign_first
+from completor.utils import clean_file_line, sort_string_with_assign_first
+
+# Values read as missing, as by pandas.read_csv.
+_MISSING_VALUES = frozenset(
+    [
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
+
+
+def _read_value(value: str) -> str | float:
+    """Read a value of a table in the case file as text without quotes, or as missing.
+
+    Args:
+        value: The value as written in the case file.
+
+    Returns:
+        The value without quotes, or NaN if the value is missing.
+    """
+    value = value.replace('"', "")
+    if value in _MISSING_VALUES:
+        return np.nan
+    return value.replace("'", "")
+
+
+def _device_table_dtypes(header: list[str], text_columns: tuple[str, ...] = ()) -> dict[str, type]:
+    """Get the types of the columns of a device table, with the device number as integer and the rest as numbers.
+
+    Args:
+        header: The columns of the table.
+        text_columns: Columns left as text, e.g. those allowing a default value such as 1*.
+
+    Returns:
+        The type of each column that is converted.
+    """
+    return {
+        column: np.int64 if column == Headers.DEVICE_NUMBER else np.float64
+        for column in header
+        if column not in text_columns
+    }
 
 
 class ReadCasefile:
@@ -30,6 +84,7 @@ class ReadCasefile:
     Attributes:
         content (List[str]): List of strings.
         n_content (int): Dimension of content.
+        keyword_index (KeywordIndex): The start and end of every keyword in the content.
         joint_length (float): JOINTLENGTH keyword. Default to 12.0.
         segment_length (float): SEGMENTLENGTH keyword. Default to 0.0.
         pvt_file (str): The pvt file content.
@@ -60,8 +115,12 @@ class ReadCasefile:
 
         """
         self.case_file = case_file.splitlines()
-        self.content = clean_file_lines(self.case_file, "--")
+        clean_lines = [clean_file_line(line, comment_prefix="--") for line in self.case_file]
+        self.content = [line for line in clean_lines if line]
+        # The line number in the case file of each line of the content.
+        self._line_numbers = [line_number for line_number, line in enumerate(clean_lines) if line]
         self.n_content = len(self.content)
+        self.keyword_index = parse.KeywordIndex(self.content)
 
         # assign default values
         self.joint_length = 12.0
@@ -126,17 +185,23 @@ class ReadCasefile:
         ]
         # Initialize empty table for ICV Control
         self.completion_table = pd.DataFrame(columns=header)
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.COMPLETION)
+        start_index, end_index = self.keyword_index.locate(Keywords.COMPLETION)
         if start_index == end_index:
             # Check if there is ICV Control keyword
             # It is allowed to have no COMPLETION if there is ICVCONTROL
-            start_index_icv_control, end_index_icv_control = locate_keyword(self.content, "ICVCONTROL")
+            start_index_icv_control, end_index_icv_control = self.keyword_index.locate("ICVCONTROL")
             if start_index_icv_control == end_index_icv_control:
                 raise ValueError("No COMPLETION keyword or ICVCONTROL is defined in the case file.")
             else:
                 return
 
-        df_temp = self._create_dataframe_with_columns(header, start_index, end_index)
+        # Device number, roughness and the like may be defaulted with 1*, so they are converted once defaults are set.
+        dtypes = {
+            Headers.BRANCH: np.int64,
+            Headers.START_MEASURED_DEPTH: np.float64,
+            Headers.END_MEASURED_DEPTH: np.float64,
+        }
+        df_temp = self._create_dataframe_with_columns(header, start_index, end_index, dtypes=dtypes)
         # Set default value for packer segment
         df_temp = input_validation.set_default_packer_section(df_temp)
         # Set default value for PERF segments
@@ -198,7 +263,7 @@ class ReadCasefile:
         /
         """
         header = [Headers.WELL, Headers.BRANCH]
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.LATERAL_TO_DEVICE)
+        start_index, end_index = self.keyword_index.locate(Keywords.LATERAL_TO_DEVICE)
 
         if start_index == end_index:
             # set default behaviour (if keyword not in case file)
@@ -210,7 +275,7 @@ class ReadCasefile:
 
     def read_joint_length(self) -> None:
         """Read the JOINTLENGTH keyword in the case file."""
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.JOINT_LENGTH)
+        start_index, end_index = self.keyword_index.locate(Keywords.JOINT_LENGTH)
         if end_index == start_index + 2:
             self.joint_length = float(self.content[start_index + 1])
             if self.joint_length <= 0:
@@ -225,7 +290,7 @@ class ReadCasefile:
         Raises:
             CompletorError: If SEGMENTLENGTH is not float or string.
         """
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.SEGMENT_LENGTH)
+        start_index, end_index = self.keyword_index.locate(Keywords.SEGMENT_LENGTH)
         if end_index == start_index + 2:
             try:
                 return float(self.content[start_index + 1])
@@ -300,7 +365,7 @@ class ReadCasefile:
 
         Best practice: All branches in all wells should be defined in the case file.
         """
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.USE_STRICT)
+        start_index, end_index = self.keyword_index.locate(Keywords.USE_STRICT)
         if end_index == start_index + 2:
             strict = self.content[start_index + 1]
             if strict.upper() == "FALSE":
@@ -315,7 +380,7 @@ class ReadCasefile:
         program does not add a device layer to the well. I.e. the well is
         untouched by the program. The default value is False.
         """
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.GRAVEL_PACKED_PERFORATED_DEVICELAYER)
+        start_index, end_index = self.keyword_index.locate(Keywords.GRAVEL_PACKED_PERFORATED_DEVICELAYER)
         if end_index == start_index + 2:
             gp_perf_devicelayer = self.content[start_index + 1]
             self.gp_perf_devicelayer = gp_perf_devicelayer.upper() == "TRUE"
@@ -327,7 +392,7 @@ class ReadCasefile:
         The default value is 0.0, meaning that no segments are lumped by this keyword.
         The program will continue to coalesce segments until all segments are longer than the given minimum.
         """
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.MINIMUM_SEGMENT_LENGTH)
+        start_index, end_index = self.keyword_index.locate(Keywords.MINIMUM_SEGMENT_LENGTH)
         if end_index == start_index + 2:
             min_seg_len = self.content[start_index + 1]
             self.minimum_segment_length = input_validation.validate_minimum_segment_length(min_seg_len)
@@ -335,7 +400,7 @@ class ReadCasefile:
 
     def read_mapfile(self) -> None:
         """Read the MAP_FILE keyword in the case file (if any) into a mapper."""
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.MAP_FILE)
+        start_index, end_index = self.keyword_index.locate(Keywords.MAP_FILE)
         if end_index == start_index + 2:
             # the content is in between the keyword and the /
             self.mapfile = parse.remove_string_characters(self.content[start_index + 1])
@@ -347,7 +412,7 @@ class ReadCasefile:
         Raises:
             CompletorError: If WESEGVALV is not defined and VALVE is used in COMPLETION. If the device number is not found.
         """
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.WELL_SEGMENTS_VALVE)
+        start_index, end_index = self.keyword_index.locate(Keywords.WELL_SEGMENTS_VALVE)
         if start_index == end_index:
             if Content.VALVE in self.completion_table[Headers.DEVICE_TYPE]:
                 raise CompletorError("WELL_SEGMENTS_VALVE keyword must be defined, if VALVE is used in the completion.")
@@ -360,11 +425,21 @@ class ReadCasefile:
                 Headers.ADDITIONAL_PIPE_LENGTH_FRICTION_PRESSURE_DROP,
             ]
             try:
-                df_temp = self._create_dataframe_with_columns(header, start_index, end_index)
+                df_temp = self._create_dataframe_with_columns(
+                    header,
+                    start_index,
+                    end_index,
+                    dtypes=_device_table_dtypes(header, (Headers.ADDITIONAL_PIPE_LENGTH_FRICTION_PRESSURE_DROP,)),
+                )
                 df_temp[Headers.MAX_FLOW_CROSS_SECTIONAL_AREA] = np.nan
             except CaseReaderFormatError:
                 header += [Headers.MAX_FLOW_CROSS_SECTIONAL_AREA]
-                df_temp = self._create_dataframe_with_columns(header, start_index, end_index)
+                df_temp = self._create_dataframe_with_columns(
+                    header,
+                    start_index,
+                    end_index,
+                    dtypes=_device_table_dtypes(header, (Headers.ADDITIONAL_PIPE_LENGTH_FRICTION_PRESSURE_DROP,)),
+                )
 
             self.wsegvalv_table = input_validation.set_format_wsegvalv(df_temp)
             device_checks = self.completion_table[self.completion_table[Headers.DEVICE_TYPE] == Content.VALVE][
@@ -383,7 +458,7 @@ class ReadCasefile:
                 or if the device number is not found.
                 If not all devices in COMPLETION are specified in INFLOW_CONTROL_DEVICE.
         """
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.INFLOW_CONTROL_DEVICE)
+        start_index, end_index = self.keyword_index.locate(Keywords.INFLOW_CONTROL_DEVICE)
         if start_index == end_index:
             if Content.INFLOW_CONTROL_DEVICE in self.completion_table[Headers.DEVICE_TYPE]:
                 raise CompletorError(
@@ -399,7 +474,9 @@ class ReadCasefile:
                 Headers.WATER_CUT,
             ]
             self.wsegsicd_table = input_validation.set_format_wsegsicd(
-                self._create_dataframe_with_columns(header, start_index, end_index)
+                self._create_dataframe_with_columns(
+                    header, start_index, end_index, dtypes=_device_table_dtypes(header, (Headers.WATER_CUT,))
+                )
             )
             # Check if the device in COMPLETION is exist in INFLOW_CONTROL_DEVICE
             device_checks = self.completion_table[
@@ -417,7 +494,7 @@ class ReadCasefile:
                 or if the device number is not found.
                 If all devices in COMPLETION are not specified in AUTONOMOUS_INFLOW_CONTROL_DEVICE.
         """
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.AUTONOMOUS_INFLOW_CONTROL_DEVICE)
+        start_index, end_index = self.keyword_index.locate(Keywords.AUTONOMOUS_INFLOW_CONTROL_DEVICE)
         if start_index == end_index:
             if Content.AUTONOMOUS_INFLOW_CONTROL_DEVICE in self.completion_table[Headers.DEVICE_TYPE]:
                 raise CompletorError(
@@ -442,10 +519,14 @@ class ReadCasefile:
                 Headers.Z,
             ]
             try:
-                df_temp = self._create_dataframe_with_columns(header, start_index, end_index)
+                df_temp = self._create_dataframe_with_columns(
+                    header, start_index, end_index, dtypes=_device_table_dtypes(header)
+                )
             except CaseReaderFormatError:
                 header.remove(Headers.Z)
-                df_temp = self._create_dataframe_with_columns(header, start_index, end_index)
+                df_temp = self._create_dataframe_with_columns(
+                    header, start_index, end_index, dtypes=_device_table_dtypes(header)
+                )
             self.wsegaicd_table = input_validation.set_format_wsegaicd(df_temp)
             device_checks = self.completion_table[
                 self.completion_table[Headers.DEVICE_TYPE] == Content.AUTONOMOUS_INFLOW_CONTROL_DEVICE
@@ -463,8 +544,8 @@ class ReadCasefile:
             CompletorError: If not all device in COMPLETION is specified in DENSITY.
                 If DENSITY keyword not defined, when DENSITY is used in the completion.
         """
-        density_index_start, density_index_end = parse.locate_keyword(self.content, Keywords.DENSITY)
-        dar_index_start, dar_index_end = parse.locate_keyword(self.content, Keywords.DENSITY_ACTIVATED_RECOVERY)
+        density_index_start, density_index_end = self.keyword_index.locate(Keywords.DENSITY)
+        dar_index_start, dar_index_end = self.keyword_index.locate(Keywords.DENSITY_ACTIVATED_RECOVERY)
 
         # Determine which keyword is present
         if density_index_start == density_index_end and dar_index_start == dar_index_end:
@@ -500,7 +581,7 @@ class ReadCasefile:
                 content = Content.DENSITY_ACTIVATED_RECOVERY
             # Fix table format
             self.wsegdensity_table = input_validation.set_format_wsegdensity(
-                self._create_dataframe_with_columns(header, start_index, end_index)
+                self._create_dataframe_with_columns(header, start_index, end_index, dtypes=_device_table_dtypes(header))
             )
             device_checks = self.completion_table[self.completion_table[Headers.DEVICE_TYPE] == content][
                 Headers.DEVICE_NUMBER
@@ -516,7 +597,7 @@ class ReadCasefile:
                 or if the device number is not found.
                 If not all devices in COMPLETION are specified in INJECTION_VALVE.
         """
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.INJECTION_VALVE)
+        start_index, end_index = self.keyword_index.locate(Keywords.INJECTION_VALVE)
         if start_index == end_index:
             if Content.INJECTION_VALVE in self.completion_table[Headers.DEVICE_TYPE]:
                 raise CompletorError(
@@ -533,7 +614,9 @@ class ReadCasefile:
                 Headers.SECONDARY_FLOW_CROSS_SECTIONAL_AREA,
             ]
             self.wseginjv_table = input_validation.set_format_wseginjv(
-                self._create_dataframe_with_columns(header, start_index, end_index)
+                self._create_dataframe_with_columns(
+                    header, start_index, end_index, dtypes=_device_table_dtypes(header, (Headers.TRIGGER_PARAMETER,))
+                )
             )
             # Check if the device in COMPLETION is exist in INJECTION_VALVE
             device_checks = self.completion_table[
@@ -544,7 +627,7 @@ class ReadCasefile:
 
     def read_python_dependent(self) -> None:
         """Read PYTHON keyword. Accepts TRUE or just '/' as True."""
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.PYTHON_DEPENDENT)
+        start_index, end_index = self.keyword_index.locate(Keywords.PYTHON_DEPENDENT)
 
         if end_index == start_index + 1:
             # Keyword followed directly by '/', no value = True
@@ -562,10 +645,8 @@ class ReadCasefile:
             CompletorError: DUALRCP keyword not defined when DUALRCP is used in completion.
                 If all devices in COMPLETION are not specified in DUALRCP.
         """
-        dualrcp_index_start, dualrcp_index_end = parse.locate_keyword(
-            self.content, Keywords.DUAL_RATE_CONTROLLED_PRODUCTION
-        )
-        aicv_index_start, aicv_index_end = parse.locate_keyword(self.content, Keywords.AUTONOMOUS_INFLOW_CONTROL_VALVE)
+        dualrcp_index_start, dualrcp_index_end = self.keyword_index.locate(Keywords.DUAL_RATE_CONTROLLED_PRODUCTION)
+        aicv_index_start, aicv_index_end = self.keyword_index.locate(Keywords.AUTONOMOUS_INFLOW_CONTROL_VALVE)
 
         # Determine which keyword is present
         if dualrcp_index_start == dualrcp_index_end and aicv_index_start == aicv_index_end:
@@ -615,7 +696,7 @@ class ReadCasefile:
                 content = Content.AUTONOMOUS_INFLOW_CONTROL_VALVE
             # Fix table format
             self.wsegdualrcp_table = input_validation.set_format_wsegdualrcp(
-                self._create_dataframe_with_columns(header, start_index, end_index)
+                self._create_dataframe_with_columns(header, start_index, end_index, dtypes=_device_table_dtypes(header))
             )
             # Check if the device in COMPLETION is exist in DUALRCP
             device_checks = self.completion_table[self.completion_table[Headers.DEVICE_TYPE] == content][
@@ -632,7 +713,7 @@ class ReadCasefile:
             CompletorError: INFLOW_CONTROL_VALVE keyword not defined when ICV is used in completion.
         """
 
-        start_index, end_index = parse.locate_keyword(self.content, Keywords.INFLOW_CONTROL_VALVE)
+        start_index, end_index = self.keyword_index.locate(Keywords.INFLOW_CONTROL_VALVE)
         if start_index == end_index:
             if Content.INFLOW_CONTROL_VALVE in self.completion_table[Headers.DEVICE_TYPE]:
                 raise CompletorError("INFLOW_CONTROL_VALVE keyword must be defined, if ICV is used in the completion")
@@ -640,11 +721,15 @@ class ReadCasefile:
             # Table headers
             header = [Headers.DEVICE_NUMBER, Headers.FLOW_COEFFICIENT, Headers.FLOW_CROSS_SECTIONAL_AREA]
             try:
-                df_temp = self._create_dataframe_with_columns(header, start_index, end_index)
+                df_temp = self._create_dataframe_with_columns(
+                    header, start_index, end_index, dtypes=_device_table_dtypes(header)
+                )
                 df_temp[Headers.MAX_FLOW_CROSS_SECTIONAL_AREA] = np.nan
             except CaseReaderFormatError:
                 header += [Headers.MAX_FLOW_CROSS_SECTIONAL_AREA]
-                df_temp = self._create_dataframe_with_columns(header, start_index, end_index)
+                df_temp = self._create_dataframe_with_columns(
+                    header, start_index, end_index, dtypes=_device_table_dtypes(header)
+                )
             # Fix format
             self.wsegicv_table = input_validation.set_format_wsegicv(df_temp)
             # Check if the device in COMPLETION exists in INFLOW_CONTROL_VALVE
@@ -735,24 +820,34 @@ class ReadCasefile:
         return True
 
     def _create_dataframe_with_columns(
-        self, header: list[str], start_index: int, end_index: int, keyword: str | None = None
+        self,
+        header: list[str],
+        start_index: int,
+        end_index: int,
+        keyword: str | None = None,
+        dtypes: Mapping[str, type] | None = None,
     ) -> pd.DataFrame:
         """Helper method to create a dataframe with given columns' header and content.
 
+        The records are split into values and put in columns directly, with the quotes removed. Columns in `dtypes`
+        are converted to their type as they are read, other columns are left as text.
+
         Args:
             header: List of column names.
             start_index: From (but not including) where in `self.content`.
             end_index: to where to include in the body of the table.
+            keyword: The keyword of the table, if not the line at `start_index`.
+            dtypes: The type of each column that is converted, e.g. `np.float64` or `np.int64`.
 
         Returns:
             Combined DataFrame.
 
         Raises:
             CaseReaderFormatError: If keyword is malformed, or has different amount of data than the header.
+            CaseReaderValueError: If a value cannot be converted to the type of its column.
         """
         if keyword is None:
             keyword = self.content[start_index]
-        table_header = " ".join(header)
         # Handle weirdly formed keywords.
         if start_index + 1 == end_index or self.content[start_index + 1].endswith("/"):
             content_str = "\n".join(self.content[start_index + 1 :]) + "\n"
@@ -765,26 +860,55 @@ class ReadCasefile:
                     "Cannot determine correct end of record '/' for keyword.", self.case_file, header, keyword
                 )
             end_record = match.span()[0]
-            # From keyword to the end (without the last slash)
-            content_ = content_str[:end_record].split("/\n")[:-1]
-            content_ = [line.strip() for line in content_]
-            table_content = "\n".join(content_) + "\n"
+            # From keyword to the end (without the last slash), each record ending with a slash.
+            records = []
+            content_index = start_index + 1
+            for record in content_str[:end_record].split("/\n")[:-1]:
+                record_lines = record.strip().split("\n")
+                records.extend(enumerate(record_lines, content_index))
+                content_index += record.count("\n") + 1
         else:
-            table_content = "\n".join(self.content[start_index + 1 : end_index])
-
-        header_len = len(table_header.split())
-        content_list_len = [len(line.split()) for line in table_content.splitlines()]
-        if not all(header_len == x for x in content_list_len):
-            message = (
-                "Problem with case file. Note that the COMPLETION keyword takes "
-                "exactly 11 (eleven) columns. Blank portion is now removed.\n"
-            )
-            raise CaseReaderFormatError(message, lines=self.case_file, header=header, keyword=keyword)
-
-        table = table_header + "\n" + table_content
-
-        df_temp = pd.read_csv(StringIO(table), sep=" ", dtype="object", index_col=False)
-        return parse.remove_string_characters(df_temp)
+            records = list(enumerate(self.content[start_index + 1 : end_index], start_index + 1))
+
+        rows = []
+        for content_index, line in records:
+            values = line.split()
+            if len(values) != len(header):
+                message = (
+                    "Problem with case file. Note that the COMPLETION keyword takes "
+                    "exactly 11 (eleven) columns. Blank portion is now removed.\n"
+                )
+                raise CaseReaderFormatError(
+                    message,
+                    lines=self.case_file,
+                    header=header,
+                    keyword=keyword,
+                    error_index=self._line_numbers[content_index],
+                    is_larger=len(values) > len(header),
+                )
+            rows.append([_read_value(value) for value in values])
+
+        columns = {}
+        for column_number, column in enumerate(header):
+            values = [row[column_number] for row in rows]
+            dtype = None if dtypes is None else dtypes.get(column)
+            if dtype is None:
+                columns[column] = np.array(values, dtype=object)
+                continue
+            converter = int if np.issubdtype(dtype, np.integer) else float
+            converted = []
+            for row_number, value in enumerate(values):
+                try:
+                    converted.append(converter(value))
+                except (TypeError, ValueError):
+                    raise CaseReaderValueError(
+                        f"Could not read the value '{value}' in column {column} of keyword '{keyword}' as "
+                        f"{'an integer' if converter is int else 'a number'}.",
+                        self.case_file,
+                        self._line_numbers[records[row_number][0]],
+                    ) from None
+            columns[column] = np.array(converted, dtype=dtype)
+        return pd.DataFrame(columns)
 
     @staticmethod
     def _mapper(map_file: str) -> dict[str, str]:
@@ -862,7 +986,7 @@ class ICVReadCasefile(ReadCasefile):
         The ICVCONTROL keyword information is stored in a class property
         DataFrame ``self.icv_control_table`` with the following format:
         """
-        start_index, end_index = locate_keyword(self.content, "ICVCONTROL")
+        start_index, end_index = self.keyword_index.locate("ICVCONTROL")
         if start_index == end_index:
             logger.warning("No ICVCONTROL table is found in the case file.")
 
@@ -935,23 +1059,14 @@ class ICVReadCasefile(ReadCasefile):
                  - str
 
         """
-        start_arr = []
-        end_arr = []
-        i = 0
-        while i < len(self.content):
-            start, end = locate_keyword(self.content[i:], "ICVTABLE")
-            if start == np.array([-1]):
-                break
-            start_arr.append(start + i)
-            end_arr.append(end + i)
-            i += end
+        spans = self.keyword_index.spans("ICVTABLE")
 
-        if not start_arr:
+        if not spans:
             logger.info("No ICVTABLE is found in the case file. Using default steps to adjust openings.")
             return None
         # Table headers
         header = ["POSITION", "CV", "AREA"]
-        for start_index, end_index in zip(start_arr, end_arr):
+        for start_index, end_index in spans:
             table_name = self.content[start_index + 1 : start_index + 2]
             table_name = table_name[0].strip("/").split()
             df_temp = self._create_dataframe_with_columns(header, start_index + 1, end_index)
@@ -976,22 +1091,13 @@ class ICVReadCasefile(ReadCasefile):
         Returns:
             A dictionary containing the custom conditions.
         """
-        start_arr = []
-        end_arr = []
-        i = 0
-        while i < len(self.content):
-            start, end = locate_keyword(self.content[i:], "CONTROL_CRITERIA")
-            if start == np.array([-1]):
-                break
-            start_arr.append(start + i)
-            end_arr.append(end + i)
-            i += end
+        spans = self.keyword_index.spans("CONTROL_CRITERIA")
 
-        if not start_arr:
+        if not spans:
             self.custom_conditions = {}
             return self.custom_conditions
 
-        for start, end in zip(start_arr, end_arr):
+        for start, end in spans:
             self.parse_custom_conditions(self.content[start + 1 : end])
 
         return self.custom_conditions
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 from completor.constants import Content, Headers, Keywords, ScheduleData, WellData
+from completor.exceptions.clean_exceptions import CompletorError
 from completor.logger import logger
 from completor.utils import sort_by_midpoint
 
@@ -11,12 +13,17 @@ from completor.utils import sort_by_midpoint
 def fix_welsegs(df_header: pd.DataFrame, df_content: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Convert a WELL_SEGMENTS DataFrame specified in incremental (INC) to absolute (ABS) values.
 
+    The segments may be listed in any order, as long as every outlet segment is defined.
+
     Args:
         df_header: First record table of WELL_SEGMENTS.
         df_content: Second record table of WELL_SEGMENTS.
 
     Returns:
         Updated header DataFrame, Updated content DataFrame.
+
+    Raises:
+        CompletorError: If an outlet segment is not defined, or if the segments form a cycle.
     """
     df_header = df_header.copy()
     df_content = df_content.copy()
@@ -33,14 +40,46 @@ def fix_welsegs(df_header: pd.DataFrame, df_content: pd.DataFrame) -> tuple[pd.D
     md_new = np.zeros(inlet_segment.shape[0])
     tvd_new = np.zeros(inlet_segment.shape[0])
 
-    for idx, idx_segment in enumerate(outlet_segment):
-        if idx_segment == 1:
-            md_new[idx] = ref_md + md_inc[idx]
-            tvd_new[idx] = ref_tvd + tvd_inc[idx]
-        else:
-            out_idx = np.where(inlet_segment == idx_segment)[0][0]
-            md_new[idx] = md_new[out_idx] + md_inc[idx]
-            tvd_new[idx] = tvd_new[out_idx] + tvd_inc[idx]
+    # Row of the outlet of each row, or -1 if the outlet is the top segment, which is at the reference depth.
+    row_of_segment: dict[int, int] = {}
+    for row, segment in enumerate(inlet_segment.tolist()):
+        row_of_segment.setdefault(segment, row)
+    outlet_row = np.full(inlet_segment.shape[0], -1)
+    for row, segment in enumerate(outlet_segment.tolist()):
+        if segment == 1:
+            continue
+        if segment not in row_of_segment:
+            raise CompletorError(
+                f"Segment {inlet_segment[row]} in {Keywords.WELL_SEGMENTS} has outlet segment {segment}, "
+                "which is not defined."
+            )
+        outlet_row[row] = row_of_segment[segment]
+
+    # Each row is resolved after its outlet, walking towards the top segment from any row not resolved yet,
+    # so every row is visited once regardless of the order of the branches.
+    resolved = np.zeros(inlet_segment.shape[0], dtype=bool)
+    on_path = np.zeros(inlet_segment.shape[0], dtype=bool)
+    for first_row in range(inlet_segment.shape[0]):
+        path = []
+        row = first_row
+        while row != -1 and not resolved[row]:
+            if on_path[row]:
+                cycle = [str(inlet_segment[path_row]) for path_row in path[path.index(row) :]]
+                raise CompletorError(
+                    f"The segments {', '.join(cycle)} in {Keywords.WELL_SEGMENTS} are each other's outlets."
+                )
+            on_path[row] = True
+            path.append(row)
+            row = outlet_row[row]
+        for row in reversed(path):
+            out_idx = outlet_row[row]
+            if out_idx == -1:
+                md_new[row] = ref_md + md_inc[row]
+                tvd_new[row] = ref_tvd + tvd_inc[row]
+            else:
+                md_new[row] = md_new[out_idx] + md_inc[row]
+                tvd_new[row] = tvd_new[out_idx] + tvd_inc[row]
+            resolved[row] = True
 
     # update data frame
     df_header[Headers.INFO_TYPE] = ["ABS"]
@@ -66,58 +105,75 @@ def fix_compsegs(df_compsegs: pd.DataFrame, well_name: str) -> pd.DataFrame:
     df_compsegs = df_compsegs.copy(deep=True)
     start_md = df_compsegs[Headers.START_MEASURED_DEPTH].to_numpy()
     end_md = df_compsegs[Headers.END_MEASURED_DEPTH].to_numpy()
-    data_length = len(start_md)
-    start_md_new = np.zeros(data_length)
-    end_md_new = np.zeros(data_length)
-
-    if len(start_md) > 0:
-        start_md_new[0] = start_md[0]
-        end_md_new[0] = end_md[0]
-
-    # Check the cells connection
-    for idx in range(1, len(start_md)):
-        if (start_md[idx] - end_md_new[idx - 1]) < -0.1:
-            if end_md[idx] > end_md_new[idx - 1]:
-                # fix the start of current cells
-                start_md_new[idx] = end_md_new[idx - 1]
-                end_md_new[idx] = end_md[idx]
-
-            # fix the end of the previous cells
-            elif start_md[idx] > start_md_new[idx - 1]:
-                end_md_new[idx - 1] = start_md[idx]
-                start_md_new[idx - 1] = start_md_new[idx - 1]
-                start_md_new[idx] = start_md[idx]
-                end_md_new[idx] = end_md[idx]
-            else:
-                logger.info(
-                    "Overlapping in COMPLETION_SEGMENTS%s for %s. Sorts the depths accordingly",
-                    Keywords.COMPLETION_SEGMENTS,
-                    well_name,
-                )
-                comb_depth = np.append(start_md, end_md)
-                comb_depth = np.sort(comb_depth)
-                start_md_new = np.copy(comb_depth[::2])
-                end_md_new = np.copy(comb_depth[1::2])
-                break
-        else:
-            start_md_new[idx] = start_md[idx]
-            end_md_new[idx] = end_md[idx]
+
+    # Each cell is compared to the cell before it, in one sweep over the cells.
+    # A cell that overlaps the one before it and ends after it starts where the one before it ends.
+    overlapping = start_md[1:] - end_md[:-1] < -0.1
+    fix_start = overlapping & (end_md[1:] > end_md[:-1])
+    start_md_new = start_md.astype(np.float64)
+    start_md_new[1:][fix_start] = end_md[:-1][fix_start]
+    # Otherwise, if it starts after the cell before it, the cell before it ends where it starts.
+    fix_end = overlapping & ~fix_start & (start_md[1:] > start_md_new[:-1])
+    end_md_new = end_md.astype(np.float64)
+    end_md_new[:-1][fix_end] = start_md[1:][fix_end]
+    if (overlapping & ~fix_start & ~fix_end).any():
+        # A cell lies within the cell before it.
+        logger.info(
+            "Overlapping in COMPLETION_SEGMENTS%s for %s. Sorts the depths accordingly",
+            Keywords.COMPLETION_SEGMENTS,
+            well_name,
+        )
+        comb_depth = np.sort(np.append(start_md, end_md))
+        start_md_new = np.copy(comb_depth[::2])
+        end_md_new = np.copy(comb_depth[1::2])
+    else:
+        _log_adjusted_cells(start_md, end_md, start_md_new, end_md_new, well_name)
+
     # In some instances with complex overlapping segments, the algorithm above
     # creates segments where start == end. To overcome this, the following is added.
-    for idx in range(1, len(start_md_new) - 1):
-        if start_md_new[idx] == end_md_new[idx]:
-            if start_md_new[idx + 1] >= end_md_new[idx]:
-                end_md_new[idx] = start_md_new[idx + 1]
-            if start_md_new[idx] >= end_md_new[idx - 1]:
-                start_md_new[idx] = end_md_new[idx - 1]
-            else:
-                logger.error(
-                    "Cannot construct COMPLETION_SEGMENTS%s segments based on current input",
-                    Keywords.COMPLETION_SEGMENTS,
-                )
+    # Only the cell itself is changed, so the empty cells can be found up front.
+    empty_cells = np.flatnonzero(start_md_new[1:-1] == end_md_new[1:-1]) + 1
+    for idx in empty_cells:
+        if start_md_new[idx + 1] >= end_md_new[idx]:
+            end_md_new[idx] = start_md_new[idx + 1]
+        if start_md_new[idx] >= end_md_new[idx - 1]:
+            start_md_new[idx] = end_md_new[idx - 1]
+        else:
+            logger.error(
+                "Cannot construct COMPLETION_SEGMENTS%s segments based on current input",
+                Keywords.COMPLETION_SEGMENTS,
+            )
     return sort_by_midpoint(df_compsegs, start_md_new, end_md_new)
 
 
+def _log_adjusted_cells(
+    start_md: npt.NDArray[np.float64],
+    end_md: npt.NDArray[np.float64],
+    start_md_new: npt.NDArray[np.float64],
+    end_md_new: npt.NDArray[np.float64],
+    description: str,
+) -> None:
+    """Log the cells whose depths were changed to remove overlaps.
+
+    Args:
+        start_md: Start measured depths before the change.
+        end_md: End measured depths before the change.
+        start_md_new: Start measured depths after the change.
+        end_md_new: End measured depths after the change.
+        description: What the cells belong to, e.g. the well name.
+    """
+    adjusted = np.flatnonzero((start_md != start_md_new) | (end_md != end_md_new))
+    if len(adjusted) == 0:
+        return
+    logger.debug(
+        "Adjusted %d overlapping cells in %s for %s: %s",
+        len(adjusted),
+        Keywords.COMPLETION_SEGMENTS,
+        description,
+        ", ".join(f"{start_md[i]}-{end_md[i]} to {start_md_new[i]}-{end_md_new[i]}" for i in adjusted),
+    )
+
+
 def fix_compsegs_by_priority(
     df_completion: pd.DataFrame, df_compsegs: pd.DataFrame, df_custom_compsegs: pd.DataFrame
 ) -> pd.DataFrame:
@@ -140,12 +196,17 @@ def fix_compsegs_by_priority(
     df_compsegs["priority"] = 1
     df_custom_compsegs = df_custom_compsegs.copy(deep=True)
     df_custom_compsegs["priority"] = 2
-    start_end = df_custom_compsegs[[Headers.START_MEASURED_DEPTH, Headers.END_MEASURED_DEPTH]]
-    # Remove the rows that are between the STARTMD and ENDMD
-    # values of the custom composition segments.
-    for start, end in start_end.values:
-        between_lower_upper = (df_compsegs[Headers.START_MEASURED_DEPTH] >= start) & (
-            df_compsegs[Headers.END_MEASURED_DEPTH] <= end
+
+    # Remove the rows that are between the STARTMD and ENDMD values of any of the custom composition segments.
+    # A row is within a custom segment if the custom segments starting at or above it reach at least as deep.
+    custom_start = df_custom_compsegs[Headers.START_MEASURED_DEPTH].to_numpy()
+    order = np.argsort(custom_start, kind="stable")
+    custom_start = custom_start[order]
+    deepest_end = np.maximum.accumulate(df_custom_compsegs[Headers.END_MEASURED_DEPTH].to_numpy()[order])
+    if len(custom_start) > 0:
+        idx_custom = np.searchsorted(custom_start, df_compsegs[Headers.START_MEASURED_DEPTH].to_numpy(), "right") - 1
+        between_lower_upper = (idx_custom >= 0) & (
+            deepest_end[np.maximum(idx_custom, 0)] >= df_compsegs[Headers.END_MEASURED_DEPTH].to_numpy()
         )
         df_compsegs = df_compsegs[~between_lower_upper]
 
@@ -156,12 +217,17 @@ def fix_compsegs_by_priority(
         .sort_values(by=[Headers.START_MEASURED_DEPTH])
         .reset_index(drop=True)
     )
-    # Filter the dataframe to get only rows where the "priority" column has a value of 2
-    for idx in df[df["priority"] == 2].index:
-        # Set previous row's ENDMD to correct value.
-        df.loc[idx - 1, Headers.END_MEASURED_DEPTH] = df.loc[idx, Headers.START_MEASURED_DEPTH]
-        # Set next row's STARTMD to correct value.
-        df.loc[idx + 1, Headers.START_MEASURED_DEPTH] = df.loc[idx, Headers.END_MEASURED_DEPTH]
+    # The row above each custom segment ends where it starts, and the row below it starts where it ends.
+    is_custom = df["priority"].to_numpy() == 2
+    start_md = df[Headers.START_MEASURED_DEPTH].to_numpy()
+    end_md = df[Headers.END_MEASURED_DEPTH].to_numpy()
+    start_md_new = start_md.copy()
+    end_md_new = end_md.copy()
+    start_md_new[1:][is_custom[:-1]] = end_md[:-1][is_custom[:-1]]
+    end_md_new[:-1][is_custom[1:]] = start_md_new[1:][is_custom[1:]]
+    _log_adjusted_cells(start_md, end_md, start_md_new, end_md_new, "the custom segments")
+    df[Headers.START_MEASURED_DEPTH] = start_md_new
+    df[Headers.END_MEASURED_DEPTH] = end_md_new
     df = fix_compsegs(df, "Fix compseg after prioriry")
     df = df.dropna()
 
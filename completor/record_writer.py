@@ -0,0 +1,536 @@
+"""Fixed-width writer for the records of reservoir simulator keywords.
+
+Writes the same text as `DataFrame.to_string(index=False, justify="justify", sparsify=False)` does for the tables
+Completor prints, without building the intermediate DataFrames, column MultiIndex, and formatter objects pandas
+needs. The header and column formats of each table layout are only worked out once.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from functools import lru_cache
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from completor.constants import Headers
+from completor.logger import logger
+from completor.utils import check_width_lines
+
+# Format of the columns that are formatted, by column name.
+COLUMN_FORMATS: dict[str, str] = {
+    Headers.STRENGTH: "{:.10g}",
+    Headers.SCALE_FACTOR: "{:.10g}",
+    Headers.ROUGHNESS: "{:.10g}",
+    Headers.CONNECTION_FACTOR: "{:.10g}",
+    "CONNECTION_FACTOR": "{:.10g}",
+    Headers.FORMATION_PERMEABILITY_THICKNESS: "{:.10g}",
+    "FORMATION_PERMEABILITY_THICKNESS": "{:.10g}",
+    Headers.MEASURED_DEPTH: "{:.3f}",
+    "MD": "{:.3f}",
+    Headers.TRUE_VERTICAL_DEPTH: "{:.3f}",
+    "TVD": "{:.3f}",
+    Headers.START_MEASURED_DEPTH: "{:.3f}",
+    "START_MD": "{:.3f}",
+    Headers.END_MEASURED_DEPTH: "{:.3f}",
+    "END_MD": "{:.3f}",
+    Headers.FLOW_COEFFICIENT: "{:.10g}",
+    "CV": "{:.10g}",
+    Headers.CROSS: "{:.3e}",
+    Headers.FLOW_CROSS_SECTIONAL_AREA: "{:.3e}",
+    "FLOW_CROSS_SECTIONAL_AREA": "{:.3e}",
+    Headers.OIL_FLOW_CROSS_SECTIONAL_AREA: "{:.3e}",
+    Headers.GAS_FLOW_CROSS_SECTIONAL_AREA: "{:.3e}",
+    Headers.WATER_FLOW_CROSS_SECTIONAL_AREA: "{:.3e}",
+    Headers.MAX_FLOW_CROSS_SECTIONAL_AREA: "{:.3e}",
+    Headers.DEFAULTS: "{:.10s}",
+    Headers.WATER_HOLDUP_FRACTION_LOW_CUTOFF: "{:.10g}",
+    Headers.WATER_HOLDUP_FRACTION_HIGH_CUTOFF: "{:.10g}",
+    Headers.GAS_HOLDUP_FRACTION_LOW_CUTOFF: "{:.10g}",
+    Headers.GAS_HOLDUP_FRACTION_HIGH_CUTOFF: "{:.10g}",
+    Headers.ALPHA_MAIN: "{:.10g}",
+    Headers.ALPHA_PILOT: "{:.10g}",
+}
+
+# Number of decimals pandas writes floats with, by default.
+_PRECISION = 6
+
+_NUMBER_WITH_DECIMAL = re.compile(r"^\s*[\+-]?[0-9]+\.[0-9]*$")
+
+
+class UnsupportedTable(Exception):
+    """The table holds values the record writer does not format the same way as pandas."""
+
+
+def _number_kept(is_default: Sequence[bool]) -> int:
+    """Count the columns kept when the trailing columns holding only default values, e.g. 1*, are removed.
+
+    Args:
+        is_default: If each column holds only default values.
+
+    Returns:
+        The number of columns up to and including the last one with a value that is not defaulted.
+    """
+    number_kept = 0
+    for idx, default in enumerate(is_default):
+        if not default:
+            number_kept = idx + 1
+    return number_kept
+
+
+def _trim_defaults(columns: list[tuple[str, np.ndarray]]) -> list[tuple[str, np.ndarray]]:
+    """Remove the trailing columns holding only default values, e.g. 1*.
+
+    Args:
+        columns: Name and values of each column.
+
+    Returns:
+        The columns up to and including the last one with a value that is not defaulted.
+    """
+    # Only text can hold default values.
+    is_default = [values.dtype == object and all("*" in str(value) for value in values) for _, values in columns]
+    return columns[: _number_kept(is_default)]
+
+
+def _format_column(values: np.ndarray, format_spec: str) -> np.ndarray | None:
+    """Format every value of a column.
+
+    Args:
+        values: The values.
+        format_spec: Format of the column, e.g. '{:.3f}'.
+
+    Returns:
+        The formatted values, or None if the format does not apply to the values.
+    """
+    formatter = format_spec.format
+    try:
+        return np.array([formatter(value) for value in values.tolist()], dtype=object)
+    except ValueError:
+        return None
+
+
+def _trim_zeros(formatted: list[str]) -> list[str]:
+    """Remove the trailing zeros all numbers with decimals have in common, leaving at least one decimal."""
+    numbers = [_NUMBER_WITH_DECIMAL.match(value) is not None for value in formatted]
+    if not any(numbers):
+        return formatted
+    trailing_zeros = min(len(value) - len(value.rstrip("0")) for value, number in zip(formatted, numbers) if number)
+    result = []
+    for value, number in zip(formatted, numbers):
+        if number:
+            value = value[: len(value) - trailing_zeros]
+            if value.endswith("."):
+                value += "0"
+        result.append(value)
+    return result
+
+
+def _float_strings(values: npt.NDArray[np.float64]) -> list[str]:
+    """Format floats like pandas does, with a common number of decimals, or in scientific notation if needed.
+
+    Args:
+        values: The values.
+
+    Returns:
+        The formatted values.
+    """
+    is_nan = np.isnan(values)
+    formatted = _trim_zeros(
+        ["NaN" if nan else f"{value:.{_PRECISION}f}" for value, nan in zip(values.tolist(), is_nan.tolist())]
+    )
+    abs_values = np.abs(values)
+    too_long = max(len(value) for value in formatted) > _PRECISION + 6
+    has_large_values = (abs_values > 1e6).any()
+    has_small_values = ((abs_values < 10**-_PRECISION) & (abs_values > 0)).any()
+    if has_small_values or (too_long and has_large_values):
+        formatted = [
+            "NaN" if nan else f"{value:.{_PRECISION}e}" for value, nan in zip(values.tolist(), is_nan.tolist())
+        ]
+    return formatted
+
+
+def _float_string(value: float) -> str:
+    """Format a float like pandas does in a column of its own.
+
+    Args:
+        value: The value.
+
+    Returns:
+        The formatted value.
+    """
+    if value != value:
+        return "NaN"
+    string = _trim_zeros([f"{value:.{_PRECISION}f}"])[0]
+    abs_value = abs(value)
+    if 0 < abs_value < 10 ** -_PRECISION or (len(string) > _PRECISION + 6 and abs_value > 1e6):
+        return f"{value:.{_PRECISION}e}"
+    return string
+
+
+def _object_strings(values: np.ndarray) -> list[str]:
+    """Format text, and the occasional number among it, like pandas does.
+
+    Args:
+        values: The values.
+
+    Returns:
+        The formatted values.
+
+    Raises:
+        UnsupportedTable: If there are values other than text and numbers, or text with tabs or line breaks.
+    """
+    formatted = []
+    for value in values.tolist():
+        if isinstance(value, str):
+            if "\t" in value or "\n" in value or "\r" in value:
+                raise UnsupportedTable("Text with tabs or line breaks.")
+            formatted.append(value)
+        elif isinstance(value, float):
+            if value != value:
+                formatted.append("NaN")
+            else:
+                string = f"{value: .{_PRECISION}f}".rstrip("0")
+                formatted.append(string + "0" if string.endswith(".") else string)
+        elif isinstance(value, int) and not isinstance(value, bool):
+            formatted.append(str(value))
+        elif value is None:
+            formatted.append("None")
+        else:
+            raise UnsupportedTable(f"Values of type {type(value).__name__}.")
+    return formatted
+
+
+def _value_strings(values: np.ndarray) -> list[str]:
+    """Format the values of a column, right-justified to the same width.
+
+    Args:
+        values: The values.
+
+    Returns:
+        The formatted values.
+
+    Raises:
+        UnsupportedTable: If the values are not formatted the same way as by pandas.
+    """
+    if values.dtype.kind == "f":
+        formatted = _float_strings(values)
+    elif values.dtype.kind in "iu":
+        formatted = [str(value) for value in values.tolist()]
+    elif values.dtype == object:
+        formatted = _object_strings(values)
+    else:
+        raise UnsupportedTable(f"Columns of type {values.dtype}.")
+    return _fixed_width(formatted, 0, "right")
+
+
+def _fixed_width(strings: list[str], minimum: int, justify: str) -> list[str]:
+    """Justify strings to the same width.
+
+    Args:
+        strings: The strings.
+        minimum: The minimum width.
+        justify: 'left' to left-justify, otherwise right-justify.
+
+    Returns:
+        The justified strings.
+    """
+    width = max(minimum, *(len(string) for string in strings))
+    if justify == "left":
+        return [string.ljust(width) for string in strings]
+    return [string.rjust(width) for string in strings]
+
+
+@lru_cache(maxsize=256)
+def _header_lines(
+    names: tuple[str, ...], is_numeric: tuple[bool, ...], split_names: bool
+) -> tuple[tuple[tuple[str, ...], ...], int]:
+    """Work out the header of a table layout.
+
+    Args:
+        names: The column names.
+        is_numeric: If each column holds numbers, which pandas puts a space in front of in the header.
+        split_names: If names are split on underscores to stack their parts on separate lines.
+
+    Returns:
+        The header text of each column, one string per header line, and the number of header lines.
+    """
+    if not split_names:
+        need_space = dict(zip(names, is_numeric))
+        return tuple((" " + name if need_space[name] else name,) for name in names), 1
+    parts = [tuple(name.split("_")) for name in names]
+    number_of_levels = max(len(part) for part in parts)
+    if number_of_levels == 1:
+        need_space = dict(zip(names, is_numeric))
+        return tuple((" " + name if need_space[name] else name,) for name in names), 1
+    if parts[0][0].startswith("--"):
+        # Make sure each level is commented out!
+        parts[0] = ("--",) * number_of_levels
+    # Unlike single-line headers, pandas does not put a space in front of the header of numeric columns here.
+    return tuple(part + ("",) * (number_of_levels - len(part)) for part in parts), number_of_levels
+
+
+def _join_columns(
+    headers: Sequence[tuple[str, ...]] | None, value_columns: list[list[str]], justify: str
+) -> tuple[list[str], int]:
+    """Put the columns side by side, one space apart.
+
+    Args:
+        headers: The header text of each column, if the header is written.
+        value_columns: The formatted values of each column, right-justified to the same width.
+        justify: 'left' to left-justify the columns, otherwise right-justify.
+
+    Returns:
+        The lines, and their width.
+    """
+    text_columns = []
+    for idx, values in enumerate(value_columns):
+        if headers is None:
+            text_columns.append(_fixed_width(values, 0, justify))
+            continue
+        header_width = max(len(level) for level in headers[idx])
+        values = _fixed_width(values, header_width, justify)
+        width = max(len(values[0]), header_width)
+        if justify == "left":
+            text_columns.append([level.ljust(width) for level in headers[idx]] + values)
+        else:
+            text_columns.append([level.rjust(width) for level in headers[idx]] + values)
+    widths = [max(len(text) for text in column) + 1 for column in text_columns[:-1]]
+    widths.append(max(len(text) for text in text_columns[-1]))
+    padded = [[text.ljust(width) for text in column] for column, width in zip(text_columns, widths)]
+    return ["".join(line) for line in zip(*padded)], sum(widths)
+
+
+def format_records(
+    df_temp: pd.DataFrame,
+    format_column: bool = False,
+    trim_df: bool = True,
+    header: bool = True,
+    keep_header: bool = True,
+    limit: int = 128,
+) -> str:
+    """Write the records of a keyword as fixed-width text.
+
+    The text is the same as written by `prepare_outputs.dataframe_tostring` using pandas.
+    The table is not modified.
+
+    Args:
+        df_temp: COMPLETION_DATA, COMPLETION_SEGMENTS, etc.
+        format_column: If columns are to be formatted.
+        trim_df: Ignored. Trailing defaulted columns are always trimmed, as `prepare_outputs.dataframe_tostring`
+            does when adding the first and last columns. Kept so the arguments are the same.
+        header: Keep header (True) or not (False).
+        keep_header: Keep the header lines in the text returned.
+        limit: Limit width of the lines.
+
+    Returns:
+        Text string of the records.
+
+    Raises:
+        UnsupportedTable: If the table cannot be written the same way as by pandas.
+    """
+    if df_temp.empty:
+        return ""
+    names = df_temp.columns.tolist()
+    if not all(isinstance(name, str) for name in names) or len(set(names)) != len(names):
+        raise UnsupportedTable("Column names that are not unique text.")
+    number_of_rows = df_temp.shape[0]
+    columns = [(name, df_temp.iloc[:, idx].to_numpy()) for idx, name in enumerate(names)]
+
+    # Add the comment column first and the record terminator last, unless they are there already.
+    if names[-1] != Headers.EMPTY:
+        columns = _trim_defaults(columns)
+        columns.append((Headers.EMPTY, np.full(number_of_rows, "/", dtype=object)))
+    if columns[0][0] != "--":
+        columns = _trim_defaults(columns)
+        columns.insert(0, ("--", np.full(number_of_rows, " ", dtype=object)))
+
+    formatted_columns: list[tuple[str, np.ndarray]] = []
+    for name, values in columns:
+        if name == Headers.WELL:
+            # Add single quotes around well names in an output file.
+            if values.dtype == object and all(isinstance(value, str) for value in values):
+                values = np.array([f"'{value}'" for value in values], dtype=object)
+            else:
+                values = ("'" + pd.Series(values).astype(str) + "'").to_numpy()
+        if format_column and name in COLUMN_FORMATS:
+            formatted = _format_column(values, COLUMN_FORMATS[name])
+            if formatted is not None:
+                values = formatted
+        formatted_columns.append((name, values))
+
+    names = [name for name, _ in formatted_columns]
+    is_numeric = [values.dtype.kind in "biufc" for _, values in formatted_columns]
+    value_columns = [_value_strings(values) for _, values in formatted_columns]
+    return _write(names, is_numeric, value_columns, format_column, header, keep_header, limit)
+
+
+def _write(
+    names: list[str],
+    is_numeric: list[bool],
+    value_columns: list[list[str]],
+    split_names: bool,
+    header: bool,
+    keep_header: bool,
+    limit: int,
+) -> str:
+    """Write the formatted columns of a table, and check the width of the lines.
+
+    Args:
+        names: The column names.
+        is_numeric: If each column holds numbers.
+        value_columns: The formatted values of each column, right-justified to the same width.
+        split_names: If names are split on underscores to stack their parts on separate header lines.
+        header: Keep header (True) or not (False).
+        keep_header: Keep the header lines in the text returned.
+        limit: Limit width of the lines.
+
+    Returns:
+        Text string of the records.
+    """
+    headers: Sequence[tuple[str, ...]] | None = None
+    number_of_levels = 1
+    if header:
+        headers, number_of_levels = _header_lines(tuple(names), tuple(is_numeric), split_names)
+
+    lines, width = _join_columns(headers, value_columns, "right")
+    output_string = "\n".join(lines)
+    if width >= limit:
+        too_long_lines = check_width_lines(output_string, limit)
+        if too_long_lines:
+            lines, _ = _join_columns(headers, value_columns, "left")
+            output_string = "\n".join(lines)
+            if check_width_lines(output_string, limit):
+                # Still, some issues. Reporting on the original errors.
+                number_of_lines = len(too_long_lines)
+                logger.error(
+                    f"Some data-lines in the output are wider than limit of {limit} characters for some reservoir "
+                    f"simulators!\nThis is concerning line-numbers: {[tup[0] for tup in too_long_lines]}\n"
+                    f"{'An excerpt of the five first' if number_of_lines > 5 else 'The'} lines:\n"
+                    + "\n".join([tup[1] for tup in too_long_lines[: min(number_of_lines, 5)]])
+                )
+
+    if keep_header:
+        return output_string
+    return "\n".join(lines[number_of_levels:])
+
+
+def format_rows(
+    df_temp: pd.DataFrame,
+    format_column: bool = False,
+    trim_df: bool = True,
+    header: bool = True,
+    keep_header: bool = True,
+    limit: int = 128,
+) -> list[str]:
+    """Write each record of a keyword as fixed-width text of its own.
+
+    The text of each row is the same as `format_records` writes for a table holding only that row, but each column
+    is formatted once for all the rows. The table is not modified.
+
+    Args:
+        df_temp: WELL_SEGMENTS_VALVE, AUTONOMOUS_INFLOW_CONTROL_DEVICE, etc.
+        format_column: If columns are to be formatted.
+        trim_df: Ignored. Trailing defaulted columns are always trimmed, as `prepare_outputs.dataframe_tostring`
+            does when adding the first and last columns. Kept so the arguments are the same.
+        header: Keep header (True) or not (False).
+        keep_header: Keep the header lines in the text returned.
+        limit: Limit width of the lines.
+
+    Returns:
+        Text string of the record in each row.
+
+    Raises:
+        UnsupportedTable: If the table cannot be written the same way as by pandas.
+    """
+    if df_temp.empty:
+        return []
+    names = df_temp.columns.tolist()
+    if not all(isinstance(name, str) for name in names) or len(set(names)) != len(names):
+        raise UnsupportedTable("Column names that are not unique text.")
+    number_of_rows = df_temp.shape[0]
+    value_columns = []
+    numeric_columns = []
+    default_columns = []
+    for idx, name in enumerate(names):
+        values = df_temp.iloc[:, idx].to_numpy()
+        strings, is_numeric = _row_strings(name, values, format_column)
+        value_columns.append(strings)
+        numeric_columns.append(is_numeric)
+        if values.dtype == object:
+            default_columns.append(["*" in str(value) for value in values.tolist()])
+        else:
+            default_columns.append([False] * number_of_rows)
+
+    records = []
+    for row in range(number_of_rows):
+        row_names = list(names)
+        row_values = [strings[row] for strings in value_columns]
+        row_numeric = [is_numeric[row] for is_numeric in numeric_columns]
+        row_defaults = [is_default[row] for is_default in default_columns]
+        # Add the comment column first and the record terminator last, unless they are there already.
+        if row_names[-1] != Headers.EMPTY:
+            number_kept = _number_kept(row_defaults)
+            row_names = row_names[:number_kept] + [Headers.EMPTY]
+            row_values = row_values[:number_kept] + ["/"]
+            row_numeric = row_numeric[:number_kept] + [False]
+            row_defaults = row_defaults[:number_kept] + [False]
+        if row_names[0] != "--":
+            number_kept = _number_kept(row_defaults)
+            row_names = ["--"] + row_names[:number_kept]
+            row_values = [" "] + row_values[:number_kept]
+            row_numeric = [False] + row_numeric[:number_kept]
+        records.append(
+            _write(
+                row_names,
+                row_numeric,
+                [[value] for value in row_values],
+                format_column,
+                header,
+                keep_header,
+                limit,
+            )
+        )
+    return records
+
+
+def _row_strings(name: str, values: np.ndarray, format_column: bool) -> tuple[list[str], list[bool]]:
+    """Format each value of a column as pandas does in a table of that row alone.
+
+    Args:
+        name: The column name.
+        values: The values.
+        format_column: If the column is to be formatted.
+
+    Returns:
+        The formatted values, and if each of them is still a number.
+
+    Raises:
+        UnsupportedTable: If the values are not formatted the same way as by pandas.
+    """
+    if values.dtype.kind not in "iuf" and values.dtype != object:
+        raise UnsupportedTable(f"Columns of type {values.dtype}.")
+    formatter = COLUMN_FORMATS[name].format if format_column and name in COLUMN_FORMATS else None
+    strings = []
+    is_numeric = []
+    for value in values.tolist():
+        is_text = values.dtype == object
+        if name == Headers.WELL:
+            # Add single quotes around well names in an output file.
+            value = f"'{value}'"
+            is_text = True
+        if formatter is not None:
+            try:
+                value = formatter(value)
+                is_text = True
+            except ValueError:
+                pass
+        if is_text:
+            strings.append(_object_strings(np.array([value], dtype=object))[0])
+        elif values.dtype.kind == "f":
+            strings.append(_float_string(value))
+        else:
+            strings.append(str(value))
+        is_numeric.append(not is_text)
+    return strings, is_numeric
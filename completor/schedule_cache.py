@@ -0,0 +1,245 @@
+"""On-disk cache of the data parsed from schedule files, shared between runs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from completor.constants import ScheduleData
+from completor.get_version import get_version
+from completor.logger import logger
+from completor.schedule_index import ScheduleText
+
+# Default upper limit of the total size of the cache, in bytes.
+DEFAULT_MAX_SIZE = 1 << 30
+
+_SUFFIX = ".npz"
+
+
+class ScheduleCache:
+    """Cache of parsed schedule data, keyed by the content of the schedule and the version of Completor.
+
+    Each entry is one compressed numpy archive, holding every column of every table as a separate array, and a
+    description of how to put the tables back together. Entries are written to a temporary file which is then
+    renamed, so concurrent runs never see a partially written entry. Reading an entry marks it as recently used,
+    and the least recently used entries are evicted when the total size of the cache grows past its limit.
+
+    Attributes:
+        directory: Directory the entries are stored in.
+        max_size: Upper limit of the total size of the entries, in bytes.
+    """
+
+    directory: Path
+    max_size: int
+
+    def __init__(self, directory: str | Path, max_size: int = DEFAULT_MAX_SIZE):
+        """Open the cache, creating the directory if needed.
+
+        Args:
+            directory: Directory the entries are stored in.
+            max_size: Upper limit of the total size of the entries, in bytes. Defaults to 1 GiB.
+        """
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(schedule: ScheduleText) -> str:
+        """Compute the cache key of a schedule.
+
+        Args:
+            schedule: The schedule text, or the memory-mapped schedule file.
+
+        Returns:
+            Hash of the schedule content and the Completor version.
+        """
+        content_hash = hashlib.sha256(get_version().encode())
+        content_hash.update(schedule.encode("utf-8") if isinstance(schedule, str) else schedule)
+        return content_hash.hexdigest()
+
+    def load(self, key: str) -> ScheduleData | None:
+        """Get the schedule data of an entry.
+
+        Args:
+            key: The cache key of the schedule.
+
+        Returns:
+            The schedule data, or None if there is no valid entry for the key.
+        """
+        path = self.directory / f"{key}{_SUFFIX}"
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                schedule_data = _unpack(archive)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as err:
+            logger.debug("Ignoring unreadable schedule cache entry '%s': %s", path, err)
+            return None
+        logger.debug("Read schedule data from cache entry '%s'.", path)
+        return schedule_data
+
+    def store(self, key: str, schedule_data: ScheduleData) -> None:
+        """Add an entry, and evict the least recently used entries if the cache is full.
+
+        Args:
+            key: The cache key of the schedule.
+            schedule_data: The parsed schedule data.
+        """
+        try:
+            arrays = _pack(schedule_data)
+        except TypeError as err:
+            logger.debug("Schedule data cannot be cached: %s", err)
+            return
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.savez_compressed(file, **arrays)
+            os.replace(temporary_path, self.directory / f"{key}{_SUFFIX}")
+        except OSError as err:
+            logger.debug("Could not write schedule cache entry: %s", err)
+            Path(temporary_path).unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the cache fits within its size limit."""
+        evict_least_recently_used(self.directory, _SUFFIX, self.max_size)
+
+
+class MemoryScheduleCache:
+    """Cache of parsed schedule data kept in memory, to share it between the runs of one process.
+
+    Has the same keys as the schedule cache on disk. Entries are kept until the cache is no longer used, and are never
+    copied, so the schedule data must not be modified by its users.
+
+    Attributes:
+        entries: Schedule data by cache key.
+    """
+
+    entries: dict[str, ScheduleData]
+
+    def __init__(self) -> None:
+        """Create an empty cache."""
+        self.entries = {}
+
+    key = staticmethod(ScheduleCache.key)
+
+    def load(self, key: str) -> ScheduleData | None:
+        """Get the schedule data of an entry.
+
+        Args:
+            key: The cache key of the schedule.
+
+        Returns:
+            The schedule data, or None if there is no entry for the key.
+        """
+        return self.entries.get(key)
+
+    def store(self, key: str, schedule_data: ScheduleData) -> None:
+        """Add an entry.
+
+        Args:
+            key: The cache key of the schedule.
+            schedule_data: The parsed schedule data.
+        """
+        self.entries[key] = schedule_data
+
+
+def evict_least_recently_used(directory: Path, suffix: str, max_size: int) -> None:
+    """Remove the least recently used entries of a cache until it fits within its size limit.
+
+    Args:
+        directory: Directory the entries are stored in.
+        suffix: File name suffix of the entries.
+        max_size: Upper limit of the total size of the entries, in bytes.
+    """
+    entries = []
+    for path in directory.glob(f"*{suffix}"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            # Evicted by another run.
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total_size <= max_size:
+            break
+        path.unlink(missing_ok=True)
+        total_size -= size
+
+
+def _pack(schedule_data: ScheduleData) -> dict[str, np.ndarray]:
+    """Split the tables of the schedule data into one array per column.
+
+    Args:
+        schedule_data: The parsed schedule data.
+
+    Returns:
+        Arrays by name, including the layout of the tables as a JSON string.
+
+    Raises:
+        TypeError: If a column holds anything other than numbers or text.
+    """
+    arrays: dict[str, np.ndarray] = {}
+    layout = []
+    for well_name, well_data in schedule_data.items():
+        for keyword, tables in well_data.items():
+            is_tuple = isinstance(tables, tuple)
+            table_ids = []
+            for table in tables if isinstance(tables, tuple) else (tables,):
+                table_id = f"t{len(layout)}_{len(table_ids)}"
+                if table.columns.has_duplicates:
+                    raise TypeError(f"{keyword} for well '{well_name}' has duplicate columns.")
+                columns = []
+                for column_number, column in enumerate(table.columns):
+                    values = table[column].to_numpy()
+                    if values.dtype == object:
+                        if not all(isinstance(value, str) for value in values):
+                            raise TypeError(f"Column '{column}' of {keyword} for well '{well_name}' is not text.")
+                        values = values.astype(str)
+                    elif values.dtype.kind not in "biuf":
+                        raise TypeError(f"Column '{column}' of {keyword} for well '{well_name}' is {values.dtype}.")
+                    arrays[f"{table_id}_{column_number}"] = values
+                    columns.append([str(column), values.dtype.kind == "U"])
+                is_range_index = isinstance(table.index, pd.RangeIndex) and table.index.step == 1
+                arrays[f"{table_id}_index"] = table.index.to_numpy(dtype=np.int64)
+                table_ids.append([table_id, columns, is_range_index])
+            layout.append([well_name, keyword, is_tuple, table_ids])
+    arrays["layout"] = np.array(json.dumps(layout))
+    return arrays
+
+
+def _unpack(archive: np.lib.npyio.NpzFile) -> ScheduleData:
+    """Put the tables of the schedule data back together from their columns.
+
+    Args:
+        archive: The arrays written by `_pack`.
+
+    Returns:
+        The schedule data.
+    """
+    schedule_data: ScheduleData = {}
+    for well_name, keyword, is_tuple, table_ids in json.loads(str(archive["layout"])):
+        tables = []
+        for table_id, columns, is_range_index in table_ids:
+            index_values = archive[f"{table_id}_index"]
+            if is_range_index:
+                start = int(index_values[0]) if len(index_values) else 0
+                index: pd.Index = pd.RangeIndex(start, start + len(index_values))
+            else:
+                index = pd.Index(index_values)
+            data = {}
+            for column_number, (column, is_text) in enumerate(columns):
+                values = archive[f"{table_id}_{column_number}"]
+                data[column] = values.astype(object) if is_text else values
+            tables.append(pd.DataFrame(data, index=index))
+        schedule_data.setdefault(well_name, {})[keyword] = tuple(tables) if is_tuple else tables[0]
+    return schedule_data
@@ -0,0 +1,501 @@
+"""Index of the keyword blocks Completor reads from, and writes to, a schedule file."""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import mmap
+import os
+import re
+import tempfile
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import TextIO, Union
+
+from completor.constants import Keywords
+from completor.exceptions.clean_exceptions import CompletorError
+from completor.logger import logger
+from completor.utils import replace_preprocessing_names
+
+# A schedule, either read into memory or memory-mapped from disk.
+ScheduleText = Union[str, bytes, mmap.mmap]
+
+# The keyword blocks the records of each well are replaced in.
+_REPLACED_KEYWORDS = (Keywords.COMPLETION_SEGMENTS, Keywords.WELL_SEGMENTS, Keywords.COMPLETION_DATA)
+
+# The keyword blocks of each well that are written to include files of their own.
+_INCLUDED_KEYWORDS = (Keywords.COMPLETION_SEGMENTS, Keywords.WELL_SEGMENTS)
+
+# Size of the untouched spans of a memory-mapped schedule that are decoded and written at a time.
+_CHUNK_SIZE = 1 << 24
+
+
+def _decode(data: str | bytes) -> str:
+    """Decode a slice of a schedule, if it is not already text.
+
+    Line breaks of decoded text are made `\\n`, as when the schedule is read in text mode.
+    The offsets of the schedule are unaffected, since they refer to the text before it is decoded.
+    """
+    if isinstance(data, str):
+        return data
+    text = data.decode("utf-8")
+    return text.replace("\r\n", "\n").replace("\r", "\n") if "\r" in text else text
+
+
+def _strip_trailing_whitespace(text: str) -> str:
+    """Remove trailing whitespace from every line of a text."""
+    return re.sub(r"[^\S\r\n]+$", "", text, flags=re.MULTILINE)
+
+
+def find_missing_keywords(text: ScheduleText, keywords: Iterable[str]) -> list[str]:
+    """Find the keywords that are not in a schedule, without parsing it.
+
+    Args:
+        text: The schedule text, or the memory-mapped schedule file.
+        keywords: The keywords to look for.
+
+    Returns:
+        The keywords not found on a line of their own.
+    """
+    missing = []
+    for keyword in keywords:
+        pattern = rf"^{re.escape(keyword)}[^\S\n]*$"
+        if re.search(pattern if isinstance(text, str) else pattern.encode(), text, re.MULTILINE) is None:
+            missing.append(keyword)
+    return missing
+
+
+class ScheduleIndex:
+    """Locate the keyword blocks of a schedule, and each well's records inside them, in a single pass.
+
+    The schedule text is scanned once for all keywords, instead of once per keyword and again once per well and
+    keyword. The blocks found are the same as those found by `utils.find_keyword_data`, and the well records are
+    the same as those found by `utils.find_well_keyword_data`, but located by their offsets in the text.
+    The schedule may be memory-mapped, in which case the offsets are byte offsets, and only the blocks that are
+    read are decoded. Trailing whitespace is ignored, and removed from the text returned.
+
+    Attributes:
+        text: The schedule text, or memory-mapped schedule, the offsets refer to.
+        blocks: Start and end offsets of every keyword block, in the order they appear in the schedule.
+        well_records: Start and end offsets of the records belonging to each well, by keyword and well name.
+    """
+
+    text: ScheduleText
+    blocks: dict[str, list[tuple[int, int]]]
+    well_records: dict[str, dict[str, tuple[int, int]]]
+
+    def __init__(self, text: ScheduleText, keywords: Iterable[str] = Keywords.main_keywords):
+        """Tokenize the schedule and build the index.
+
+        Args:
+            text: The schedule text, or the memory-mapped schedule file.
+            keywords: The keywords to index. Defaults to WELSPECS, COMPDAT, WELSEGS, and COMPSEGS.
+        """
+        self.text = text
+        keywords = list(keywords)
+        self.blocks = {keyword: [] for keyword in keywords}
+        self.well_records = {keyword: {} for keyword in keywords}
+
+        # Same pattern as utils.find_keyword_data, with one alternative per keyword.
+        # Longer keywords are tried first, in case one keyword is the prefix of another.
+        alternatives = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+        pattern = rf"^(?P<keyword>{alternatives})(?:.*\n)*?\s*\/"
+        for match in re.finditer(pattern if isinstance(text, str) else pattern.encode(), text, re.MULTILINE):
+            keyword = _decode(match.group("keyword"))
+            self.blocks[keyword].append(match.span())
+            self._index_well_records(keyword, *match.span())
+
+    def _index_well_records(self, keyword: str, block_start: int, block_end: int) -> None:
+        """Find the records of each well in a keyword block.
+
+        A well keeps the records from the first block it is found in.
+        For WELSEGS and COMPSEGS, the records are the entire block, since these never contain more than one well.
+        For the other keywords, the records are the first contiguous lines of the well, including any comments
+        directly above them, and any comments or empty lines in between or directly below them.
+        Comments directly below the records of one well belong to that well, not to the well that follows,
+        which is how the records were resolved when each well was replaced in turn.
+
+        Args:
+            keyword: The keyword of the block.
+            block_start: Offset of the start of the block.
+            block_end: Offset of the end of the block.
+        """
+        records = self.well_records[keyword]
+        lines = []
+        offset = block_start
+        for line in self.text[block_start:block_end].splitlines(keepends=True):
+            raw_content = line.rstrip()
+            content = _decode(raw_content)
+            words = content.split()
+            well = words[0].replace("'", "").replace('"', "") if words else None
+            lines.append((offset, offset + len(raw_content), content, well))
+            offset += len(line)
+
+        # The first line is the keyword itself.
+        if keyword in Keywords.segments:
+            for _, _, content, well in lines[1:]:
+                if well is not None and well not in records and not content.strip().startswith("--"):
+                    records[well] = (block_start, block_end)
+            return
+
+        # Index of the last line that belongs to the records of a well found earlier in this block.
+        last_claimed = 0
+        for idx, (line_start, line_end, content, well) in enumerate(lines[1:], start=1):
+            if well is None or well in records or content.strip().startswith("--"):
+                continue
+            # Contiguous comments directly above the first record, unless they trail the previous well's records.
+            start = line_start
+            prev = idx - 1
+            while prev > last_claimed and lines[prev][2] and lines[prev][2].strip().startswith("--"):
+                start = lines[prev][0]
+                prev -= 1
+            # Following records of the same well, and comments or empty lines in between.
+            end = line_end
+            last_claimed = idx
+            for next_idx in range(idx + 1, len(lines)):
+                _, next_end, next_content, next_well = lines[next_idx]
+                if next_content and next_well != well and not next_content.strip().startswith("--"):
+                    break
+                end = next_end
+                last_claimed = next_idx
+            records[well] = (start, end)
+
+    def keyword_data(self, keyword: str) -> list[str]:
+        """Get the text of every block of a keyword.
+
+        Args:
+            keyword: The keyword.
+
+        Returns:
+            The text of each block, in the order they appear in the schedule.
+        """
+        return [_strip_trailing_whitespace(_decode(self.text[start:end])) for start, end in self.blocks[keyword]]
+
+    def well_span(self, well: str, keyword: str) -> tuple[int, int] | None:
+        """Get the offsets of the records of a well.
+
+        Args:
+            well: Well name.
+            keyword: The keyword.
+
+        Returns:
+            Start and end offsets of the records, or None if the well has no records for the keyword.
+        """
+        return self.well_records[keyword].get(well)
+
+    def well_keyword_data(self, well: str, keyword: str) -> str:
+        """Get the text of the records of a well, including leading comments.
+
+        Args:
+            well: Well name.
+            keyword: The keyword.
+
+        Returns:
+            The text of the records, or an empty string if the well has no records for the keyword.
+        """
+        span = self.well_span(well, keyword)
+        if span is None:
+            return ""
+        return _strip_trailing_whitespace(_decode(self.text[span[0] : span[1]]))
+
+
+class SchedulePatcher:
+    """Collect edits to a schedule, and write the edited schedule in one linear pass.
+
+    Each edit replaces the text between two offsets of the original schedule, e.g. the records of a well found by
+    `ScheduleIndex`. The original schedule is never modified, so only one copy of it is kept in memory, regardless
+    of the number of edits. Trailing whitespace is removed from the text written. The untouched text of a
+    memory-mapped schedule is streamed to the output in chunks of whole lines, so it is never read into memory at once.
+    The edited schedule can also be written a part at a time, as soon as the edits of that part are known, so only
+    the edits not yet written are kept in memory.
+
+    Attributes:
+        text: The original schedule text, or memory-mapped schedule, the offsets refer to.
+        patches: The edits not yet written, as a heap of start offset, order added, end offset, and replacement text.
+        position: Offset of the original schedule the edited schedule has been written up to.
+    """
+
+    text: ScheduleText
+    patches: list[tuple[int, int, int, str]]
+    position: int
+
+    def __init__(self, text: ScheduleText):
+        """Start collecting edits to a schedule.
+
+        Args:
+            text: The original schedule text, or the memory-mapped schedule file.
+        """
+        self.text = text
+        self.patches = []
+        self.position = 0
+        self._number_added = 0
+
+    def add(self, start: int, end: int, replacement: str) -> None:
+        """Replace the text between two offsets of the original schedule.
+
+        Edits starting at the same offset are written in the order they were added.
+
+        Args:
+            start: Offset of the start of the text to replace.
+            end: Offset of the end of the text to replace.
+            replacement: The new text. Inserted before the text at start if start and end are equal.
+        """
+        heapq.heappush(self.patches, (start, self._number_added, end, replacement))
+        self._number_added += 1
+
+    def write(self, file: TextIO, mapper: Mapping[str, str] | None = None) -> None:
+        """Write the rest of the edited schedule.
+
+        Args:
+            file: Open file to write to.
+            mapper: Map of pre-processor well names to reservoir simulator well names, if any.
+
+        Raises:
+            CompletorError: If two edits overlap.
+        """
+        # Edits inserted at the very end start at the length of the schedule.
+        self.write_until(file, len(self.text) + 1, mapper)
+        self._write_untouched(file, self.position, len(self.text), mapper)
+        self.position = len(self.text)
+
+    def write_until(self, file: TextIO, offset: int, mapper: Mapping[str, str] | None = None) -> None:
+        """Write the edits starting before an offset of the original schedule, and the untouched text between them.
+
+        No edits may be added before the end of the edits written. The untouched text after them is written along
+        with the next edit, so the text is split at the same offsets whenever it is written.
+
+        Args:
+            file: Open file to write to.
+            offset: Offset of the original schedule to write the edits before.
+            mapper: Map of pre-processor well names to reservoir simulator well names, if any.
+
+        Raises:
+            CompletorError: If two edits overlap.
+        """
+        while self.patches and self.patches[0][0] < offset:
+            start, _, end, replacement = heapq.heappop(self.patches)
+            if start < self.position:
+                raise CompletorError("Could not match the old data to schedule file. Please contact the team!")
+            self._write_untouched(file, self.position, start, mapper)
+            file.write(replace_preprocessing_names(replacement, mapper))
+            self.position = end
+
+    def _write_untouched(self, file: TextIO, start: int, end: int, mapper: Mapping[str, str] | None) -> None:
+        """Write the original text between two offsets.
+
+        Text held in memory is written at once. The text of a memory-mapped schedule is written in chunks that end
+        on a line break, with its line breaks made `\\n` as in the rest of the output. Each chunk is mapped with the
+        line break before it, so well names at the start of a chunk are recognized the same way as in the rest of the
+        text.
+
+        Args:
+            file: Open file to write to.
+            start: Offset of the start of the text.
+            end: Offset of the end of the text.
+            mapper: Map of pre-processor well names to reservoir simulator well names, if any.
+        """
+        if isinstance(self.text, str):
+            file.write(replace_preprocessing_names(_strip_trailing_whitespace(self.text[start:end]), mapper))
+            return
+        while start < end:
+            stop = end
+            if end - start > _CHUNK_SIZE:
+                line_break = self.text.find(b"\n", start + _CHUNK_SIZE, end)
+                stop = end if line_break == -1 else line_break + 1
+            lookbehind = 1 if start > 0 and self.text[start - 1 : start] == b"\n" else 0
+            chunk = _strip_trailing_whitespace(_decode(self.text[start - lookbehind : stop]))
+            file.write(replace_preprocessing_names(chunk, mapper)[lookbehind:])
+            start = stop
+
+
+class ScheduleWriter:
+    """Write the output schedule while the wells are formatted, instead of once all of them are done.
+
+    The new records of each well replace its old records in the original schedule, as found by `ScheduleIndex`. The
+    edited schedule is written up to the old records of the first well still to come as soon as a well is done,
+    so only the records of wells done ahead of their place in the schedule are kept in memory.
+
+    Attributes:
+        schedule_patcher: The edits to the original schedule.
+        schedule_index: The offsets of the old records of each well.
+        file: Open file to write to.
+        mapper: Map of pre-processor well names to reservoir simulator well names, if any.
+    """
+
+    schedule_patcher: SchedulePatcher
+    schedule_index: ScheduleIndex | None
+    file: TextIO
+    mapper: Mapping[str, str] | None
+
+    def __init__(self, schedule: ScheduleText, file: TextIO, mapper: Mapping[str, str] | None = None):
+        """Start writing the output schedule.
+
+        Args:
+            schedule: The original schedule text, or the memory-mapped schedule file.
+            file: Open file to write to.
+            mapper: Map of pre-processor well names to reservoir simulator well names, if any.
+        """
+        self.schedule_patcher = SchedulePatcher(schedule)
+        self.schedule_index = None
+        self.file = file
+        self.mapper = mapper
+        self._pending_wells: dict[str, int] = {}
+        self._pending_offsets: list[tuple[int, str]] = []
+
+    def insert(self, offset: int, text: str) -> None:
+        """Insert text before an offset of the original schedule, e.g. a banner at the top.
+
+        Args:
+            offset: Offset of the original schedule.
+            text: The text to insert.
+        """
+        self.schedule_patcher.add(offset, offset, text)
+
+    def expect_wells(self, schedule_index: ScheduleIndex, well_names: Iterable[str]) -> None:
+        """Hold the schedule back at the old records of the wells still to be written.
+
+        Args:
+            schedule_index: The offsets of the old records of each well.
+            well_names: The wells to be written.
+        """
+        self.schedule_index = schedule_index
+        for well_name in well_names:
+            spans = [schedule_index.well_span(well_name, keyword) for keyword in _REPLACED_KEYWORDS]
+            starts = [span[0] for span in spans if span is not None]
+            if starts:
+                self._pending_wells[well_name] = min(starts)
+                heapq.heappush(self._pending_offsets, (min(starts), well_name))
+
+    def add_well(self, well_name: str, new_records: Iterable[tuple[str, str]]) -> None:
+        """Replace the old records of a well, and write the schedule as far as the wells still to come allow.
+
+        Args:
+            well_name: Well name.
+            new_records: The keyword and new records of each keyword block the well is in.
+
+        Raises:
+            CompletorError: If the old records of the well are not in the schedule.
+        """
+        if self.schedule_index is None:
+            raise ValueError("The wells to be written must be given first.")
+        for keyword, records in new_records:
+            old_span = self.schedule_index.well_span(well_name, keyword)
+            if old_span is None:
+                raise CompletorError(
+                    "Could not find the unmodified data in original schedule file. Please contact the team!"
+                )
+            self.schedule_patcher.add(*old_span, records)
+        self.skip_well(well_name)
+
+    def skip_well(self, well_name: str) -> None:
+        """Leave the old records of a well as they are, and write the schedule as far as the wells still to come allow.
+
+        Args:
+            well_name: Well name.
+        """
+        self._pending_wells.pop(well_name, None)
+        while self._pending_offsets and self._pending_offsets[0][1] not in self._pending_wells:
+            heapq.heappop(self._pending_offsets)
+        if self._pending_offsets:
+            self.schedule_patcher.write_until(self.file, self._pending_offsets[0][0], self.mapper)
+        else:
+            self.schedule_patcher.write_until(self.file, len(self.schedule_patcher.text) + 1, self.mapper)
+
+    def close(self) -> None:
+        """Write the rest of the schedule, with the records of the wells added so far."""
+        self.schedule_patcher.write(self.file, self.mapper)
+
+
+class IncludeFileWriter(ScheduleWriter):
+    """Write the new keywords of each well to include files of their own, and include them in the output schedule.
+
+    The WELSEGS and COMPSEGS blocks of a well, the latter along with the device keywords written after it, are each
+    written to a file named by the well, the keyword, and a hash of the content. Files that already exist are kept
+    as they are, so the files of wells that did not change keep their time stamps between runs. Each file is written
+    to a temporary file first and then renamed, so a file with the name of a hash is always complete. Files of
+    earlier runs whose content is no longer included are never removed. The new COMPDAT records stay in the output
+    schedule, as they share a keyword block with the other wells.
+
+    Attributes:
+        include_directory: Directory the include files are written to.
+        relative_to: Directory the paths in the INCLUDE statements are relative to, or None for absolute paths.
+    """
+
+    include_directory: Path
+    relative_to: Path | None
+
+    def __init__(
+        self,
+        schedule: ScheduleText,
+        file: TextIO,
+        include_directory: str | Path,
+        relative_to: str | Path | None = None,
+        mapper: Mapping[str, str] | None = None,
+    ):
+        """Start writing the output schedule and include files.
+
+        Args:
+            schedule: The original schedule text, or the memory-mapped schedule file.
+            file: Open file to write the output schedule to.
+            include_directory: Directory to write the include files to, created if needed.
+            relative_to: Directory the paths in the INCLUDE statements are relative to, i.e. that of the DATA file of
+                the reservoir simulator, since relative paths are resolved from there. Absolute paths are written if
+                None.
+            mapper: Map of pre-processor well names to reservoir simulator well names, if any.
+        """
+        super().__init__(schedule, file, mapper)
+        self.include_directory = Path(include_directory)
+        self.relative_to = None if relative_to is None else Path(relative_to)
+        self.include_directory.mkdir(parents=True, exist_ok=True)
+
+    def add_well(self, well_name: str, new_records: Iterable[tuple[str, str]]) -> None:
+        """Write the keyword blocks of a well to include files, and include them in place of the old blocks.
+
+        Args:
+            well_name: Well name.
+            new_records: The keyword and new records of each keyword block the well is in.
+
+        Raises:
+            CompletorError: If the old records of the well are not in the schedule.
+        """
+        super().add_well(
+            well_name,
+            [
+                (keyword, self._include(well_name, keyword, records) if keyword in _INCLUDED_KEYWORDS else records)
+                for keyword, records in new_records
+            ],
+        )
+
+    def _include(self, well_name: str, keyword: str, records: str) -> str:
+        """Write a keyword block of a well to an include file, unless the file exists.
+
+        Args:
+            well_name: Well name.
+            keyword: The keyword of the block.
+            records: The keyword block.
+
+        Returns:
+            The INCLUDE statement of the file.
+        """
+        content = replace_preprocessing_names(records, self.mapper)
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        simulator_name = well_name if self.mapper is None else self.mapper.get(well_name, well_name)
+        file_name = re.sub(r"[^\w.-]", "_", f"{simulator_name}_{keyword}_{content_hash[:12]}.inc")
+        path = self.include_directory / file_name
+        if path.exists():
+            logger.debug("Keeping unchanged include file '%s'.", path)
+        else:
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=self.include_directory, suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                    file.write(f"-- {keyword} of well {simulator_name}. Content hash (SHA-256): {content_hash}\n\n")
+                    file.write(content)
+                os.replace(temporary_path, path)
+            except BaseException:
+                Path(temporary_path).unlink(missing_ok=True)
+                raise
+        if self.relative_to is None:
+            include_path = path.absolute().as_posix()
+        else:
+            include_path = Path(os.path.relpath(path.absolute(), self.relative_to.absolute())).as_posix()
+        return f"INCLUDE\n '{include_path}' /\n\n"
@@ -5,6 +5,7 @@ from __future__ import annotations
 import re
 import sys
 from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -479,41 +480,81 @@ def insert_comment(method: str | ICVMethod, step: str | int | None = None, crite
     return msg + ".\n"
 
 
-def icvc_keyword_in_file(path: Path | str) -> bool:
+# Keywords of the case file which decide what Completor does with it.
+_PASS_KEYWORDS = (Keywords.COMPLETION, Keywords.ICVC_KEYWORD)
+
+
+@dataclass(frozen=True)
+class CaseInput:
+    """The case file, read once and shared by everything that needs its content.
+
+    Attributes:
+        content: The content of the case file.
+        path: The path of the case file, if read from file.
+        lines: The lines of the content, without comments and empty lines.
+        keywords: The keywords deciding which passes are run (COMPLETION and ICVCONTROL) found in the content.
+    """
+
+    content: str
+    path: str | None
+    lines: tuple[str, ...]
+    keywords: frozenset[str]
+
+    @classmethod
+    def from_content(cls, content: str, path: Path | str | None = None) -> CaseInput:
+        """Create the case input from the content of a case file.
+
+        Args:
+            content: The content of the case file.
+            path: The path of the case file, if any.
+
+        Returns:
+            The case input.
+        """
+        return cls(
+            content=content,
+            path=None if path is None else str(path),
+            lines=tuple(clean_file_lines(content.splitlines())),
+            keywords=frozenset(keyword for keyword in _PASS_KEYWORDS if keyword in content),
+        )
+
+    @classmethod
+    def from_file(cls, path: Path | str) -> CaseInput:
+        """Read the case input from a case file.
+
+        Args:
+            path: The path of the case file.
+
+        Returns:
+            The case input.
+        """
+        with open(path, encoding="utf-8") as file:
+            return cls.from_content(file.read(), path)
+
+
+def icvc_keyword_in_file(case: CaseInput | Path | str) -> bool:
     """If file contains ICV keyword.
 
     Args:
-        path: Path to file to check.
+        case: The case input, or the path to the file to check.
 
     Returns:
         True if file contains ICV keyword.
     """
-
-    path = Path(path)
-    with open(path, encoding="utf-8") as file:
-        case_file_content = file.read()
-
-    if Keywords.ICVC_KEYWORD in case_file_content:
-        return True
-    else:
-        return False
+    if not isinstance(case, CaseInput):
+        case = CaseInput.from_file(case)
+    return Keywords.ICVC_KEYWORD in case.keywords
 
 
-def completion_keyword_in_file(path: Path | str) -> bool:
+def completion_keyword_in_file(case: CaseInput | Path | str) -> bool:
     """If file contains COMPLETION keyword.
 
     Args:
-        path: Path to file to check.
+        case: The case input, or the path to the file to check.
 
     Returns:
         True if file contains COMPLETION keyword.
     """
-
-    path = Path(path)
-    with open(path, encoding="utf-8") as file:
-        case_file_content = file.read()
-
-    if Keywords.COMPLETION in case_file_content:
-        return True
-    else:
-        return False
+    if not isinstance(case, CaseInput):
+        case = CaseInput.from_file(case)
+    return Keywords.COMPLETION in case.keywords
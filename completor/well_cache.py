@@ -0,0 +1,181 @@
+"""On-disk cache of the output of each well, to only create the wells whose input changed since an earlier run."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from completor.constants import FormattedWell, Headers, WellData
+from completor.get_version import get_version
+from completor.logger import logger
+from completor.read_casefile import ReadCasefile
+from completor.schedule_cache import DEFAULT_MAX_SIZE, evict_least_recently_used
+
+_SUFFIX = ".json"
+
+
+class WellCache:
+    """Cache of the formatted output of each well, keyed by a fingerprint of everything the output depends on.
+
+    The fingerprint of a well covers its rows of the COMPLETION table, the rows of the device tables these refer to,
+    the keywords of the case file that apply to all wells, and the data of the well from the schedule file. A well
+    with the same fingerprint as in an earlier run gets the same output, so that output is reused instead of creating
+    the well again. Entries are written and evicted the same way as those of the schedule cache.
+
+    Attributes:
+        directory: Directory the entries are stored in.
+        max_size: Upper limit of the total size of the entries, in bytes.
+    """
+
+    directory: Path
+    max_size: int
+
+    def __init__(self, directory: str | Path, max_size: int = DEFAULT_MAX_SIZE):
+        """Open the cache, creating the directory if needed.
+
+        Args:
+            directory: Directory the entries are stored in.
+            max_size: Upper limit of the total size of the entries, in bytes. Defaults to 1 GiB.
+        """
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(case: ReadCasefile, well_name: str, well_number: int, well_data: WellData) -> str:
+        """Compute the fingerprint of a well.
+
+        Must be computed before the well is created, as creating a well may add rows to the COMPLETION table.
+
+        Args:
+            case: Case data.
+            well_name: Well name.
+            well_number: Well number, used in the names of the actions of some devices.
+            well_data: Data of the well from the schedule file.
+
+        Returns:
+            Hash of the input of the well and the Completor version.
+        """
+        fingerprint = hashlib.sha256(get_version().encode())
+        settings = [
+            well_name,
+            well_number,
+            case.joint_length,
+            case.segment_length,
+            str(case.method),
+            case.minimum_segment_length,
+            case.strict,
+            case.gp_perf_devicelayer,
+            case.python_dependent,
+            # The include files of the PYACTION of density driven devices are written next to the output.
+            case.output_file if case.python_dependent else None,
+        ]
+        fingerprint.update(json.dumps(settings, default=str).encode())
+
+        completion_table = case.completion_table[case.completion_table[Headers.WELL] == well_name]
+        _update_with_table(fingerprint, completion_table)
+        # ICV tubing rows are shared by all wells, and add their devices to those of each well.
+        _update_with_table(fingerprint, case.completion_icv_tubing)
+        devices = [completion_table]
+        if not case.completion_icv_tubing.empty:
+            devices.append(case.completion_icv_tubing)
+        device_keys = pd.concat([df[[Headers.DEVICE_TYPE, Headers.DEVICE_NUMBER]] for df in devices])
+        for device_table in [
+            case.wsegvalv_table,
+            case.wsegsicd_table,
+            case.wsegaicd_table,
+            case.wsegdensity_table,
+            case.wseginjv_table,
+            case.wsegdualrcp_table,
+            case.wsegicv_table,
+        ]:
+            if {Headers.DEVICE_TYPE, Headers.DEVICE_NUMBER}.issubset(device_table.columns):
+                is_used = pd.MultiIndex.from_frame(device_table[[Headers.DEVICE_TYPE, Headers.DEVICE_NUMBER]]).isin(
+                    pd.MultiIndex.from_frame(device_keys)
+                )
+                device_table = device_table[is_used]
+            _update_with_table(fingerprint, device_table)
+        if Headers.WELL in case.lat2device.columns:
+            _update_with_table(fingerprint, case.lat2device[case.lat2device[Headers.WELL] == well_name])
+
+        for keyword in sorted(well_data):
+            fingerprint.update(keyword.encode())
+            tables = well_data[keyword]
+            for table in tables if isinstance(tables, tuple) else (tables,):
+                _update_with_table(fingerprint, table)
+        return fingerprint.hexdigest()
+
+    def load(self, key: str) -> FormattedWell | None:
+        """Get the output of a well from an earlier run.
+
+        Args:
+            key: The fingerprint of the well.
+
+        Returns:
+            The formatted output of the well, or None if there is no valid entry for the key.
+        """
+        path = self.directory / f"{key}{_SUFFIX}"
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+            formatted_well: FormattedWell = (
+                entry["compdat"],
+                entry["welsegs"],
+                entry["compsegs"],
+                entry["bonus"],
+                pd.read_json(StringIO(entry["icv"]), orient="split"),
+            )
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as err:
+            logger.debug("Ignoring unreadable well cache entry '%s': %s", path, err)
+            return None
+        logger.debug("Read well output from cache entry '%s'.", path)
+        return formatted_well
+
+    def store(self, key: str, formatted_well: FormattedWell) -> None:
+        """Add an entry, and evict the least recently used entries if the cache is full.
+
+        Args:
+            key: The fingerprint of the well.
+            formatted_well: The formatted output of the well.
+        """
+        compdat, welsegs, compsegs, bonus, df_icv = formatted_well
+        entry = {
+            "compdat": compdat,
+            "welsegs": welsegs,
+            "compsegs": compsegs,
+            "bonus": bonus,
+            "icv": df_icv.to_json(orient="split"),
+        }
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                json.dump(entry, file)
+            os.replace(temporary_path, self.directory / f"{key}{_SUFFIX}")
+        except OSError as err:
+            logger.debug("Could not write well cache entry: %s", err)
+            Path(temporary_path).unlink(missing_ok=True)
+            return
+        evict_least_recently_used(self.directory, _SUFFIX, self.max_size)
+
+
+def _update_with_table(fingerprint: hashlib._Hash, table: pd.DataFrame) -> None:
+    """Add the columns and values of a table to a fingerprint, regardless of its index.
+
+    Args:
+        fingerprint: The hash to update.
+        table: The table.
+    """
+    fingerprint.update(json.dumps([[str(column), str(dtype)] for column, dtype in table.dtypes.items()]).encode())
+    fingerprint.update(np.int64(table.shape[0]).tobytes())
+    if not table.empty:
+        fingerprint.update(pd.util.hash_pandas_object(table, index=False).to_numpy().tobytes())
@@ -8,6 +8,7 @@ import pandas as pd
 
 from completor import completion, read_schedule
 from completor.constants import Content, Headers, Method, WellData
+from completor.logger import timed_stage
 from completor.read_casefile import ReadCasefile
 
 
@@ -115,26 +116,34 @@ class Lateral:
             well_data: This wells' schedule data.
         """
         self.lateral_number = lateral_number
-        self.df_completion = case.get_completion(well_name, lateral_number)
-        self.df_welsegs_header, self.df_welsegs_content = read_schedule.get_well_segments(well_data, lateral_number)
+        with timed_stage("Lateral: read schedule data"):
+            self.df_completion = case.get_completion(well_name, lateral_number)
+            self.df_welsegs_header, self.df_welsegs_content = read_schedule.get_well_segments(well_data, lateral_number)
 
         self.df_device = pd.DataFrame()
 
-        self.df_reservoir = self._select_well(well_name, well_data, lateral_number)
-        self.df_measured_true_vertical_depth = completion.well_trajectory(
-            self.df_welsegs_header, self.df_welsegs_content
-        )
-        self.df_completion = completion.define_annulus_zone(self.df_completion)
+        with timed_stage("Lateral: select cells"):
+            self.df_reservoir = self._select_well(well_name, well_data, lateral_number)
+        with timed_stage("Lateral: trajectory"):
+            self.df_measured_true_vertical_depth = completion.well_trajectory(
+                self.df_welsegs_header, self.df_welsegs_content
+            )
+        with timed_stage("Lateral: annulus zones"):
+            self.df_completion = completion.define_annulus_zone(self.df_completion)
         self.df_tubing = self._create_tubing_segments(
             self.df_reservoir, self.df_completion, self.df_measured_true_vertical_depth, case
         )
-        self.df_tubing = completion.insert_missing_segments(self.df_tubing, well_name)
-        self.df_well = completion.complete_the_well(self.df_tubing, self.df_completion, case.joint_length)
-        self.df_well = self._get_devices(self.df_completion, self.df_well, case)
-        self.df_well = completion.correct_annulus_zone(self.df_well)
-        self.df_reservoir = self._connect_cells_to_segments(
-            self.df_reservoir, self.df_well, self.df_tubing, case.method
-        )
+        with timed_stage("Lateral: insert missing segments"):
+            self.df_tubing = completion.insert_missing_segments(self.df_tubing, well_name)
+        with timed_stage("Lateral: complete the well"):
+            self.df_well = completion.complete_the_well(self.df_tubing, self.df_completion, case.joint_length)
+        with timed_stage("Lateral: devices"):
+            self.df_well = self._get_devices(self.df_completion, self.df_well, case)
+            self.df_well = completion.correct_annulus_zone(self.df_well)
+        with timed_stage("Lateral: connect cells to segments"):
+            self.df_reservoir = self._connect_cells_to_segments(
+                self.df_reservoir, self.df_well, self.df_tubing, case.method
+            )
         self.df_well[Headers.WELL] = well_name
         self.df_reservoir[Headers.WELL] = well_name
         self.df_well[Headers.LATERAL] = lateral_number
@@ -250,24 +259,27 @@ class Lateral:
         Returns:
             Tubing data.
         """
-        df_tubing_segments_cells = completion.create_tubing_segments(
-            df_reservoir, df_completion, df_mdtvd, case.method, case.segment_length, case.minimum_segment_length
-        )
 
-        df_tubing_segments_user = completion.create_tubing_segments(
-            df_reservoir, df_completion, df_mdtvd, Method.USER, case.segment_length, case.minimum_segment_length
-        )
+        def segmentation(method: Method) -> pd.DataFrame:
+            with timed_stage(f"Lateral: tubing segments ({method.name})"):
+                return completion.create_tubing_segments(
+                    df_reservoir, df_completion, df_mdtvd, method, case.segment_length, case.minimum_segment_length
+                )
 
+        # Each segmentation is only created if it is used.
         if (pd.unique(df_completion[Headers.DEVICE_TYPE]).size > 1) & (
             (df_completion[Headers.DEVICE_TYPE] == Content.INFLOW_CONTROL_VALVE)
             & (df_completion[Headers.VALVES_PER_JOINT] > 0)
         ).any():
-            return read_schedule.fix_compsegs_by_priority(
-                df_completion, df_tubing_segments_cells, df_tubing_segments_user
-            )
+            df_tubing_segments_cells = segmentation(case.method)
+            df_tubing_segments_user = segmentation(Method.USER)
+            with timed_stage("Lateral: tubing segments by priority"):
+                return read_schedule.fix_compsegs_by_priority(
+                    df_completion, df_tubing_segments_cells, df_tubing_segments_user
+                )
 
         # If all the devices are ICVs, lump the segments.
         if (df_completion[Headers.DEVICE_TYPE] == Content.INFLOW_CONTROL_VALVE).all():
-            return df_tubing_segments_user
+            return segmentation(Method.USER)
         # If none of the devices are ICVs use defined method.
-        return df_tubing_segments_cells
+        return segmentation(case.method)
@@ -0,0 +1,96 @@
+"""Benchmark of writing keyword records with the record writer, compared to writing them with pandas.
+
+Writes the records of many small tables, as done for each lateral of each well, and one large table, and checks
+that the text is identical. Run from the root of the repository with:
+
+    python -m tests.benchmarks.benchmark_record_writer [number of tables]
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from completor import prepare_outputs
+from completor.constants import Headers
+from completor.record_writer import UnsupportedTable, format_records
+
+
+def _pandas_tostring(df: pd.DataFrame, *args, **kwargs) -> str:
+    """Write the records with pandas, as dataframe_tostring does for tables the record writer does not support."""
+    original = prepare_outputs.format_records
+
+    def unsupported(*_args, **_kwargs):
+        raise UnsupportedTable("Benchmark")
+
+    prepare_outputs.format_records = unsupported
+    try:
+        return prepare_outputs.dataframe_tostring(df, *args, **kwargs)
+    finally:
+        prepare_outputs.format_records = original
+
+
+def _make_welsegs(number_of_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Create the segment records of a lateral."""
+    rng = np.random.default_rng(seed)
+    measured_depth = 2000.0 + np.cumsum(rng.uniform(1.0, 12.0, number_of_rows))
+    return pd.DataFrame(
+        {
+            Headers.START_SEGMENT_NUMBER: np.arange(2, number_of_rows + 2),
+            Headers.END_SEGMENT_NUMBER: np.arange(2, number_of_rows + 2),
+            Headers.BRANCH: np.ones(number_of_rows, dtype=np.int64),
+            Headers.OUT: np.arange(1, number_of_rows + 1),
+            Headers.MEASURED_DEPTH: measured_depth,
+            Headers.TRUE_VERTICAL_DEPTH: 1500.0 + 0.1 * measured_depth,
+            Headers.WELL_BORE_DIAMETER: np.full(number_of_rows, 0.15),
+            Headers.ROUGHNESS: np.full(number_of_rows, 1.5e-05),
+        }
+    )
+
+
+def _make_compdat(number_of_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Create the connection records of a lateral."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            Headers.WELL: ["A1"] * number_of_rows,
+            Headers.I: rng.integers(1, 100, number_of_rows),
+            Headers.J: rng.integers(1, 100, number_of_rows),
+            Headers.K: np.arange(1, number_of_rows + 1),
+            Headers.K2: np.arange(1, number_of_rows + 1),
+            Headers.STATUS: ["OPEN"] * number_of_rows,
+            Headers.SATURATION_FUNCTION_REGION_NUMBERS: ["1*"] * number_of_rows,
+            Headers.CONNECTION_FACTOR: rng.uniform(0.1, 1000.0, number_of_rows),
+            Headers.WELL_BORE_DIAMETER: np.full(number_of_rows, 0.216),
+            Headers.FORMATION_PERMEABILITY_THICKNESS: rng.uniform(1.0, 1e5, number_of_rows),
+            Headers.SKIN: ["1*"] * number_of_rows,
+            Headers.D_FACTOR: ["1*"] * number_of_rows,
+        }
+    )
+
+
+def main(number_of_tables: int = 500) -> None:
+    """Time writing the records, and check that the text is the same as written with pandas."""
+    tables = [_make_welsegs(int(rows), seed) for seed, rows in enumerate(np.linspace(1, 60, number_of_tables))]
+    tables += [_make_compdat(int(rows), seed) for seed, rows in enumerate(np.linspace(1, 60, number_of_tables))]
+    print(f"{len(tables)} tables of 1 to 60 records, and one of 50000 records.")
+
+    for df in tables:
+        for arguments in [(True,), (True, True, True, False), (False,)]:
+            assert format_records(df, *arguments) == _pandas_tostring(df, *arguments)
+    new = timeit.timeit(lambda: [prepare_outputs.dataframe_tostring(df, True) for df in tables], number=3)
+    old = timeit.timeit(lambda: [_pandas_tostring(df, True) for df in tables], number=1)
+    print(f"Small tables: {3 * old / new:8.1f}x faster ({new / 3:.4f} s vs {old:.4f} s)")
+
+    df_large = _make_welsegs(50_000)
+    assert format_records(df_large, True) == _pandas_tostring(df_large, True)
+    new = timeit.timeit(lambda: prepare_outputs.dataframe_tostring(df_large, True), number=3)
+    old = timeit.timeit(lambda: _pandas_tostring(df_large, True), number=1)
+    print(f"Large table:  {3 * old / new:8.1f}x faster ({new / 3:.4f} s vs {old:.4f} s)")
+
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:]))
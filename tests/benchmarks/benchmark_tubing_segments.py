@@ -0,0 +1,125 @@
+"""Benchmark of the tubing segmentation in completion.create_tubing_segments on long laterals.
+
+Compares the run time of each segmentation method to the row-by-row implementations it replaced, and checks that
+the results are identical. Run from the root of the repository with:
+
+    python -m tests.benchmarks.benchmark_tubing_segments [number of cells]
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from completor import completion
+from completor.constants import Headers, Method
+
+
+def _reference_cells(df_reservoir: pd.DataFrame, minimum_segment_length: float) -> tuple[np.ndarray, np.ndarray]:
+    """Segments of the CELLS method, grouped and merged one cell at a time."""
+    create_start_measured_depths = [df_reservoir[Headers.START_MEASURED_DEPTH].iloc[0]]
+    create_end_measured_depths = []
+    current_segment = df_reservoir[Headers.SEGMENT].iloc[0]
+    for i in range(1, len(df_reservoir[Headers.SEGMENT])):
+        if df_reservoir[Headers.SEGMENT].iloc[i] != current_segment:
+            create_end_measured_depths.append(df_reservoir[Headers.END_MEASURED_DEPTH].iloc[i - 1])
+            create_start_measured_depths.append(df_reservoir[Headers.START_MEASURED_DEPTH].iloc[i])
+            current_segment = df_reservoir[Headers.SEGMENT].iloc[i]
+    create_end_measured_depths.append(df_reservoir[Headers.END_MEASURED_DEPTH].iloc[-1])
+    start_measured_depth = np.array(create_start_measured_depths)
+    end_measured_depth = np.array(create_end_measured_depths)
+
+    new_start_measured_depth = []
+    new_end_measured_depth = []
+    diff_measured_depth = end_measured_depth - start_measured_depth
+    current_diff_measured_depth = 0.0
+    i_start = 0
+    i_end = 0
+    for i in range(0, len(diff_measured_depth) - 1):
+        current_diff_measured_depth += diff_measured_depth[i]
+        if current_diff_measured_depth >= minimum_segment_length:
+            new_start_measured_depth.append(start_measured_depth[i_start])
+            new_end_measured_depth.append(end_measured_depth[i_end])
+            current_diff_measured_depth = 0.0
+            i_start = i + 1
+        i_end = i + 1
+    if current_diff_measured_depth < minimum_segment_length:
+        new_start_measured_depth.append(start_measured_depth[i_start])
+        new_end_measured_depth.append(end_measured_depth[i_end])
+    return np.array(new_start_measured_depth), np.array(new_end_measured_depth)
+
+
+def _reference_nearest_index(values: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Nearest values of the WELSEGS method, from the matrix of all distances."""
+    return np.abs(values[:, np.newaxis] - targets).argmin(axis=0)
+
+
+def _make_lateral(number_of_cells: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Create a lateral with cells of random length, some gaps between them, and about three cells per segment."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.uniform(0.5, 12.0, number_of_cells)
+    gaps = np.where(rng.random(number_of_cells) < 0.05, rng.uniform(1.0, 30.0, number_of_cells), 0.0)
+    start_measured_depth = 2000.0 + np.cumsum(lengths + gaps) - lengths
+    df_reservoir = pd.DataFrame(
+        {
+            Headers.START_MEASURED_DEPTH: start_measured_depth,
+            Headers.END_MEASURED_DEPTH: start_measured_depth + lengths,
+            Headers.SEGMENT: np.cumsum(rng.random(number_of_cells) < 0.3) + 2,
+        }
+    )
+    measured_depth = np.arange(1990.0, start_measured_depth[-1] + 20.0, 12.0)
+    df_mdtvd = pd.DataFrame(
+        {Headers.MEASURED_DEPTH: measured_depth, Headers.TRUE_VERTICAL_DEPTH: 1500.0 + 0.1 * measured_depth}
+    )
+    return df_reservoir, df_mdtvd
+
+
+def main(number_of_cells: int = 50_000) -> None:
+    """Time the segmentation methods, and check them against the row-by-row implementations."""
+    df_reservoir, df_mdtvd = _make_lateral(number_of_cells)
+    df_completion = pd.DataFrame(
+        {
+            Headers.START_MEASURED_DEPTH: [df_reservoir[Headers.START_MEASURED_DEPTH].iloc[0]],
+            Headers.END_MEASURED_DEPTH: [df_reservoir[Headers.END_MEASURED_DEPTH].iloc[-1]],
+        }
+    )
+    print(f"Lateral with {number_of_cells} cells.")
+
+    minimum_segment_length = 25.0
+    df_cells = completion.create_tubing_segments(
+        df_reservoir, df_completion, df_mdtvd, Method.CELLS, minimum_segment_length=minimum_segment_length
+    )
+    expected_start, expected_end = _reference_cells(df_reservoir, minimum_segment_length)
+    np.testing.assert_array_equal(df_cells[Headers.START_MEASURED_DEPTH].to_numpy(), expected_start)
+    np.testing.assert_array_equal(df_cells[Headers.END_MEASURED_DEPTH].to_numpy(), expected_end)
+    new = timeit.timeit(
+        lambda: completion.create_tubing_segments(
+            df_reservoir, df_completion, df_mdtvd, Method.CELLS, minimum_segment_length=minimum_segment_length
+        ),
+        number=3,
+    )
+    old = timeit.timeit(lambda: _reference_cells(df_reservoir, minimum_segment_length), number=1)
+    print(f"CELLS with minimum segment length: {3 * old / new:8.1f}x faster ({new / 3:.4f} s vs {old:.4f} s)")
+
+    welsegs_depth = df_mdtvd[Headers.MEASURED_DEPTH].to_numpy()
+    gaps_depth = df_reservoir[Headers.START_MEASURED_DEPTH].to_numpy()[::20]
+    np.testing.assert_array_equal(
+        completion._nearest_index(welsegs_depth, gaps_depth), _reference_nearest_index(welsegs_depth, gaps_depth)
+    )
+    new = timeit.timeit(lambda: completion._nearest_index(welsegs_depth, gaps_depth), number=3)
+    old = timeit.timeit(lambda: _reference_nearest_index(welsegs_depth, gaps_depth), number=1)
+    print(f"WELSEGS nearest segments:          {3 * old / new:8.1f}x faster ({new / 3:.4f} s vs {old:.4f} s)")
+
+    for method, segment_length in [(Method.CELLS, 0.0), (Method.USER, 0.0), (Method.FIX, 12.0), (Method.WELSEGS, 0.0)]:
+        run_time = timeit.timeit(
+            lambda: completion.create_tubing_segments(df_reservoir, df_completion, df_mdtvd, method, segment_length),
+            number=3,
+        )
+        print(f"{method.name:<8} total: {run_time / 3:.4f} s")
+
+
+if __name__ == "__main__":
+    main(*(int(argument) for argument in sys.argv[1:]))
@@ -0,0 +1,107 @@
+"""Test functions for the Completor batch module."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from completor import main
+from completor.batch import BatchJob, read_manifest, run_batch
+from completor.exceptions.clean_exceptions import CompletorError
+from tests import utils_for_tests
+
+_TESTDIR = Path(__file__).absolute().parent / "data"
+_SCHEDULE = str(_TESTDIR / "drogon" / "drogon_input.sch")
+_CASES = {
+    "oa": (str(_TESTDIR / "well_4_lumping_tests_oa.case"), _TESTDIR / "user_created_lumping_oa.true"),
+    "gp": (str(_TESTDIR / "well_4_lumping_tests_gp.case"), _TESTDIR / "user_created_lumping_gp.true"),
+}
+
+
+def _jobs() -> list[BatchJob]:
+    jobs = [BatchJob(case_file, _SCHEDULE, f"{name}.sch", name=name) for name, (case_file, _) in _CASES.items()]
+    return jobs + [BatchJob("missing.case", _SCHEDULE, "missing.sch", name="missing")]
+
+
+def test_run_batch(tmpdir, monkeypatch):
+    """Test that jobs with the same schedule share its parsed data, and that a failed job does not stop the others."""
+    tmpdir.chdir()
+    parsed_schedules = []
+    read_schedule_data = main.read_schedule_data
+
+    def _read_schedule_data(schedule_index):
+        parsed_schedules.append(schedule_index)
+        return read_schedule_data(schedule_index)
+
+    monkeypatch.setattr(main, "read_schedule_data", _read_schedule_data)
+    results = run_batch(_jobs(), summary_file="summary.json")
+
+    assert len(parsed_schedules) == 1
+    assert [(result.name, result.status) for result in results] == [
+        ("oa", "done"),
+        ("gp", "done"),
+        ("missing", "failed"),
+    ]
+    assert [result.output_file for result in results] == ["oa.sch", "gp.sch", "missing.sch"]
+    assert "missing.case" in results[2].error
+    for name, (_, true_file) in _CASES.items():
+        utils_for_tests.assert_results(true_file, f"{name}.sch")
+
+    with open("summary.json", encoding="utf-8") as file:
+        summary = json.load(file)
+    assert (summary["done"], summary["failed"]) == (2, 1)
+    assert [job["status"] for job in summary["jobs"]] == ["done", "done", "failed"]
+    assert all(job["duration"] >= 0 for job in summary["jobs"])
+
+
+def test_run_batch_in_workers(tmpdir):
+    """Test that the jobs give the same output when run in worker processes."""
+    tmpdir.chdir()
+    results = run_batch(_jobs(), workers=2)
+    assert [result.status for result in results] == ["done", "done", "failed"]
+    for name, (_, true_file) in _CASES.items():
+        utils_for_tests.assert_results(true_file, f"{name}.sch")
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="Workers must be forked to count the parses.")
+def test_run_batch_in_workers_share_schedule(tmpdir, monkeypatch):
+    """Test that jobs with the same schedule share its parsed data when run in worker processes."""
+    tmpdir.chdir()
+    parses_file = Path(tmpdir / "parses.txt")
+    read_schedule_data = main.read_schedule_data
+
+    def _read_schedule_data(schedule_index):
+        # The parses in the forked workers are counted in a file shared with this process.
+        with open(parses_file, "a", encoding="utf-8") as file:
+            file.write("parsed\n")
+        return read_schedule_data(schedule_index)
+
+    monkeypatch.setattr(main, "read_schedule_data", _read_schedule_data)
+    results = run_batch(_jobs(), workers=2)
+    assert [result.status for result in results] == ["done", "done", "failed"]
+    assert parses_file.read_text(encoding="utf-8").splitlines() == ["parsed"]
+
+
+def test_read_manifest(tmpdir):
+    """Test that paths in the manifest are relative to it, and that jobs without a case file are refused."""
+    manifest = Path(tmpdir / "manifest.json")
+    manifest.write_text(
+        json.dumps(
+            {"jobs": [{"case": "a.case", "output": "out/a.sch", "arguments": ["--stream"]}, {"case": "/b.case"}]}
+        ),
+        encoding="utf-8",
+    )
+    assert read_manifest(manifest) == [
+        BatchJob(str(tmpdir / "a.case"), None, str(tmpdir / "out" / "a.sch"), ("--stream",)),
+        BatchJob("/b.case"),
+    ]
+
+    manifest.write_text(json.dumps({"jobs": [{"schedule": "a.sch"}]}), encoding="utf-8")
+    with pytest.raises(CompletorError, match="Job 1 of the batch manifest .* has no 'case' file."):
+        read_manifest(manifest)
+    manifest.write_text("[]", encoding="utf-8")
+    with pytest.raises(CompletorError, match="must be an object with a list of 'jobs'"):
+        read_manifest(manifest)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -24,6 +25,72 @@ def test_completion_index():
     assert (completion.completion_index(df_tubing_segments, 2000, 3000.001)) == (1, 2)
 
 
+def test_completion_indices():
+    """Test completion_indices gives the same indexes as completion_index, for all segments at once."""
+    df_tubing_segments = pd.DataFrame(
+        [[1000, 2000], [2000, 3000], [3000, 4000]], columns=[Headers.START_MEASURED_DEPTH, Headers.END_MEASURED_DEPTH]
+    )
+    start = np.array([1000, 1000, 1000, 999.99, 2000, 2000, 2000])
+    end = np.array([2001, 2000, 3000, 3000, 4000, 4001, 3000.001])
+    idx0, idx1 = completion.completion_indices(df_tubing_segments, start, end)
+    assert list(zip(idx0, idx1)) == [(0, 1), (0, 0), (0, 1), (-1, -1), (1, 2), (-1, -1), (1, 2)]
+    # Unsorted completion intervals are searched one segment at a time.
+    idx0, idx1 = completion.completion_indices(df_tubing_segments.iloc[::-1], start, end)
+    assert list(zip(idx0, idx1)) == [(2, 1), (2, 2), (2, 1), (-1, -1), (1, 0), (-1, -1), (1, 0)]
+
+
+def test_get_completions():
+    """Test get_completions gives the same results as get_completion for each segment."""
+    rng = np.random.default_rng(42)
+    edges = np.cumsum(rng.uniform(1, 40, size=31))
+    df_completion = pd.DataFrame(
+        {
+            Headers.START_MEASURED_DEPTH: edges[:-1],
+            Headers.END_MEASURED_DEPTH: edges[1:],
+            Headers.VALVES_PER_JOINT: rng.uniform(0, 3, size=30),
+            Headers.INNER_DIAMETER: rng.uniform(0.1, 0.15, size=30),
+            Headers.OUTER_DIAMETER: rng.uniform(0.2, 0.3, size=30),
+            Headers.ROUGHNESS: rng.uniform(0, 1e-3, size=30),
+            Headers.DEVICE_TYPE: rng.choice([Content.PERFORATED, Content.INFLOW_CONTROL_DEVICE], size=30).astype(
+                object
+            ),
+            Headers.DEVICE_NUMBER: rng.integers(1, 5, size=30),
+            Headers.ANNULUS_ZONE: rng.integers(0, 3, size=30),
+            Headers.WELL: ["A1"] * 30,
+        }
+    )
+    # Segments spanning part of one interval, several intervals, and all of them.
+    segment_edges = np.sort(np.concatenate([rng.uniform(edges[0], edges[-1], size=20), edges[[0, 5, 12, -1]]]))
+    start = np.append(segment_edges[:-1], edges[0] + 1.0)
+    end = np.append(segment_edges[1:], edges[-1])
+
+    result = completion.get_completions(start, end, df_completion, 12.0)
+    expected = [completion.get_completion(start[i], end[i], df_completion, 12.0) for i in range(start.size)]
+    for column, values in enumerate(result):
+        assert list(values) == [completion_data[column] for completion_data in expected]
+
+
+def test_get_completions_not_completed():
+    """Test get_completions raises the same error as get_completion for a segment outside the completion."""
+    df_completion = pd.DataFrame(
+        [[0.0, 20.0, 1.0, 0.1, 0.2, 1e-4, Content.PERFORATED, 1, 0, "A1"]],
+        columns=[
+            Headers.START_MEASURED_DEPTH,
+            Headers.END_MEASURED_DEPTH,
+            Headers.VALVES_PER_JOINT,
+            Headers.INNER_DIAMETER,
+            Headers.OUTER_DIAMETER,
+            Headers.ROUGHNESS,
+            Headers.DEVICE_TYPE,
+            Headers.DEVICE_NUMBER,
+            Headers.ANNULUS_ZONE,
+            Headers.WELL,
+        ],
+    )
+    with pytest.raises(CompletorError, match="No completion is defined for well A1 from 20.0 to 30.0"):
+        completion.get_completions(np.array([0.0, 20.0]), np.array([20.0, 30.0]), df_completion, 12.0)
+
+
 def test_connect_cells_segment_cells():
     """Test connect_cells_segment connects cells to segment using method 'cells'."""
     df_segment = pd.DataFrame(
@@ -263,6 +330,31 @@ def test_well_trajectory():
     pd.testing.assert_frame_equal(df_test, df_true)
 
 
+def test_lumping_segments():
+    """Test lumping_segments lumps additional segments in annulus zones to the neighbouring segment in the same zone.
+
+    Additional segments are lumped to the segment before them if possible, otherwise to the segment after them.
+    Additional segments without annulus zone are dropped.
+    """
+    df_well = pd.DataFrame(
+        [
+            [1.0, 1, Headers.ORIGINAL_SEGMENT],
+            [2.0, 1, Headers.ADDITIONAL_SEGMENT],
+            [4.0, 2, Headers.ADDITIONAL_SEGMENT],
+            [8.0, 2, Headers.ORIGINAL_SEGMENT],
+            [16.0, 2, Headers.ADDITIONAL_SEGMENT],
+            [32.0, 0, Headers.ADDITIONAL_SEGMENT],
+            [64.0, 0, Headers.ORIGINAL_SEGMENT],
+        ],
+        columns=[Headers.NUMBER_OF_DEVICES, Headers.ANNULUS_ZONE, Headers.SEGMENT_DESC],
+    )
+    df_true = pd.DataFrame(
+        [[3.0, 1, Headers.ORIGINAL_SEGMENT], [28.0, 2, Headers.ORIGINAL_SEGMENT], [64.0, 0, Headers.ORIGINAL_SEGMENT]],
+        columns=[Headers.NUMBER_OF_DEVICES, Headers.ANNULUS_ZONE, Headers.SEGMENT_DESC],
+    )
+    pd.testing.assert_frame_equal(completion.lumping_segments(df_well), df_true)
+
+
 def test_define_annulus_zone_keep_gravel_pack_1():
     """Test define_annulus_zone gives open annulus segment when interrupted by packer segments and gravel packs.
 
@@ -1022,3 +1114,15 @@ def test_set_welsegs_negative_length_segments(caplog):
     )
     assert len(caplog.text) > 0
     assert "WARNING" in caplog.text
+
+
+def test_nearest_index():
+    """Test _nearest_index finds the first of the nearest values, as with a matrix of all distances."""
+    values = np.array([0.0, 1.0, 1.0, 2.0, 4.0, 4.0])
+    targets = np.array([-1.0, 0.5, 1.0, 1.4, 3.0, 3.5, 5.0])
+    expected = np.abs(values[:, np.newaxis] - targets).argmin(axis=0)
+    np.testing.assert_array_equal(completion._nearest_index(values, targets), expected)
+    # Unsorted values are searched with the matrix of all distances.
+    unsorted_values = values[::-1]
+    expected = np.abs(unsorted_values[:, np.newaxis] - targets).argmin(axis=0)
+    np.testing.assert_array_equal(completion._nearest_index(unsorted_values, targets), expected)
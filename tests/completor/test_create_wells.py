@@ -8,6 +8,7 @@ import pytest
 
 from completor.constants import Method  # type: ignore
 from completor.exceptions.clean_exceptions import CompletorError
+from completor.logger import stage_counts, stage_timings
 from completor.read_casefile import ReadCasefile  # type: ignore
 from tests import utils_for_tests
 
@@ -98,3 +99,22 @@ def test_tubing_segment_icv(tmpdir):
     true_file = Path(_TESTDIR / "icv_tubing.true")
     utils_for_tests.open_files_run_create(case_file, schedule_file, _TEST_FILE)
     utils_for_tests.assert_results(true_file, _TEST_FILE)
+
+
+def test_lazy_tubing_segmentation(tmpdir):
+    """Test that only the tubing segmentation the devices of a lateral need is created, and that it is timed."""
+    tmpdir.chdir()
+    utils_for_tests.open_files_run_create(
+        Path(_TESTDIR / "duplicate.case"), Path(_TESTDIR / "duplicate.sch"), _TEST_FILE
+    )
+    assert stage_counts["Lateral: tubing segments (CELLS)"] > 0
+    assert "Lateral: tubing segments (USER)" not in stage_counts
+    assert "Lateral: tubing segments by priority" not in stage_counts
+    assert stage_timings["Lateral: tubing segments (CELLS)"] > 0
+
+    # Laterals mixing ICVs and other devices need both segmentations.
+    utils_for_tests.open_files_run_create(
+        Path(_TESTDIR / "icv_tubing.case"), Path(_TESTDIR / "icv_sch.sch"), _TEST_FILE
+    )
+    assert stage_counts["Lateral: tubing segments by priority"] > 0
+    assert stage_counts["Lateral: tubing segments (USER)"] >= stage_counts["Lateral: tubing segments by priority"]
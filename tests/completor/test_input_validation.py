@@ -2,10 +2,12 @@
 
 from pathlib import Path
 
+import pandas as pd
 import pytest
 
+from completor.constants import Headers
 from completor.exceptions.clean_exceptions import CompletorError
-from completor.input_validation import validate_minimum_segment_length
+from completor.input_validation import assess_completion, validate_minimum_segment_length
 from completor.read_casefile import ReadCasefile
 
 _TESTDIR = Path(__file__).absolute().parent / "data"
@@ -33,3 +35,62 @@ def test_validate_minimum_segment_length():
 
     with pytest.raises(CompletorError):
         validate_minimum_segment_length(-5.0)
+
+
+def _completion(rows: list[list]) -> pd.DataFrame:
+    """Create a completion table with the columns that are assessed."""
+    return pd.DataFrame(
+        rows,
+        columns=[
+            Headers.WELL,
+            Headers.BRANCH,
+            Headers.START_MEASURED_DEPTH,
+            Headers.END_MEASURED_DEPTH,
+            Headers.ANNULUS,
+            Headers.DEVICE_TYPE,
+        ],
+    )
+
+
+def test_assess_completion():
+    """Test that a valid completion passes, and that a single error is reported as is."""
+    assess_completion(
+        _completion(
+            [
+                ["A1", 1, 0.0, 1000.0, "OA", "AICD"],
+                ["A1", 1, 1000.0, 1000.0, "PA", "PERF"],
+                ["A1", 1, 1000.0, 2000.0, "GP", "ICD"],
+                ["A2", 1, 0.0, 500.0, "OA", "PERF"],
+                ["A1", 2, 500.0, 1500.0, "OA", "VALVE"],
+            ]
+        )
+    )
+    with pytest.raises(
+        CompletorError, match="^Overlapping completion description in well 'A1' branch 1 from depth 1000.0"
+    ):
+        assess_completion(_completion([["A1", 1, 0.0, 1000.0, "OA", "AICD"], ["A1", 1, 900.0, 2000.0, "OA", "AICD"]]))
+
+
+def test_assess_completion_reports_all_errors():
+    """Test that the errors of all wells are reported together, ordered by well, branch and row."""
+    df_comp = _completion(
+        [
+            ["A1", 1, 0.0, 1000.0, "OA", "AICD"],
+            ["A2", 1, 0.0, 500.0, "XX", "PERF"],
+            ["A1", 2, 0.0, 10.0, "PA", "PERF"],
+            ["A1", 1, 1100.0, 2000.0, "OA", "AICD"],
+            ["A2", 1, 500.0, 500.0, "OA", "NONE"],
+        ]
+    )
+    with pytest.raises(CompletorError) as err:
+        assess_completion(df_comp)
+    assert str(err.value).splitlines() == [
+        "Found 5 errors in COMPLETION:",
+        "Incomplete completion description in well A1 branch 1 from depth 1000.0 to depth 1100.0",
+        "Packer segments must not have length: well A1, branch 2, from depth 0.0 to depth 10.0.",
+        "XX is not a valid annulus type in well A2, branch 1, from depth 0.0 to depth 500.0. "
+        "Valid types are GP, OA, and PA",
+        "Non packer segments must have length: well A2, branch 1, from depth 500.0 to depth 500.0.",
+        "NONE is not a valid device type in well A2, branch 1, from depth 500.0 to depth 500.0. "
+        "Valid types are PERF, AICD, ICD, VALVE, DENSITY, INJV, DUALRCP, and ICV.",
+    ]
@@ -1,9 +1,12 @@
 """Test Completor main functions."""
 
+import os
+import re
 from pathlib import Path
 
 import pytest
 
+from completor import main
 from completor.constants import Keywords
 from completor.exceptions.clean_exceptions import CompletorError
 from completor.main import get_content_and_path
@@ -786,6 +789,63 @@ def test_error_missing_keywords(tmpdir, caplog):
         )
 
 
+@pytest.mark.parametrize("line_break", ["\n", "\r\n"], ids=["lf", "crlf"])
+def test_stream_schedule(tmpdir, line_break: str):
+    """Test that the output is the same when the schedule file is memory-mapped instead of read.
+
+    Also with CRLF line breaks, which reading in text mode makes LF.
+    """
+    tmpdir.chdir()
+    case_file = str(_TESTDIR / "well_4_lumping_tests_oa.case")
+    schedule_file = "schedule.sch"
+    schedule_content = Path(_TESTDIR / "leading_whitespace_terminating_slash.sch").read_bytes()
+    Path(schedule_file).write_bytes(schedule_content.replace(b"\r\n", b"\n").replace(b"\n", line_break.encode()))
+    true_file = Path(_TESTDIR / "user_created_lumping_oa.true")
+    utils_for_tests.completor_runner(inputfile=case_file, schedulefile=schedule_file, outputfile="read.sch")
+    utils_for_tests.completor_runner(
+        inputfile=case_file, schedulefile=schedule_file, outputfile=_TEST_FILE, stream=True
+    )
+    utils_for_tests.assert_results(true_file, _TEST_FILE)
+
+    outputs = []
+    for output_file in ["read.sch", _TEST_FILE]:
+        with open(output_file, encoding="utf-8", newline="") as file:
+            outputs.append([line for line in file.read().split("\n") if not line.startswith("-- Created at")])
+    assert outputs[0] == outputs[1]
+    assert not any("\r" in line for line in outputs[1])
+
+
+def test_stream_error_output_is_schedule(tmpdir):
+    """Check that the schedule file is not overwritten by the output while it is memory-mapped."""
+    tmpdir.chdir()
+    case_file = str(_TESTDIR / "well_4_lumping_tests_oa.case")
+    schedule_content = Path(_TESTDIR / "leading_whitespace_terminating_slash.sch").read_bytes()
+    Path("schedule.sch").write_bytes(schedule_content)
+
+    with pytest.raises(CompletorError, match="cannot be the schedule file with --stream"):
+        utils_for_tests.completor_runner(
+            inputfile=case_file, schedulefile="schedule.sch", outputfile="./schedule.sch", stream=True
+        )
+    assert Path("schedule.sch").read_bytes() == schedule_content
+
+
+def test_stream_error_missing_keywords(tmpdir):
+    """Check error is reported if any of the main keywords are missing when the schedule file is memory-mapped."""
+    tmpdir.chdir()
+    case_file = str(_TESTDIR / "well_4_lumping_tests_oa.case")
+    schedule_file = Path(_TESTDIR / "drogon" / "drogon_input.sch")
+    with open(schedule_file, encoding="utf-8") as f:
+        schedule_content = f.read()
+    modified_schedule_path = Path(tmpdir / schedule_file.name)
+    with open(modified_schedule_path, "w", encoding="utf-8") as new_sch:
+        new_sch.write("\n".join(schedule_content.splitlines()[5:]))
+
+    with pytest.raises(CompletorError, match="Keyword WELSPECS is not found"):
+        utils_for_tests.completor_runner(
+            inputfile=case_file, schedulefile=modified_schedule_path, outputfile="output.sch", stream=True
+        )
+
+
 def test_wsegicv_bottom(tmpdir):
     """Test completor case with ICV to create a special tubing segmentation.
     Completor will produce mixes of tubing segmentation between lumped and default.
@@ -878,3 +938,90 @@ def test_multi_well_multi_lateral(tmpdir):
     true_file = Path(_TESTDIR / "multi_well_multi_lateral.true")
     utils_for_tests.open_files_run_create(case_file, schedule_file, _TEST_FILE)
     utils_for_tests.assert_results(true_file, _TEST_FILE, assert_text=True)
+
+
+def test_multi_well_multi_lateral_parallel(tmpdir):
+    """Test that the output is identical when the wells are created in parallel.
+
+    Only the formatted output of the wells is sent back from the workers, not the wells themselves.
+    """
+    tmpdir.chdir()
+    with open(_TESTDIR / "multi_well_multi_lateral.case", encoding="utf-8") as file:
+        case_content = file.read()
+    with open(_TESTDIR / "multi_well_multi_lateral.sch", encoding="utf-8") as file:
+        schedule_content = file.read()
+
+    outputs = []
+    for jobs in [1, 3]:
+        output_file = f"jobs_{jobs}.sch"
+        _, well, well_segments = main.create(
+            case_content, schedule_content, output_file, paths=("case", "schedule"), jobs=jobs
+        )
+        with open(output_file, encoding="utf-8") as file:
+            lines = [line for line in file.read().splitlines() if not line.startswith("-- Created at")]
+        outputs.append((lines, well_segments))
+        assert (well is None) == (jobs > 1)
+    assert outputs[0] == outputs[1]
+    utils_for_tests.assert_results(_TESTDIR / "multi_well_multi_lateral.true", "jobs_3.sch", assert_text=True)
+
+
+def test_multi_well_multi_lateral_include_files(tmpdir):
+    """Test that the output with the segment keywords of each well in include files is the same when included.
+
+    The include files are found from the directory of the DATA file, as the reservoir simulator resolves them.
+    """
+    tmpdir.chdir()
+    with open(_TESTDIR / "multi_well_multi_lateral.case", encoding="utf-8") as file:
+        case_content = file.read()
+    with open(_TESTDIR / "multi_well_multi_lateral.sch", encoding="utf-8") as file:
+        schedule_content = file.read()
+
+    schedule_directory = Path("eclipse/include/schedule")
+    model_directory = Path("eclipse/model")
+    schedule_directory.mkdir(parents=True)
+    model_directory.mkdir(parents=True)
+    main.create(case_content, schedule_content, "inline.sch", paths=("case", "schedule"))
+    main.create(
+        case_content,
+        schedule_content,
+        str(schedule_directory / "included.sch"),
+        paths=("case", "schedule"),
+        include_directory=str(schedule_directory / "wells"),
+        include_root=str(model_directory),
+    )
+    with open(schedule_directory / "included.sch", encoding="utf-8") as file:
+        output = file.read()
+    include_files = re.findall(r"INCLUDE\n '(.+)' /\n\n", output)
+    assert len(include_files) == len(os.listdir(schedule_directory / "wells")) > 0
+    for include_file in include_files:
+        assert include_file.startswith("../include/schedule/wells/")
+        with open(model_directory / include_file, encoding="utf-8") as file:
+            content = file.read().split("\n\n", 1)[1]
+        output = output.replace(f"INCLUDE\n '{include_file}' /\n\n", content)
+    with open("inline.sch", encoding="utf-8") as file:
+        expected = file.read()
+    assert [line for line in output.splitlines() if not line.startswith("-- Created at")] == [
+        line for line in expected.splitlines() if not line.startswith("-- Created at")
+    ]
+
+
+@pytest.mark.parametrize(
+    "case_file, schedule_file",
+    [
+        (_TESTDIR / "well_4_lumping_tests_oa.case", _TESTDIR / "leading_whitespace_terminating_slash.sch"),
+        (_TESTDIR.parent.parent / "completor_icv_merge" / "data" / "init.case", _TESTDIR / "welldefinition.testfile"),
+    ],
+)
+def test_case_file_read_once(tmpdir, monkeypatch, case_file: Path, schedule_file: Path):
+    """Test that the case file is read once, also when ICV-control is run after the completion."""
+    tmpdir.chdir()
+    opened_files = []
+    builtin_open = open
+
+    def _open(file, *args, **kwargs):
+        opened_files.append(Path(file))
+        return builtin_open(file, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", _open)
+    utils_for_tests.completor_runner(inputfile=case_file, schedulefile=schedule_file, outputfile=_TEST_FILE)
+    assert opened_files.count(case_file) == 1
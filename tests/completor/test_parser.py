@@ -3,9 +3,12 @@
 from pathlib import Path
 
 import numpy as np
+import pytest
 
 from completor import parse  # type: ignore
 from completor.constants import Keywords
+from completor.exceptions.clean_exceptions import CompletorError
+from completor.utils import clean_file_lines
 
 _TESTDIR = Path(__file__).absolute().parent / "data"
 
@@ -27,3 +30,33 @@ def test_locate_keyword():
     start_compdat, end_compdat = parse.locate_keyword(test1, Keywords.COMPLETION_DATA, "/", take_first=False)
     np.testing.assert_array_equal(start_compdat, [0, 3])
     np.testing.assert_array_equal(end_compdat, [2, 5])
+
+
+@pytest.mark.parametrize(
+    "case_file",
+    [
+        _TESTDIR / "multi_well_multi_lateral.case",
+        _TESTDIR / "icv_tubing.case",
+        _TESTDIR.parents[1] / "completor_icv_merge" / "data" / "icv_device_icvc.case",
+    ],
+)
+def test_keyword_index(case_file: Path):
+    """Test that the keyword index finds the same start and end of every keyword as locate_keyword."""
+    with open(case_file, encoding="utf-8") as file:
+        content = clean_file_lines(file.read().splitlines(), "--")
+    keyword_index = parse.KeywordIndex(content)
+    for keyword in set(content):
+        start, end = parse.locate_keyword(content, keyword, take_first=False)
+        if start[0] == -1:
+            assert keyword_index.spans(keyword) == []
+        else:
+            assert keyword_index.spans(keyword) == list(zip(start.tolist(), end.tolist()))
+
+
+def test_keyword_index_missing_keyword():
+    """Test keywords that are not found, keywords without an end record, and a keyword on the last line."""
+    keyword_index = parse.KeywordIndex([Keywords.COMPLETION_DATA, "1 2 3 /", Keywords.WELL_SEGMENTS, "1 /"])
+    assert keyword_index.locate(Keywords.COMPLETION_SEGMENTS) == (-1, -1)
+    with pytest.raises(CompletorError, match="has no end record"):
+        keyword_index.locate(Keywords.COMPLETION_DATA)
+    assert parse.KeywordIndex(["/", Keywords.COMPLETION_DATA]).locate(Keywords.COMPLETION_DATA) == (1, 2)
@@ -9,6 +9,7 @@ import pytest
 
 from completor import prepare_outputs
 from completor.constants import Content, Headers, Keywords
+from completor.exceptions.clean_exceptions import CompletorError
 from tests import utils_for_tests
 
 _TESTDIR = Path(__file__).absolute().parent / "data"
@@ -98,6 +99,63 @@ def test_outlet_segment_2():
     np.testing.assert_equal(test_segment, [2, 3, 4, 5])
 
 
+def test_prepare_annulus_layer():
+    """Test that each annular zone is a branch flowing to the device layer, linked to the other active devices."""
+    df_well = pd.DataFrame(
+        {
+            Headers.ANNULUS_ZONE: [1, 1, 1, 0, 2, 2],
+            Headers.TUBING_MEASURED_DEPTH: [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+            Headers.TRUE_VERTICAL_DEPTH: [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+            Headers.OUTER_DIAMETER: 0.2,
+            Headers.ROUGHNESS: 1e-4,
+            Headers.NUMBER_OF_DEVICES: [1.0, 0.0, 1.0, 1.0, 0.0, 0.0],
+            Headers.DEVICE_TYPE: ["AICD", "AICD", "AICD", "AICD", Content.PERFORATED, "AICD"],
+        }
+    )
+    df_device = pd.DataFrame(
+        {
+            Headers.START_SEGMENT_NUMBER: [10, 11, 12, 13],
+            Headers.BRANCH: [2, 3, 4, 5],
+            Headers.MEASURED_DEPTH: [10.1, 30.1, 40.1, 50.1],
+        }
+    )
+    df_annulus, df_well_segments_link = prepare_outputs.prepare_annulus_layer("A1", df_well, df_device)
+
+    np.testing.assert_equal(df_annulus[Headers.START_SEGMENT_NUMBER].to_numpy(), [14, 15, 16, 17, 18])
+    np.testing.assert_equal(df_annulus[Headers.BRANCH].to_numpy(), [6, 6, 6, 7, 7])
+    np.testing.assert_equal(df_annulus[Headers.OUT].to_numpy(), [10, 14, 15, 13, 17])
+    np.testing.assert_allclose(df_annulus[Headers.MEASURED_DEPTH].to_numpy(), [10.2, 20.1, 30.1, 50.2, 60.1])
+    df_true = pd.DataFrame({Headers.WELL: ["A1"], Headers.ANNULUS: [16], Headers.DEVICE: [11], Headers.EMPTY: ["/"]})
+    pd.testing.assert_frame_equal(df_well_segments_link.reset_index(drop=True), df_true)
+
+    # The first segment of a zone must be connected to the device layer.
+    df_well.loc[4, Headers.DEVICE_TYPE] = "AICD"
+    df_well.loc[5, Headers.NUMBER_OF_DEVICES] = 1.0
+    with pytest.raises(CompletorError, match="cannot have open annulus above top reservoir"):
+        prepare_outputs.prepare_annulus_layer("A1", df_well, df_device)
+
+
+def test_outlet_segment_sorted_layer():
+    """Test that a layer sorted once finds the same outlet segments as get_outlet_segment, for each segment number."""
+    reference_md = [5.0, 1.0, 4.0, 0.5, 2.0, 3.0]
+    reference_segment = [5, 2, 4, 1, 3, 6]
+    reference_outlet = [4, 1, 3, 1, 2, 2]
+    target_md = [0.0, 1.0, 1.5, 2.0, 3.0, 4.5, 6.0]
+
+    sorted_md, (sorted_segment, sorted_outlet) = prepare_outputs.sort_layer(
+        reference_md, reference_segment, reference_outlet
+    )
+    np.testing.assert_equal(sorted_md, [0.5, 1.0, 2.0, 3.0, 4.0, 5.0])
+    nearest = prepare_outputs.nearest_segment(target_md, sorted_md)
+    np.testing.assert_equal(sorted_segment[nearest], [1, 2, 2, 3, 6, 4, 5])
+    np.testing.assert_equal(
+        sorted_segment[nearest], prepare_outputs.get_outlet_segment(target_md, reference_md, reference_segment)
+    )
+    np.testing.assert_equal(
+        sorted_outlet[nearest], prepare_outputs.get_outlet_segment(target_md, reference_md, reference_outlet)
+    )
+
+
 @pytest.mark.parametrize(
     "segment_length,df_device,df_annulus,df_completion,expected",
     [
@@ -626,6 +684,38 @@ ENDACTIO
     assert wsegdensity_printout == true_wsegdensity_printout
 
 
+def test_print_wseginjv_shared_segment():
+    """Test that the records of a segment listed more than once are all written in each of its actions."""
+    df_wseginjv = pd.DataFrame(
+        [
+            ["A1", 3, 1.0, 7.852e-6, 2.59e-6, "SWFR", 100.0, "5*", 7.852e-6],
+            ["A1", 4, 1.0, 7.852e-6, 2.59e-6, "SPRD", 5.0, "5*", 7.852e-6],
+            ["A1", 3, 10.5, 1.0e-5, 2.59e-6, "SWFR", 100.0, "5*", 1.0e-5],
+        ],
+        columns=[
+            Headers.WELL,
+            Headers.START_SEGMENT_NUMBER,
+            Headers.FLOW_COEFFICIENT,
+            Headers.PRIMARY_FLOW_CROSS_SECTIONAL_AREA,
+            Headers.SECONDARY_FLOW_CROSS_SECTIONAL_AREA,
+            Headers.TRIGGER_PARAMETER,
+            Headers.TRIGGER_VALUE,
+            Headers.DEFAULTS,
+            Headers.MAX_FLOW_CROSS_SECTIONAL_AREA,
+        ],
+    )
+    printout = prepare_outputs.print_wseginjv(df_wseginjv, 1)
+    segment_3 = "  'A1' 3    1 0.000008 5* 7.852e-06 /\n  'A1' 3 10.5 0.000010 5* 1.000e-05 /"
+    segment_4 = "  'A1' 4 1 0.000008 5* 7.852e-06 /"
+    initial_records = printout.split("/\n\n")[1]
+    assert initial_records.endswith(f"\n{segment_3}\n{segment_4}\n{segment_3}\n")
+    assert printout.count("INJVOP0010031") == 2
+    assert printout.count(f"{segment_3}\n/\n\nUDQ\n  ASSIGN SUVTRIG A1 3 0 /") == 2
+    assert "SPRD 'A1' 4 >= -5.0 AND /" in printout
+    with pytest.raises(CompletorError, match="Trigger paramater given is not supported"):
+        prepare_outputs.print_wseginjv(df_wseginjv.assign(**{Headers.TRIGGER_PARAMETER: "SOFR"}), 1)
+
+
 def test_prepare_wsegvalv():
     df_well = pd.DataFrame(
         [
@@ -9,7 +9,7 @@ import pytest
 
 from completor.constants import Content, Headers, Keywords
 from completor.exceptions.clean_exceptions import CompletorError
-from completor.exceptions.exceptions import CaseReaderFormatError
+from completor.exceptions.exceptions import CaseReaderFormatError, CaseReaderValueError
 from completor.main import get_content_and_path
 from completor.read_casefile import ReadCasefile  # type: ignore
 
@@ -464,6 +464,36 @@ COMPLETION
         assert expected in str(err.value)
 
 
+def test_error_wrong_value_type():
+    """Check that a value which is not a number causes an error pointing at its line."""
+    case_string = """
+COMPLETION
+--Well    Branch   StartMD   EndmD    Screen     Well/CasingDiameter Roughness       Annulus     Nvalve/Joint     ValveType     DeviceNumber
+  'A1'       1        0         1000     0.1        0.2                 1E-4            OA          3                AICD          1
+/
+
+WSEGAICD
+--Number    Alpha       x   y   a   b   c   d   e   f   rhocal  viscal
+1           0.00021   0.0   1.0 1.1 1.2 0.9 1.3 1.4 2.1 1000.25    1.45
+2           0.00042   0.1   1.1 1.0 1.0 1.0 1.0 1.0 1.0 1001.25    1.55O
+/
+"""  # noqa: more human readable at this witdth.
+
+    with pytest.raises(CaseReaderValueError) as err:
+        ReadCasefile(case_file=case_string, schedule_file="none")
+
+    expected_err = [
+        "Error at line 10 in case file:\n",
+        "Could not read the value '1.55O' in column AICD_FLUID_VISCOSITY of keyword 'WSEGAICD' as a number.",
+    ]
+    for expected in expected_err:
+        assert expected in str(err.value)
+
+    with pytest.raises(CaseReaderValueError, match="Error at line 4 in case file") as err:
+        ReadCasefile(case_file=case_string.replace("  'A1'       1 ", "  'A1'     1.5 "), schedule_file="none")
+    assert "column BRANCH of keyword 'COMPLETION' as an integer" in str(err.value)
+
+
 def test_read_case_output_file_with_OUTFILE(tmpdir):
     """Test the function which reads OUT_FILE keyword when not command line"""
     shutil.copy(_TESTDIR / "case.testfile", tmpdir)
@@ -1,13 +1,16 @@
 """Test functions for the Completor read_schedule module."""
 
+import logging
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import pytest
 
 from completor import parse, utils
-from completor.constants import Headers
-from completor.read_schedule import fix_compsegs, fix_welsegs
+from completor.constants import Content, Headers
+from completor.exceptions.clean_exceptions import CompletorError
+from completor.read_schedule import fix_compsegs, fix_compsegs_by_priority, fix_welsegs
 from tests.utils_for_tests import ReadSchedule
 
 _TESTDIR = Path(__file__).absolute().parent / "data"
@@ -254,6 +257,32 @@ def test_fix_compsegs():
     pd.testing.assert_frame_equal(df_true, df_test)
 
 
+def test_fix_compsegs_logs_adjusted_cells(caplog):
+    """Test that the cells whose depths are changed to remove overlaps are logged."""
+    df_test = pd.DataFrame(
+        [[0.0, 10.0], [8.0, 20.0], [20.0, 30.0]], columns=[Headers.START_MEASURED_DEPTH, Headers.END_MEASURED_DEPTH]
+    )
+    with caplog.at_level(logging.DEBUG, logger="completor.logger"):
+        df_test = fix_compsegs(df_test, "A1")
+    np.testing.assert_array_equal(df_test[Headers.START_MEASURED_DEPTH].to_numpy(), [0.0, 10.0, 20.0])
+    assert "Adjusted 1 overlapping cells in COMPSEGS for A1: 8.0-20.0 to 10.0-20.0" in caplog.text
+
+
+def test_fix_compsegs_by_priority():
+    """Test that the custom segments of ICVs replace the cells they cover, and their neighbours are trimmed."""
+    columns = [Headers.START_MEASURED_DEPTH, Headers.END_MEASURED_DEPTH]
+    df_completion = pd.DataFrame(
+        [[15.0, Content.INFLOW_CONTROL_VALVE, 1.0], [45.0, "AICD", 1.0]],
+        columns=[Headers.START_MEASURED_DEPTH, Headers.DEVICE_TYPE, Headers.VALVES_PER_JOINT],
+    )
+    df_compsegs = pd.DataFrame([[0.0, 10.0], [10.0, 20.0], [20.0, 30.0], [30.0, 40.0], [40.0, 50.0]], columns=columns)
+    df_custom_compsegs = pd.DataFrame([[15.0, 35.0], [45.0, 50.0]], columns=columns)
+    df_true = pd.DataFrame([[0.0, 10.0], [10.0, 15.0], [15.0, 35.0], [35.0, 40.0], [40.0, 50.0]], columns=columns)
+
+    df_test = fix_compsegs_by_priority(df_completion, df_compsegs, df_custom_compsegs)
+    pd.testing.assert_frame_equal(df_test.reset_index(drop=True), df_true)
+
+
 def test_fix_welsegs():
     """Test that fix_welsegs correctly converts WELL_SEGMENTS from INC to ABS.
 
@@ -301,3 +330,58 @@ def test_fix_welsegs():
     df_header, df_content = fix_welsegs(df_header, df_content)
     pd.testing.assert_frame_equal(df_header_true, df_header)
     pd.testing.assert_frame_equal(df_content_true, df_content)
+
+
+def test_fix_welsegs_branch_order():
+    """Test that segments listed before their outlets are converted from INC to ABS."""
+    df_header = pd.DataFrame(
+        [[1000.0, 1500.0, "INC"]],
+        columns=[Headers.TRUE_VERTICAL_DEPTH, Headers.MEASURED_DEPTH, Headers.INFO_TYPE],
+    )
+    df_content = pd.DataFrame(
+        [
+            [6, 3, 5.0, 15.0],
+            [5, 4, 40.0, 40.0],
+            [2, 1, 10.0, 50.0],
+            [4, 3, 30.0, 30.0],
+            [3, 2, 20.0, 20.0],
+        ],
+        columns=[
+            Headers.TUBING_SEGMENT,
+            Headers.TUBING_OUTLET,
+            Headers.TRUE_VERTICAL_DEPTH,
+            Headers.TUBING_MEASURED_DEPTH,
+        ],
+    )
+    _, df_content = fix_welsegs(df_header, df_content)
+    np.testing.assert_array_equal(
+        df_content[Headers.TUBING_MEASURED_DEPTH].to_numpy(), [1585.0, 1640.0, 1550.0, 1600.0, 1570.0]
+    )
+    np.testing.assert_array_equal(
+        df_content[Headers.TRUE_VERTICAL_DEPTH].to_numpy(), [1035.0, 1100.0, 1010.0, 1060.0, 1030.0]
+    )
+
+
+@pytest.mark.parametrize(
+    "segments,outlets,message",
+    [
+        pytest.param([2, 3, 4], [1, 4, 3], "The segments 3, 4 in WELSEGS are each other's outlets.", id="cycle"),
+        pytest.param([2, 3], [1, 7], "Segment 3 in WELSEGS has outlet segment 7, which is not defined.", id="missing"),
+    ],
+)
+def test_fix_welsegs_invalid_outlets(segments, outlets, message):
+    """Test that undefined outlets, and segments that are each other's outlets, are reported."""
+    df_header = pd.DataFrame(
+        [[1000.0, 1500.0, "INC"]],
+        columns=[Headers.TRUE_VERTICAL_DEPTH, Headers.MEASURED_DEPTH, Headers.INFO_TYPE],
+    )
+    df_content = pd.DataFrame(
+        {
+            Headers.TUBING_SEGMENT: segments,
+            Headers.TUBING_OUTLET: outlets,
+            Headers.TRUE_VERTICAL_DEPTH: 10.0,
+            Headers.TUBING_MEASURED_DEPTH: 10.0,
+        }
+    )
+    with pytest.raises(CompletorError, match=message):
+        fix_welsegs(df_header, df_content)
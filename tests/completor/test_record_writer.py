@@ -0,0 +1,126 @@
+"""Test functions for the Completor record_writer module."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from completor import prepare_outputs
+from completor.constants import Headers
+from completor.record_writer import UnsupportedTable, format_records, format_rows
+
+
+def _pandas_tostring(df: pd.DataFrame, *args, **kwargs) -> str:
+    """Write a table with pandas, as dataframe_tostring did before the record writer."""
+    original = prepare_outputs.format_records
+
+    def unsupported(*_args, **_kwargs):
+        raise UnsupportedTable("Testing")
+
+    prepare_outputs.format_records = unsupported
+    try:
+        return prepare_outputs.dataframe_tostring(df.copy(), *args, **kwargs)
+    finally:
+        prepare_outputs.format_records = original
+
+
+_WELSEGS = pd.DataFrame(
+    {
+        Headers.START_SEGMENT_NUMBER: [2, 3, 14],
+        Headers.END_SEGMENT_NUMBER: [2, 3, 14],
+        Headers.BRANCH: [1, 1, 2],
+        Headers.OUT: [1, 2, 3],
+        Headers.MEASURED_DEPTH: [2005.0, 2015.12345, 2025.1],
+        Headers.TRUE_VERTICAL_DEPTH: [2005.0, 2015.0, np.nan],
+        Headers.WELL_BORE_DIAMETER: [0.15, 0.1, 0.125],
+        Headers.ROUGHNESS: [1.5e-05, 1.5e-05, 2e-7],
+        Headers.DEFAULTS: ["1*", "2*", "1*"],
+    }
+)
+
+_COMPDAT = pd.DataFrame(
+    {
+        Headers.WELL: ["A1", "A1", "LONG-WELL-NAME"],
+        Headers.I: [1, 2, 3],
+        Headers.J: [10, 20, 300],
+        Headers.K: [1, 1, 1],
+        Headers.K2: [1, 1, 1],
+        Headers.STATUS: ["OPEN", "SHUT", "OPEN"],
+        Headers.SATURATION_FUNCTION_REGION_NUMBERS: ["1*", "1*", "1*"],
+        Headers.CONNECTION_FACTOR: [1.23456789012, 100.0, 2.5e7],
+        Headers.WELL_BORE_DIAMETER: [0.216, 0.216, 0.3],
+        Headers.FORMATION_PERMEABILITY_THICKNESS: [1000.0, 0.0, 12345678.9],
+        Headers.SKIN: ["1*", "1*", "1*"],
+        Headers.D_FACTOR: ["1*", "1*", "1*"],
+    }
+)
+
+
+@pytest.mark.parametrize("df", [_WELSEGS, _COMPDAT])
+@pytest.mark.parametrize("format_column", [True, False])
+@pytest.mark.parametrize("header, keep_header", [(True, True), (True, False), (False, True)])
+@pytest.mark.parametrize("trim_df", [True, False])
+def test_format_records_same_as_pandas(
+    df: pd.DataFrame, format_column: bool, header: bool, keep_header: bool, trim_df: bool
+):
+    """Test that the records are written the same way as by pandas."""
+    expected = _pandas_tostring(df, format_column, trim_df, header, keep_header)
+    assert format_records(df, format_column, trim_df, header, keep_header) == expected
+    assert prepare_outputs.dataframe_tostring(df.copy(), format_column, trim_df, header, keep_header) == expected
+
+
+def test_format_records_wide_lines(caplog):
+    """Test that lines wider than the limit are left-justified, and reported if still too wide."""
+    df = pd.DataFrame({"A": ["x" * 40, "y"], "B_C": [1.5, 2.25], "D": ["z" * 60, "w"]})
+    assert format_records(df, True, limit=80) == _pandas_tostring(df, True, limit=80)
+    assert "wider than limit of 80 characters" in caplog.text
+    caplog.clear()
+    assert format_records(df, limit=200) == _pandas_tostring(df, limit=200)
+    assert "wider than limit" not in caplog.text
+
+
+def test_format_records_mixed_values():
+    """Test text columns holding numbers, and floats needing scientific notation."""
+    df = pd.DataFrame(
+        {"A": pd.Series(["1*", 2, 3.25, np.nan], dtype=object), "B": [1e-7, 1.0, np.nan, 3.0], "C": [1, 2, 3, 4]}
+    )
+    assert format_records(df) == _pandas_tostring(df)
+
+
+def test_format_records_unsupported():
+    """Test that tables the writer cannot write the same way as pandas are refused, and written by pandas instead."""
+    df = pd.DataFrame({"A": ["text\twith tab"], "B": [1.0]})
+    with pytest.raises(UnsupportedTable):
+        format_records(df)
+    assert prepare_outputs.dataframe_tostring(df.copy()) == _pandas_tostring(df)
+    with pytest.raises(UnsupportedTable):
+        format_records(pd.DataFrame([[1, 2]], columns=["A", "A"]))
+
+
+def test_format_records_leaves_table_unchanged():
+    """Test that the table written is not modified."""
+    df = _COMPDAT.copy()
+    format_records(df, True)
+    pd.testing.assert_frame_equal(df, _COMPDAT)
+
+
+@pytest.mark.parametrize("df", [_WELSEGS, _COMPDAT])
+@pytest.mark.parametrize("format_column, header", [(True, True), (True, False), (False, True)])
+def test_format_rows(df: pd.DataFrame, format_column: bool, header: bool):
+    """Test that each row is written the same as a table of that row alone."""
+    records = format_rows(df, format_column, False, header)
+    assert records == [format_records(df.iloc[[row]], format_column, False, header) for row in range(df.shape[0])]
+
+
+def test_format_rows_mixed_values():
+    """Test that values formatted differently from the rest of their column are written as in a table of their own."""
+    df = pd.DataFrame(
+        {
+            Headers.DEFAULTS: pd.Series(["5*", 2.5, "5*"], dtype=object),
+            "A": pd.Series(["1*", 2, 3.25], dtype=object),
+            "B_C": [1e-7, 1.0, 2.5e7],
+        }
+    )
+    records = format_rows(df, True)
+    assert records == [_pandas_tostring(df.iloc[[row]], True) for row in range(df.shape[0])]
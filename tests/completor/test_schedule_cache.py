@@ -0,0 +1,96 @@
+"""Test functions for the Completor schedule_cache module."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from completor import main
+from completor.schedule_cache import ScheduleCache
+from completor.schedule_index import ScheduleIndex
+from tests import utils_for_tests
+
+_TESTDIR = Path(__file__).absolute().parent / "data"
+
+
+def _read_schedule(schedule_file: str) -> str:
+    with open(_TESTDIR / schedule_file, encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("schedule_file", ["ml_well.sch", "duplicate.sch", "drogon/drogon_input.sch"])
+def test_schedule_cache_round_trip(tmpdir, schedule_file: str):
+    """Test that the schedule data read from the cache is identical to the parsed schedule data."""
+    schedule = _read_schedule(schedule_file)
+    schedule_data = main.read_schedule_data(ScheduleIndex(schedule))
+    schedule_cache = ScheduleCache(tmpdir)
+    key = schedule_cache.key(schedule)
+    assert schedule_cache.load(key) is None
+    schedule_cache.store(key, schedule_data)
+
+    cached_data = schedule_cache.load(key)
+    assert cached_data.keys() == schedule_data.keys()
+    for well_name, well_data in schedule_data.items():
+        assert cached_data[well_name].keys() == well_data.keys()
+        for keyword, tables in well_data.items():
+            cached_tables = cached_data[well_name][keyword]
+            if isinstance(tables, tuple):
+                assert isinstance(cached_tables, tuple)
+                for table, cached_table in zip(tables, cached_tables):
+                    pd.testing.assert_frame_equal(cached_table, table)
+            else:
+                pd.testing.assert_frame_equal(cached_tables, tables)
+
+
+def test_schedule_cache_key():
+    """Test that the key only depends on the content of the schedule."""
+    schedule = _read_schedule("ml_well.sch")
+    assert ScheduleCache.key(schedule) == ScheduleCache.key(schedule.encode())
+    assert ScheduleCache.key(schedule) != ScheduleCache.key(schedule + "\n")
+
+
+def test_schedule_cache_eviction(tmpdir):
+    """Test that the least recently used entries are evicted when the cache is full."""
+    schedule_data = main.read_schedule_data(ScheduleIndex(_read_schedule("ml_well.sch")))
+    schedule_cache = ScheduleCache(tmpdir)
+    schedule_cache.store("first", schedule_data)
+    entry_size = (Path(tmpdir) / "first.npz").stat().st_size
+    schedule_cache.max_size = 2 * entry_size
+    schedule_cache.store("second", schedule_data)
+    os.utime(Path(tmpdir) / "first.npz", (0, 0))
+    os.utime(Path(tmpdir) / "second.npz", (1, 1))
+    # Reading an entry marks it as recently used.
+    assert schedule_cache.load("first") is not None
+    schedule_cache.store("third", schedule_data)
+    assert sorted(path.name for path in Path(tmpdir).iterdir()) == ["first.npz", "third.npz"]
+
+
+def test_schedule_cache_corrupt_entry(tmpdir):
+    """Test that an unreadable entry is treated as missing."""
+    (Path(tmpdir) / "broken.npz").write_bytes(b"not an archive")
+    assert ScheduleCache(tmpdir).load("broken") is None
+
+
+def test_create_with_schedule_cache(tmpdir, monkeypatch):
+    """Test that a second run with the same schedule reads the cache instead of parsing, with identical output."""
+    tmpdir.chdir()
+    case_file = str(_TESTDIR / "well_4_lumping_tests_oa.case")
+    schedule_file = str(_TESTDIR / "leading_whitespace_terminating_slash.sch")
+    true_file = _TESTDIR / "user_created_lumping_oa.true"
+    cache_dir = str(tmpdir / "cache")
+    utils_for_tests.completor_runner(
+        inputfile=case_file, schedulefile=schedule_file, outputfile="first.sch", cache_dir=cache_dir
+    )
+    assert len(list(Path(cache_dir).glob("*.npz"))) == 1
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("The schedule was parsed, despite being cached.")
+
+    monkeypatch.setattr(main, "read_schedule_data", _fail)
+    utils_for_tests.completor_runner(
+        inputfile=case_file, schedulefile=schedule_file, outputfile="second.sch", cache_dir=cache_dir
+    )
+    utils_for_tests.assert_results(true_file, "second.sch")
@@ -0,0 +1,274 @@
+"""Test functions for the Completor schedule_index module."""
+
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+from completor.constants import Keywords
+from completor.exceptions.clean_exceptions import CompletorError
+from completor.schedule_index import IncludeFileWriter, ScheduleIndex, SchedulePatcher, ScheduleWriter
+from completor.utils import find_keyword_data, find_well_keyword_data
+
+_TESTDIR = Path(__file__).absolute().parent / "data"
+
+_SCHEDULE = """
+WELSPECS
+'A1' 'GROUP' 1 1 1* 'OIL' /
+'A2' 'GROUP' 2 2 1* 'OIL' /
+/
+
+COMPDAT
+-- WELL I J K1 K2
+'A1' 1 1 1 1 'OPEN' /
+'A1' 1 1 2 2 'OPEN' /
+-- Lateral 2
+'A1' 1 1 3 3 'OPEN' /
+-- Comment between wells
+'A2' 2 2 1 1 'OPEN' /
+/
+
+WELSEGS
+'A1' 2000.0 2000.0 1* 'ABS' /
+2 2 1 1 2010.0 2010.0 0.15 0.0001 /
+/
+
+COMPSEGS
+'A1' /
+1 1 1 1 2000.0 2010.0 /
+/
+"""
+
+
+def test_keyword_data():
+    """Test that the blocks found for each keyword are the same as with find_keyword_data."""
+    schedule_index = ScheduleIndex(_SCHEDULE)
+    for keyword in Keywords.main_keywords:
+        assert schedule_index.keyword_data(keyword) == find_keyword_data(keyword, _SCHEDULE)
+
+
+def test_well_keyword_data():
+    """Test the records found for each well, including comments above, between, and below them."""
+    schedule_index = ScheduleIndex(_SCHEDULE)
+    expected_compdat = (
+        "-- WELL I J K1 K2\n'A1' 1 1 1 1 'OPEN' /\n'A1' 1 1 2 2 'OPEN' /\n-- Lateral 2\n'A1' 1 1 3 3 'OPEN' /\n"
+        "-- Comment between wells"
+    )
+    assert schedule_index.well_keyword_data("A1", Keywords.COMPLETION_DATA) == expected_compdat
+    assert schedule_index.well_keyword_data("A2", Keywords.COMPLETION_DATA) == "'A2' 2 2 1 1 'OPEN' /"
+    assert (
+        schedule_index.well_keyword_data("A1", Keywords.WELL_SEGMENTS)
+        == find_keyword_data(Keywords.WELL_SEGMENTS, _SCHEDULE)[0]
+    )
+    assert (
+        schedule_index.well_keyword_data("A1", Keywords.COMPLETION_SEGMENTS)
+        == find_keyword_data(Keywords.COMPLETION_SEGMENTS, _SCHEDULE)[0]
+    )
+    assert schedule_index.well_keyword_data("A2", Keywords.WELL_SEGMENTS) == ""
+    assert schedule_index.well_span("A2", Keywords.COMPLETION_SEGMENTS) is None
+
+
+def test_well_span_matches_text():
+    """Test that the offsets of each well's records point at the records in the schedule."""
+    schedule_index = ScheduleIndex(_SCHEDULE)
+    start, end = schedule_index.well_span("A2", Keywords.COMPLETION_DATA)
+    assert _SCHEDULE[start:end] == "'A2' 2 2 1 1 'OPEN' /"
+    assert _SCHEDULE.index("'A2' 2 2 1 1") == start
+
+
+@pytest.mark.parametrize("schedule_file", ["duplicate.sch", "leading_whitespace_terminating_slash.sch", "ml_well.sch"])
+def test_schedule_index_matches_find_well_keyword_data(schedule_file: str):
+    """Test that the index gives the same records as find_well_keyword_data for the wells in a schedule file."""
+    with open(_TESTDIR / schedule_file, encoding="utf-8") as file:
+        schedule = re.sub(r"[^\S\r\n]+$", "", file.read(), flags=re.MULTILINE)
+    schedule_index = ScheduleIndex(schedule)
+    wells = schedule_index.well_records[Keywords.WELL_SPECIFICATION].keys()
+    assert wells
+    for well in wells:
+        for keyword in [Keywords.COMPLETION_SEGMENTS, Keywords.WELL_SEGMENTS, Keywords.COMPLETION_DATA]:
+            assert schedule_index.well_keyword_data(well, keyword) == find_well_keyword_data(well, keyword, schedule)
+
+
+def test_schedule_patcher():
+    """Test that edits are applied in schedule order, regardless of the order they were added in."""
+    schedule_index = ScheduleIndex(_SCHEDULE)
+    schedule_patcher = SchedulePatcher(_SCHEDULE)
+    schedule_patcher.add(*schedule_index.well_span("A2", Keywords.COMPLETION_DATA), "-- new A2")
+    schedule_patcher.add(*schedule_index.well_span("A1", Keywords.WELL_SEGMENTS), "-- new A1 WELSEGS")
+    schedule_patcher.add(*schedule_index.well_span("A1", Keywords.COMPLETION_DATA), "-- new A1")
+    file = io.StringIO()
+    schedule_patcher.write(file)
+
+    expected = _SCHEDULE.replace(schedule_index.well_keyword_data("A1", Keywords.COMPLETION_DATA), "-- new A1")
+    expected = expected.replace("'A2' 2 2 1 1 'OPEN' /", "-- new A2")
+    expected = expected.replace(schedule_index.well_keyword_data("A1", Keywords.WELL_SEGMENTS), "-- new A1 WELSEGS")
+    assert file.getvalue() == expected
+
+
+def test_schedule_patcher_mapper():
+    """Test that pre-processor well names are replaced in both the edits and the untouched text."""
+    schedule_index = ScheduleIndex(_SCHEDULE)
+    schedule_patcher = SchedulePatcher(_SCHEDULE)
+    schedule_patcher.add(*schedule_index.well_span("A2", Keywords.COMPLETION_DATA), "'A2' 3 3 1 1 'OPEN' /")
+    file = io.StringIO()
+    schedule_patcher.write(file, {"A2": "B2"})
+    assert "'A2'" not in file.getvalue()
+    assert "'B2' 'GROUP' 2 2 1* 'OIL' /" in file.getvalue()
+    assert "'B2' 3 3 1 1 'OPEN' /" in file.getvalue()
+
+
+def test_schedule_patcher_overlapping_edits():
+    """Test that overlapping edits are refused."""
+    schedule_patcher = SchedulePatcher(_SCHEDULE)
+    schedule_patcher.add(10, 20, "")
+    schedule_patcher.add(15, 25, "")
+    with pytest.raises(CompletorError):
+        schedule_patcher.write(io.StringIO())
+
+
+@pytest.mark.parametrize("line_break", ["\n", "\r\n"], ids=["lf", "crlf"])
+def test_schedule_index_memory_mapped(tmpdir, line_break: str):
+    """Test that a memory-mapped schedule with trailing whitespace is indexed the same as the stripped text.
+
+    Also with CRLF line breaks, which are made LF as when the schedule is read in text mode.
+    """
+    schedule_path = Path(tmpdir / "schedule.sch")
+    schedule_text = _SCHEDULE.replace(" /\n", " /   \n").replace("\n", "\t\n", 3)
+    schedule_path.write_bytes(schedule_text.replace("\n", line_break).encode())
+    with open(schedule_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        mapped_index = ScheduleIndex(mapped_file)
+        schedule_index = ScheduleIndex(_SCHEDULE)
+        for keyword in Keywords.main_keywords:
+            assert mapped_index.keyword_data(keyword) == schedule_index.keyword_data(keyword)
+            assert mapped_index.well_records[keyword].keys() == schedule_index.well_records[keyword].keys()
+            for well in schedule_index.well_records[keyword]:
+                assert mapped_index.well_keyword_data(well, keyword) == schedule_index.well_keyword_data(well, keyword)
+
+        schedule_patcher = SchedulePatcher(mapped_file)
+        schedule_patcher.add(0, 0, "-- Banner\n")
+        schedule_patcher.add(*mapped_index.well_span("A2", Keywords.COMPLETION_DATA), "'A2' 3 3 1 1 'OPEN' /")
+        mapped_output = io.StringIO()
+        schedule_patcher.write(mapped_output, {"A1": "B1"})
+
+    schedule_patcher = SchedulePatcher(_SCHEDULE)
+    schedule_patcher.add(0, 0, "-- Banner\n")
+    schedule_patcher.add(*schedule_index.well_span("A2", Keywords.COMPLETION_DATA), "'A2' 3 3 1 1 'OPEN' /")
+    output = io.StringIO()
+    schedule_patcher.write(output, {"A1": "B1"})
+    assert mapped_output.getvalue() == output.getvalue()
+    assert output.getvalue().startswith("-- Banner\n")
+
+
+@pytest.mark.parametrize("line_break", ["\n", "\r\n"], ids=["lf", "crlf"])
+def test_schedule_patcher_memory_mapped_chunks(monkeypatch, line_break: str):
+    """Test that untouched text written in chunks is the same as when written at once."""
+    monkeypatch.setattr("completor.schedule_index._CHUNK_SIZE", 8)
+    expected = io.StringIO()
+    SchedulePatcher(_SCHEDULE).write(expected, {"A1": "B1"})
+    output = io.StringIO()
+    SchedulePatcher(_SCHEDULE.replace("\n", line_break).encode()).write(output, {"A1": "B1"})
+    assert output.getvalue() == expected.getvalue()
+
+
+def test_schedule_writer():
+    """Test that wells are written as soon as the wells before them in the schedule are done."""
+    schedule_index = ScheduleIndex(_SCHEDULE)
+    file = io.StringIO()
+    schedule_writer = ScheduleWriter(_SCHEDULE, file, {"A1": "B1"})
+    schedule_writer.insert(0, "-- Banner\n")
+    schedule_writer.expect_wells(schedule_index, ["A2", "A1", "A3"])
+
+    schedule_writer.add_well("A2", [(Keywords.COMPLETION_DATA, "-- new A2")])
+    assert file.getvalue() == "-- Banner\n"
+    schedule_writer.skip_well("A3")
+    schedule_writer.add_well(
+        "A1", [(Keywords.COMPLETION_DATA, "-- new A1"), (Keywords.WELL_SEGMENTS, "-- new A1 WELSEGS")]
+    )
+    assert file.getvalue().endswith("-- new B1 WELSEGS")
+    schedule_writer.close()
+
+    schedule_patcher = SchedulePatcher(_SCHEDULE)
+    schedule_patcher.add(0, 0, "-- Banner\n")
+    schedule_patcher.add(*schedule_index.well_span("A1", Keywords.COMPLETION_DATA), "-- new A1")
+    schedule_patcher.add(*schedule_index.well_span("A2", Keywords.COMPLETION_DATA), "-- new A2")
+    schedule_patcher.add(*schedule_index.well_span("A1", Keywords.WELL_SEGMENTS), "-- new A1 WELSEGS")
+    expected = io.StringIO()
+    schedule_patcher.write(expected, {"A1": "B1"})
+    assert file.getvalue() == expected.getvalue()
+
+    schedule_writer = ScheduleWriter(_SCHEDULE, io.StringIO())
+    schedule_writer.expect_wells(schedule_index, ["A2"])
+    with pytest.raises(CompletorError):
+        schedule_writer.add_well("A2", [(Keywords.WELL_SEGMENTS, "")])
+
+
+def test_schedule_writer_holds_back_pending_wells():
+    """Test that the records of a well are not written while a well before it in the schedule is still to come."""
+    schedule_index = ScheduleIndex(_SCHEDULE)
+    file = io.StringIO()
+    schedule_writer = ScheduleWriter(_SCHEDULE, file)
+    schedule_writer.expect_wells(schedule_index, ["A1", "A2"])
+    schedule_writer.add_well("A1", [(Keywords.COMPLETION_DATA, "-- new A1")])
+    assert file.getvalue().endswith("-- new A1")
+    assert "'A2' 2 2 1 1" not in file.getvalue()
+    schedule_writer.add_well("A2", [(Keywords.COMPLETION_DATA, "-- new A2")])
+    schedule_writer.close()
+    assert "-- new A1\n-- new A2\n/" in file.getvalue()
+
+
+def test_include_file_writer(tmp_path: Path):
+    """Test that the segment keywords of each well are written to include files, kept as long as they are unchanged."""
+    schedule_index = ScheduleIndex(_SCHEDULE)
+    new_records = [
+        (Keywords.COMPLETION_DATA, "-- new A1"),
+        (Keywords.WELL_SEGMENTS, "WELSEGS\n'A1' 2000 2000 /\n/\n\n"),
+    ]
+
+    def write(records: list[tuple[str, str]]) -> str:
+        file = io.StringIO()
+        schedule_writer = IncludeFileWriter(_SCHEDULE, file, tmp_path / "include", tmp_path, {"A1": "B1"})
+        schedule_writer.expect_wells(schedule_index, ["A1"])
+        schedule_writer.add_well("A1", records)
+        schedule_writer.close()
+        return file.getvalue()
+
+    output = write(new_records)
+    (include_file,) = (tmp_path / "include").iterdir()
+    assert re.fullmatch(r"B1_WELSEGS_[0-9a-f]{12}\.inc", include_file.name)
+    assert f"INCLUDE\n 'include/{include_file.name}' /\n" in output
+    assert "-- new A1" in output
+    assert "WELSEGS\n'B1' 2000 2000 /\n/" in include_file.read_text(encoding="utf-8")
+    assert include_file.name[-16:-4] in include_file.read_text(encoding="utf-8").splitlines()[0]
+
+    os.utime(include_file, ns=(0, 0))
+    assert write(new_records) == output
+    assert include_file.stat().st_mtime_ns == 0
+
+    write([new_records[0], (Keywords.WELL_SEGMENTS, "WELSEGS\n'A1' 2500 2500 /\n/\n\n")])
+    assert len(list((tmp_path / "include").iterdir())) == 2
+
+    file = io.StringIO()
+    schedule_writer = IncludeFileWriter(_SCHEDULE, file, tmp_path / "include", mapper={"A1": "B1"})
+    schedule_writer.expect_wells(schedule_index, ["A1"])
+    schedule_writer.add_well("A1", new_records)
+    schedule_writer.close()
+    assert f"INCLUDE\n '{include_file.absolute().as_posix()}' /\n" in file.getvalue()
+
+
+def test_include_file_writer_failed_write(tmp_path: Path, monkeypatch):
+    """Test that an include file that could not be written in full is not left behind for later runs to keep."""
+
+    def _replace(*args, **kwargs):
+        raise OSError("Disk full.")
+
+    monkeypatch.setattr("completor.schedule_index.os.replace", _replace)
+    schedule_writer = IncludeFileWriter(_SCHEDULE, io.StringIO(), tmp_path / "include", tmp_path)
+    schedule_writer.expect_wells(ScheduleIndex(_SCHEDULE), ["A1"])
+    with pytest.raises(OSError, match="Disk full."):
+        schedule_writer.add_well("A1", [(Keywords.WELL_SEGMENTS, "WELSEGS\n'A1' 2000 2000 /\n/\n\n")])
+    assert list((tmp_path / "include").iterdir()) == []
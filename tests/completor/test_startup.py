@@ -0,0 +1,71 @@
+"""Test that Completor starts without loading the libraries only some runs need."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+_TESTDIR = Path(__file__).absolute().parent / "data"
+
+# Libraries only loaded when figures are made.
+_LAZY_MODULES = ["matplotlib", "scipy", "completor.visualization", "completor.visualize_well"]
+
+# Generous upper limit of the processor time to import the command line program, in seconds.
+_STARTUP_BUDGET = 2.0
+
+_RUN = """
+import json
+import sys
+import time
+
+start = time.process_time()
+from completor.main import main
+
+import_time = time.process_time() - start
+sys.argv = ["completor", *sys.argv[1:]]
+try:
+    main()
+except SystemExit as err:
+    if err.code:
+        raise
+print(json.dumps({"import_time": import_time, "modules": sorted(sys.modules)}))
+"""
+
+
+def _run_completor(*arguments: str, cwd: Path) -> dict:
+    """Run Completor in a new interpreter, and get the modules it loaded and the time it took to import."""
+    process = subprocess.run(
+        [sys.executable, "-c", _RUN, *arguments], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        ["--version"],
+        [
+            "-i",
+            str(_TESTDIR / "well_4_lumping_tests_oa.case"),
+            "-s",
+            str(_TESTDIR / "leading_whitespace_terminating_slash.sch"),
+            "-o",
+            "test.sch",
+        ],
+    ],
+    ids=["version", "run"],
+)
+def test_startup(tmpdir, arguments: list[str]):
+    """Test that plotting is not loaded unless figures are made, and that the import time is within budget."""
+    result = _run_completor(*arguments, cwd=Path(tmpdir))
+    loaded = [
+        module
+        for module in result["modules"]
+        if any(module == lazy or module.startswith(f"{lazy}.") for lazy in _LAZY_MODULES)
+    ]
+    assert loaded == []
+    assert result["import_time"] < _STARTUP_BUDGET
@@ -1,6 +1,12 @@
 import pytest
 
-from completor.utils import clean_file_line, clean_file_lines
+from completor.utils import (
+    CaseInput,
+    clean_file_line,
+    clean_file_lines,
+    completion_keyword_in_file,
+    icvc_keyword_in_file,
+)
 
 
 @pytest.mark.parametrize(
@@ -70,3 +76,20 @@ def test_clean_file_lines():
         "/",
     ]
     assert clean_file_lines(test_lines) == true_lines
+
+
+def test_case_input(tmpdir):
+    """Test that the case input finds the keywords deciding the passes, the same as when reading the file."""
+    content = "-- A comment\nCOMPLETION\n'A1' 1 0 1000 0.1 0.2 1E-4 OA 3 AICD 1\n/\n\nICVCONTROL\n/\n"
+    case = CaseInput.from_content(content)
+    assert case.lines == ("COMPLETION", "'A1' 1 0 1000 0.1 0.2 1E-4 OA 3 AICD 1", "/", "ICVCONTROL", "/")
+    assert case.keywords == {"COMPLETION", "ICVCONTROL"}
+    assert icvc_keyword_in_file(case) and completion_keyword_in_file(case)
+
+    case_path = tmpdir / "test.case"
+    case_path.write_text(content.replace("ICVCONTROL", "JOINTLENGTH"), encoding="utf-8")
+    case = CaseInput.from_file(case_path)
+    assert case.path == str(case_path)
+    assert case.keywords == {"COMPLETION"}
+    assert not icvc_keyword_in_file(case) and not icvc_keyword_in_file(case_path)
+    assert completion_keyword_in_file(case_path)
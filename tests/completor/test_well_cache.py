@@ -0,0 +1,99 @@
+"""Test functions for the Completor well_cache module."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from completor import main
+from completor.read_casefile import ReadCasefile
+from completor.schedule_index import ScheduleIndex
+from completor.well_cache import WellCache
+
+_TESTDIR = Path(__file__).absolute().parent / "data"
+
+
+def _read(file_name: str) -> str:
+    with open(_TESTDIR / file_name, encoding="utf-8") as file:
+        return file.read()
+
+
+_CASE = _read("multi_well_multi_lateral.case")
+_SCHEDULE = _read("multi_well_multi_lateral.sch")
+
+
+def _keys(case_content: str) -> dict[str, str]:
+    case = ReadCasefile(case_content)
+    schedule_data = main.read_schedule_data(ScheduleIndex(_SCHEDULE))
+    return {
+        well_name: WellCache.key(case, well_name, well_number, schedule_data[well_name])
+        for well_number, well_name in enumerate(["A-1", "B-1", "C1"])
+    }
+
+
+def test_well_cache_key():
+    """Test that the key of a well only changes when its own input, or the input of all wells, changes."""
+    keys = _keys(_CASE)
+    assert keys == _keys(_CASE)
+    assert len(set(keys.values())) == 3
+
+    # The completion of one well.
+    changed = _keys(_CASE.replace("GP     0.5      ICD", "GP     0.7      ICD"))
+    assert [changed[well] == keys[well] for well in keys] == [False, True, True]
+    # A device used by one well.
+    changed = _keys(_CASE.replace("1  0.00021  0.0", "1  0.00022  0.0"))
+    assert [changed[well] == keys[well] for well in keys] == [True, True, False]
+    # A device not used by any well.
+    changed = _keys(_CASE.replace("/\n\nSEGMENTLENGTH", "         4    0.85   4.00e-5      5*\n/\n\nSEGMENTLENGTH"))
+    assert changed == keys
+    # A keyword that applies to all wells.
+    changed = _keys(_CASE.replace("SEGMENTLENGTH\n  -1", "SEGMENTLENGTH\n  0"))
+    assert not set(changed.values()) & set(keys.values())
+
+
+def test_well_cache_round_trip(tmpdir):
+    """Test that the output of a well read from the cache is identical to the output stored."""
+    well_cache = WellCache(tmpdir)
+    df_icv = pd.DataFrame({"WELL": ["A1", "A1"], "START_SEGMENT_NUMBER": [12, 31]})
+    formatted_well = ("COMPDAT\n", "WELSEGS\n'A1' /\n", "COMPSEGS\n", "WSEGVALV\n", df_icv)
+    assert well_cache.load("key") is None
+    well_cache.store("key", formatted_well)
+    *text, cached_icv = well_cache.load("key")
+    assert tuple(text) == formatted_well[:4]
+    pd.testing.assert_frame_equal(cached_icv, df_icv)
+
+    (Path(tmpdir) / "broken.json").write_text("{", encoding="utf-8")
+    assert well_cache.load("broken") is None
+
+
+def test_create_with_well_cache(tmpdir, monkeypatch):
+    """Test that only the wells whose input changed are created again, with the same output as without the cache."""
+    tmpdir.chdir()
+    well_cache = WellCache(tmpdir / "wells")
+    main.create(_CASE, _SCHEDULE, "first.sch", well_cache=well_cache)
+    assert len(list(Path(tmpdir / "wells").glob("*.json"))) == 3
+
+    created_wells = []
+    format_well = main.format_well
+
+    def _format_well(well_name, *args, **kwargs):
+        created_wells.append(well_name)
+        return format_well(well_name, *args, **kwargs)
+
+    monkeypatch.setattr(main, "format_well", _format_well)
+    main.create(_CASE, _SCHEDULE, "second.sch", well_cache=well_cache)
+    assert created_wells == []
+    assert _read_output("second.sch") == _read_output("first.sch")
+
+    changed_case = _CASE.replace("GP     0.5      ICD", "GP     0.7      ICD")
+    main.create(changed_case, _SCHEDULE, "third.sch", well_cache=well_cache)
+    assert created_wells == ["A-1"]
+    monkeypatch.setattr(main, "format_well", format_well)
+    main.create(changed_case, _SCHEDULE, "expected.sch")
+    assert _read_output("third.sch") == _read_output("expected.sch")
+
+
+def _read_output(file_name: str) -> list[str]:
+    with open(file_name, encoding="utf-8") as file:
+        return [line for line in file.read().splitlines() if not line.startswith("-- Created at")]
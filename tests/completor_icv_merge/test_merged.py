@@ -2,6 +2,9 @@ import os
 import shutil
 from pathlib import Path
 
+import pytest
+
+from completor import main
 from tests.utils_for_tests import _assert_file_output, assert_files_exist_and_nonempty, completor_runner
 
 _TESTDIR_COMPLETOR = Path(__file__).absolute().parent.parent / "completor" / "data"
@@ -105,3 +108,37 @@ def test_output_python(tmpdir):
             "include/schedule/welldefinition_advanced.wells",
         ]
     )
+
+
+def test_output_handed_over_in_memory(tmpdir, monkeypatch):
+    """Test that ICV-control gets the output of Completor in memory, and the output file is written once."""
+    tmpdir.chdir()
+    opened_output = []
+    builtin_open = open
+
+    def _open(file, mode="r", *args, **kwargs):
+        if Path(file).name == "test.out":
+            opened_output.append(mode)
+        return builtin_open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", _open)
+    completor_runner(inputfile=case, schedulefile=schedule, outputfile="test.out")
+    assert opened_output == ["w"]
+    monkeypatch.undo()
+    _assert_file_output(Path("test.out"), Path(_TESTDIR / "test_out.true"))
+
+
+def test_output_written_when_icv_control_fails(tmpdir, monkeypatch):
+    """Test that the output of Completor is written if ICV-control fails, as it is if Completor fails."""
+    tmpdir.chdir()
+
+    def _create_icvc(*args, **kwargs):
+        raise ValueError("ICV-control failed.")
+
+    monkeypatch.setattr(main, "create_icvc", _create_icvc)
+    with pytest.raises(ValueError, match="ICV-control failed."):
+        completor_runner(inputfile=case, schedulefile=schedule, outputfile="test.out")
+    with open("test.out", encoding="utf-8") as file:
+        content = file.read()
+    assert "WELSEGS" in content
+    assert not Path("summary_icvc.sch").exists()
@@ -351,6 +351,13 @@ def _mock_parse_args(**kwargs):
     kwargs["figure"] = False if kwargs.get("figure") is None else kwargs["figure"]
     kwargs["schedulefile"] = None if kwargs.get("schedulefile") is None else kwargs["schedulefile"]
     kwargs["outputfile"] = None if kwargs.get("outputfile") is None else kwargs["outputfile"]
+    kwargs["stream"] = False if kwargs.get("stream") is None else kwargs["stream"]
+    kwargs["cache_dir"] = None if kwargs.get("cache_dir") is None else kwargs["cache_dir"]
+    kwargs["cache_size"] = 1024 if kwargs.get("cache_size") is None else kwargs["cache_size"]
+    kwargs["jobs"] = 1 if kwargs.get("jobs") is None else kwargs["jobs"]
+    kwargs["incremental"] = False if kwargs.get("incremental") is None else kwargs["incremental"]
+    kwargs["include_dir"] = None if kwargs.get("include_dir") is None else kwargs["include_dir"]
+    kwargs["include_root"] = None if kwargs.get("include_root") is None else kwargs["include_root"]
 
     def _mock_get_parser():
         class MockObject: